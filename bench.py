@@ -0,0 +1,832 @@
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import zipfile
+import tempfile
+import argparse
+import platform
+import xml.etree.ElementTree as ET
+
+from doclib import parse_segments
+
+# 성능 측정용 스크립트.
+#   python bench.py segments     # parse_segments 선형성 확인 (~1MB)
+#   python bench.py nested       # 5단 중첩 표에서 parse_table_block (예전 방식과 비교)
+#   python bench.py text         # 텍스트 전용 추출 vs parse_hwpx_to_spec (input.hwpx)
+#   python bench.py pipeline     # 합성 문서 묶음으로 단계별 파싱/생성 시간
+#   python bench.py header       # header.xml 전체 해석 vs 본문이 쓰는 모양만 (템플릿 문서)
+#   python bench.py memory       # 1만 셀 표 block 이 붙잡는 메모리 (tracemalloc, 예전 dict 모양과 비교)
+#   python bench.py xml          # XML 해석기(lxml / ElementTree)별 구역 해석 시간 + 결과 일치 확인
+#
+# 결과를 기준값(JSON)으로 남겨 두고 커밋 사이에 비교할 수 있다.
+#   python bench.py pipeline --save bench_baseline.json
+#   python bench.py pipeline --compare bench_baseline.json    # 느려진 항목이 있으면 종료 코드 1
+#
+# 합성 문서만 따로 만들 수도 있다 (문단/표 크기/중첩/모양 종류/구역 수 조절).
+#   python bench.py --make-corpus corpus/ --sections 4 --paragraphs 200 --tables 20 --rows 8 --cols 5 --depth 2
+
+
+def _parse_segments_legacy(text):
+    """비교용: 위치마다 text[i:] 를 잘라 4개 패턴을 re.match 하던 예전 구현."""
+    patterns = [
+        (r'\*\*(.+?)\*\*', 'bold'),
+        (r'_(.+?)_', 'italic'),
+        (r'\*(.+?)\*', 'italic'),
+        (r'<u>(.+?)</u>', 'underline')
+    ]
+    segments = []
+    i = 0
+    while i < len(text):
+        match = None
+        for pat, typ in patterns:
+            m = re.match(pat, text[i:])
+            if m:
+                match = (m, typ)
+                break
+        if match:
+            m, typ = match
+            pre = text[:i]
+            if pre:
+                segments.append({"text": pre})
+            segment = {"text": m.group(1)}
+            if typ == "bold":
+                segment["bold"] = True
+            elif typ == "italic":
+                segment["italic"] = True
+            segments.append(segment)
+            text = text[i+len(m.group(0)):]
+            i = 0
+        else:
+            i += 1
+    if text:
+        segments.append({"text": text})
+    return segments
+
+
+def _markup_text(size):
+    unit = ("본교에서는 **3~6**학년을 대상으로 *2025학년도* 2학기 총괄평가를 실시합니다. "
+            "이번 평가는 _선다형_, 단답형, <u>서·논술형</u> 문항으로 확인합니다.\n")
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def _unclosed_text(size):
+    """닫는 표시가 없는 여는 표시만 이어진 글 (정규식 search 로는 제곱 시간이 드는 입력)"""
+    unit = "<u>밑줄 **굵게 _기울임 *별 "
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def _best_of(fn, arg, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(arg)
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def bench_segments(max_size=1 << 20, legacy_limit=1 << 15):
+    """
+    입력 크기를 두 배씩 늘리며 parse_segments 시간을 잰다.
+    선형이면 us/KB 가 크기와 상관없이 거의 일정하다.
+      new       마크업이 잘 닫힌 글
+      unclosed  닫는 표시가 하나도 없는 글 (여는 표시마다 줄 끝까지 찾아봐야 하는 최악의 경우)
+    """
+    results = []
+    size = 1 << 10
+    while size <= max_size:
+        text = _markup_text(size)
+        row = {"size": size, "new_s": _best_of(parse_segments, text),
+               "unclosed_s": _best_of(parse_segments, _unclosed_text(size))}
+        if size <= legacy_limit:
+            row["legacy_s"] = _best_of(_parse_segments_legacy, text, repeat=1)
+        results.append(row)
+        size *= 2
+
+    print(f"{'size':>10} {'new(ms)':>10} {'us/KB':>8} {'unclosed(ms)':>13} {'us/KB':>8} {'legacy(ms)':>12}")
+    for row in results:
+        legacy = f"{row['legacy_s'] * 1e3:12.2f}" if "legacy_s" in row else f"{'-':>12}"
+        per_kb = row["new_s"] * 1e6 / (row["size"] / 1024)
+        unclosed_kb = row["unclosed_s"] * 1e6 / (row["size"] / 1024)
+        print(f"{row['size']:>10} {row['new_s'] * 1e3:10.2f} {per_kb:8.1f} "
+              f"{row['unclosed_s'] * 1e3:13.2f} {unclosed_kb:8.1f} {legacy}")
+    return results
+
+
+def _legacy_parse_single_table(tbl_el, para_shapes, char_shapes, border_fills):
+    """비교용: 중첩 표 안의 문단까지 셀 텍스트로 모으던 예전 parse_single_table."""
+    from parser import NS, parse_tc_props, paragraph_to_segments
+    data, cell_styles, cell_segments, cell_merges = [], [], [], []
+    for tr in tbl_el.findall("hp:tr", NS):
+        row_texts, row_styles, row_seglist, row_merge = [], [], [], []
+        for tc in tr.findall("hp:tc", NS):
+            col_span, row_span, bg_color, w, h = parse_tc_props(tc, border_fills)
+            chunks, segs_merged, cell_style = [], [], None
+            for p in tc.findall(".//hp:p", NS):
+                segs = paragraph_to_segments(p, para_shapes, char_shapes)
+                if segs:
+                    chunks.append("".join(s.text for s in segs))
+                    if cell_style is None:
+                        cell_style = segs[0].style.to_dict()
+                    segs_merged.extend(s.to_dict() for s in segs)
+            row_texts.append(" ".join([t for t in chunks if t]))
+            row_styles.append(cell_style or {})
+            row_seglist.append(segs_merged)
+            row_merge.append({"colSpan": col_span, "rowSpan": row_span, "bgColor": bg_color,
+                              "width": w, "height": h})
+        if row_texts:
+            data.append(row_texts)
+            cell_styles.append(row_styles)
+            cell_segments.append(row_seglist)
+            cell_merges.append(row_merge)
+    return {"data": data, "cell_styles": cell_styles, "cell_segments": cell_segments,
+            "cell_merges": cell_merges}
+
+
+def _legacy_parse_table_block(tbl_el, para_shapes, char_shapes, border_fills):
+    """비교용: 셀 아래의 모든 표를 평평하게 모으던 예전 parse_tc_contents 를 쓴 표 파싱."""
+    from parser import NS, parse_tc_props, paragraph_to_segments
+    data, cell_nested = [], []
+    for tr in tbl_el.findall("hp:tr", NS):
+        row_texts, row_nested = [], []
+        for tc in tr.findall("hp:tc", NS):
+            parse_tc_props(tc, border_fills)
+            nested_tbls = list(tc.findall(".//hp:tbl", NS))
+            p_in_nested = set()
+            for tbl in nested_tbls:
+                for p in tbl.findall(".//hp:p", NS):
+                    p_in_nested.add(p)
+            nested = [dict(type="table", **_legacy_parse_single_table(t, para_shapes, char_shapes, border_fills))
+                      for t in nested_tbls]
+            chunks = []
+            for p in tc.findall(".//hp:p", NS):
+                if p in p_in_nested:
+                    continue
+                segs = paragraph_to_segments(p, para_shapes, char_shapes)
+                if segs:
+                    chunks.append("".join(s.text for s in segs))
+            row_texts.append(" ".join(chunks))
+            row_nested.append(nested)
+        data.append(row_texts)
+        cell_nested.append(row_nested)
+    return {"type": "table", "data": data, "cell_nested": cell_nested}
+
+
+def _nested_table_xml(depth, size=2, label="t"):
+    """size x size 표의 모든 셀에 다시 표가 들어있는 depth 단 중첩 표."""
+    rows = []
+    for r in range(size):
+        cells = []
+        for c in range(size):
+            name = f"{label}{r}{c}"
+            inner = ""
+            if depth > 1:
+                inner = (f'<hp:p><hp:run charPrIDRef="0">'
+                         f'{_nested_table_xml(depth - 1, size, name)}</hp:run></hp:p>')
+            cells.append(
+                '<hp:tc borderFillIDRef="1"><hp:subList>'
+                f'<hp:p paraPrIDRef="0"><hp:run charPrIDRef="0"><hp:t>{name}</hp:t></hp:run></hp:p>'
+                f'{inner}</hp:subList>'
+                f'<hp:cellAddr colAddr="{c}" rowAddr="{r}"/><hp:cellSpan colSpan="1" rowSpan="1"/>'
+                '<hp:cellSz width="1000" height="1000"/></hp:tc>'
+            )
+        rows.append("<hp:tr>" + "".join(cells) + "</hp:tr>")
+    return f'<hp:tbl rowCnt="{size}" colCnt="{size}">' + "".join(rows) + "</hp:tbl>"
+
+
+def _count_cell_texts(block):
+    """결과에 들어간 셀 문단 수 (같은 문단이 여러 표에 들어가면 여러 번 센다)."""
+    n = sum(len(text.split()) for row in block["data"] for text in row)
+    for row in block.get("cell_nested") or []:
+        for cell in row:
+            n += sum(_count_cell_texts(inner) for inner in cell)
+    return n
+
+
+def bench_nested(max_depth=5, size=2):
+    """
+    중첩 깊이를 1..max_depth 로 늘리며 표 하나를 파싱한다.
+    cells: 실제 셀 수, texts: 결과에 들어간 셀 문단 수 (같아야 한다.
+    예전 방식은 깊은 표의 문단을 바깥 중첩 표마다 다시 넣는다)
+    """
+    import xmlbackend as xb
+    from parser import parse_table_block
+    ns = 'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph"'
+    results = []
+    print(f"{'depth':>5} {'cells':>6} {'texts':>6} {'new(ms)':>9} {'legacy texts':>13} {'legacy(ms)':>11}")
+    for depth in range(1, max_depth + 1):
+        xml = _nested_table_xml(depth, size).replace("<hp:tbl ", f"<hp:tbl {ns} ", 1)
+        tbl = xb.fromstring(xml)
+        cells = sum((size * size) ** d for d in range(1, depth + 1))
+        new_s = _best_of(lambda el: parse_table_block(el, {}, {}, {}), tbl)
+        legacy_s = _best_of(lambda el: _legacy_parse_table_block(el, {}, {}, {}), tbl)
+        new_n = _count_cell_texts(parse_table_block(tbl, {}, {}, {}))
+        legacy_n = _count_cell_texts(_legacy_parse_table_block(tbl, {}, {}, {}))
+        results.append({"depth": depth, "cells": cells, "new_s": new_s, "legacy_s": legacy_s,
+                        "texts": new_n, "legacy_texts": legacy_n})
+        print(f"{depth:>5} {cells:>6} {new_n:>6} {new_s * 1e3:9.2f} {legacy_n:>13} {legacy_s * 1e3:11.2f}")
+    return results
+
+
+def bench_text(path="input.hwpx", repeat=20):
+    """
+    parse_hwpx_to_spec 과 extract_text 를 같은 문서에 반복해서 돌려 평균 시간을 잰다.
+    spec(cold) 은 header 캐시를 매번 비운 경우, spec(warm) 은 header 캐시가 살아있는 경우다.
+    """
+    import parser
+
+    def spec_cold():
+        parser.clear_header_cache()
+        parser.parse_hwpx_to_spec(path, None)
+
+    def spec_warm():
+        parser.parse_hwpx_to_spec(path, None)
+
+    cases = [
+        ("spec(cold)", spec_cold),
+        ("spec(warm)", spec_warm),
+        ("text", lambda: parser.extract_text(path)),
+        ("text(preview)", lambda: parser.extract_text(path, preview=True)),
+    ]
+    results = {}
+    for name, fn in cases:
+        fn()
+        t = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        results[name] = (time.perf_counter() - t) / repeat
+
+    base = results["spec(cold)"]
+    print(f"{'mode':>14} {'ms':>8} {'speedup':>8}")
+    for name, sec in results.items():
+        print(f"{name:>14} {sec * 1e3:8.2f} {base / sec:7.1f}x")
+    return results
+
+
+def _flat_table_xml(rows, cols, styles=4):
+    """rows x cols 표. 셀마다 문단 하나, run 은 1~2 개 (charPrIDRef 는 styles 개를 돌려 쓴다)."""
+    ns = 'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph"'
+    out = [f'<hp:tbl {ns} rowCnt="{rows}" colCnt="{cols}">']
+    for r in range(rows):
+        out.append("<hp:tr>")
+        for c in range(cols):
+            runs = f'<hp:run charPrIDRef="{(r + c) % styles}"><hp:t>{r}행 {c}열</hp:t></hp:run>'
+            if c % 3 == 0:
+                runs += f'<hp:run charPrIDRef="{(r + c + 1) % styles}"><hp:t> 비고</hp:t></hp:run>'
+            out.append(
+                '<hp:tc borderFillIDRef="1"><hp:subList>'
+                f'<hp:p paraPrIDRef="{c % 2}">{runs}</hp:p></hp:subList>'
+                f'<hp:cellAddr colAddr="{c}" rowAddr="{r}"/><hp:cellSpan colSpan="1" rowSpan="1"/>'
+                f'<hp:cellSz width="{4000 + c}" height="{1000 + r}"/></hp:tc>'
+            )
+        out.append("</hp:tr>")
+    out.append("</hp:tbl>")
+    return "".join(out)
+
+
+def bench_memory(rows=100, cols=100):
+    """
+    rows x cols 표 하나를 parse_table_block 으로 해석해 결과가 붙잡는 메모리를 tracemalloc 으로 잰다.
+      model   지금 block (model.Table: __slots__ 객체 + 공유 Style)
+      dict    같은 내용을 예전 block dict 로 (Table.to_block(): run 마다 모양 dict, 셀마다 병합 dict)
+    셀 글자(str)는 양쪽에 다 들어간다.
+    """
+    import tracemalloc
+    import xmlbackend as xb
+    from parser import parse_table_block
+    # parser 가 쓰는 해석기와 같은 요소여야 한다 (lxml 이면 lxml 요소)
+    tbl = xb.fromstring(_flat_table_xml(rows, cols))
+    para_shapes = {0: {"Align": "left"}, 1: {"Align": "center"}}
+    char_shapes = {i: {"Height": HEIGHTS[i % len(HEIGHTS)], "FaceName": FACES[i % len(FACES)],
+                       "Bold": bool(i % 2)} for i in range(4)}
+    border_fills = {1: {"fillColor": "#FFFFFF"}}
+
+    def parse():
+        return parse_table_block(tbl, para_shapes, char_shapes, border_fills)
+
+    def retained(fn):
+        tracemalloc.start()
+        try:
+            obj = fn()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del obj
+        return size
+
+    def as_dict():
+        block = parse()
+        return block.to_block()
+
+    parse()   # Style 표 채우기
+    results = {"cells": rows * cols}
+    results["model_bytes"] = retained(parse)
+    results["dict_bytes"] = retained(as_dict)
+    results["parse_s"], block = _time_stage(parse, 3)
+    results["to_spec_s"], _ = _time_stage(block.to_spec, 3)
+    print(f"cells {rows * cols}: model {results['model_bytes'] / 1024:,.0f} KB, "
+          f"dict {results['dict_bytes'] / 1024:,.0f} KB "
+          f"({results['dict_bytes'] / results['model_bytes']:.1f}x), "
+          f"parse {results['parse_s'] * 1e3:.1f} ms, to_spec {results['to_spec_s'] * 1e3:.1f} ms")
+    return results
+
+
+HEADER_ITEMS_RE = re.compile(rb"<hh:(charPr|paraPr|borderFill)\s.*?</hh:\1>", re.S)
+
+
+def _template_heavy_hwpx(path="input.hwpx", copies=10):
+    """
+    path 의 header.xml 에 charPr/paraPr/borderFill 을 id 만 바꿔 copies 배로 늘린 .hwpx (bytes).
+    본문은 그대로이므로 정의된 모양은 많고 쓰이는 모양은 몇십 개인 템플릿 문서가 된다.
+    """
+    with zipfile.ZipFile(path) as src:
+        header = src.read("Contents/header.xml")
+        spans = {}
+        for m in HEADER_ITEMS_RE.finditer(header):
+            spans.setdefault(m.group(1), []).append(m.group())
+        for name, elems in spans.items():
+            extra = []
+            for k in range(1, copies):
+                for el in elems:
+                    extra.append(re.sub(rb'\sid="(\d+)"', lambda m: b' id="%d"' % (int(m.group(1)) + k * 10000),
+                                        el, count=1))
+            close = {b"charPr": b"</hh:charProperties>", b"paraPr": b"</hh:paraProperties>",
+                     b"borderFill": b"</hh:borderFills>"}[name]
+            header = header.replace(close, b"".join(extra) + close, 1)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as out:
+            for info in src.infolist():
+                data = header if info.filename == "Contents/header.xml" else src.read(info)
+                out.writestr(info, data, compress_type=info.compress_type)
+    return buf.getvalue()
+
+
+def bench_header(path="input.hwpx", copies=10, repeat=20):
+    """
+    header.xml 해석: 전체(eager) vs 구역이 쓰는 id 만(lazy, parser.HeaderIndex).
+      eager        parse_header(lazy=False), 캐시 없이
+      lazy         parse_header(lazy=True), 캐시 없이 (구역 id 수집 + 색인 + 해석)
+      lazy(warm)   같은 header 의 색인이 살아있을 때 (같은 템플릿의 다음 문서)
+      spec(...)    parse_hwpx_to_spec 전체, header 캐시 없이
+    문서: path 그대로 / header 모양을 copies 배로 늘린 템플릿 문서 / 합성 large (header 작고 본문 큼)
+    """
+    import parser
+    docs = [
+        (os.path.basename(path), open(path, "rb").read()),
+        (f"template×{copies}", _template_heavy_hwpx(path, copies)),
+        ("large", write_synthetic_hwpx(io.BytesIO(), **CORPUS_PRESETS["large"]).getvalue()),
+    ]
+
+    def header(lazy):
+        parser.clear_header_cache()
+        return parser.parse_header(zf, lazy=lazy)
+
+    def spec(lazy):
+        parser.clear_header_cache()
+        return parser.parse_hwpx_to_spec(target, None, lazy_header=lazy)
+
+    results = {}
+    print(f"{'doc':>14} {'header KB':>9} {'defined':>8} {'used':>5} {'eager':>8} {'lazy':>8} "
+          f"{'lazy(warm)':>10} {'spec(eager)':>11} {'spec(lazy)':>10}   (ms)")
+    for name, data in docs:
+        with tempfile.NamedTemporaryFile(suffix=".hwpx", delete=False) as f:
+            f.write(data)
+            target = f.name
+        try:
+            zf = zipfile.ZipFile(io.BytesIO(data))
+            header_kb = zf.getinfo(parser.HEADER_NAME).file_size / 1024
+            times = {}
+            times["eager"], full = _time_stage(lambda: header(False), repeat)
+            times["lazy"], used = _time_stage(lambda: header(True), repeat)
+            times["lazy_warm"], _ = _time_stage(lambda: parser.parse_header(zf, lazy=True), repeat)
+            times["spec_eager"], a = _time_stage(lambda: spec(False), max(repeat // 4, 1))
+            times["spec_lazy"], b = _time_stage(lambda: spec(True), max(repeat // 4, 1))
+            assert a == b, name
+            zf.close()
+        finally:
+            os.unlink(target)
+            parser.clear_header_cache()
+        for key, sec in times.items():
+            results[f"{name}/{key}"] = sec
+        print(f"{name:>14} {header_kb:9.0f} "
+              f"{sum(map(len, full)):>8} {sum(map(len, used)):>5} "
+              + " ".join(f"{times[k] * 1e3:{w}.2f}" for k, w in
+                         (("eager", 8), ("lazy", 8), ("lazy_warm", 10), ("spec_eager", 11), ("spec_lazy", 10))))
+    return results
+
+
+def check_xml_backends(paths):
+    """
+    쓸 수 있는 XML 해석기(xmlbackend)마다 parse_hwpx_to_spec(트리/스트리밍) 결과가 같은지 본다.
+    결과가 다른 (문서, 해석기, 모드) 리스트를 돌려준다. 해석기 설정은 원래대로 돌려놓는다.
+    """
+    import parser
+    import xmlbackend
+    backends = xmlbackend.available()
+    previous = xmlbackend.name
+    mismatches = []
+    try:
+        for path in paths:
+            expected = {}
+            for backend in backends:
+                xmlbackend.use(backend)
+                for streaming in (False, True):
+                    parser.clear_header_cache()
+                    spec = json.dumps(parser.parse_hwpx_to_spec(path, None, streaming=streaming), ensure_ascii=False)
+                    if expected.setdefault(streaming, spec) != spec:
+                        mismatches.append((path, backend, "stream" if streaming else "tree"))
+    finally:
+        xmlbackend.use(previous)
+    return mismatches
+
+
+def bench_xml(path="input.hwpx", repeat=3):
+    """
+    XML 해석기별 구역 해석 시간 (parse_sections_to_blocks, 트리/스트리밍) + 결과가 같은지 확인.
+    문서: path 와 합성 medium / large. lxml 이 없으면 etree 만 잰다.
+    결과가 다른 문서가 있으면 종료 코드 1 로 끝낸다.
+    """
+    import parser
+    import xmlbackend
+    backends = xmlbackend.available()
+    previous = xmlbackend.name
+    tmpdir = tempfile.mkdtemp()
+    docs = [(os.path.basename(path), path)]
+    for name in ("medium", "large"):
+        target = os.path.join(tmpdir, f"{name}.hwpx")
+        write_synthetic_hwpx(target, **CORPUS_PRESETS[name])
+        docs.append((name, target))
+
+    results = {}
+    try:
+        mismatches = check_xml_backends([target for _, target in docs])
+        print(f"결과 비교 ({', '.join(backends)}): "
+              + ("일치" if not mismatches else f"불일치 {mismatches}"))
+        print(f"{'doc':>12} {'KB':>7} " + " ".join(f"{b + '/' + m:>14}" for b in backends
+                                                  for m in ("tree", "stream")) + "   (ms)")
+        for name, target in docs:
+            with zipfile.ZipFile(target) as zf:
+                styles = parser.parse_header(zf)
+                size = sum(zf.getinfo(sec).file_size for sec in parser.list_section_files(zf))
+                row = []
+                for backend in backends:
+                    xmlbackend.use(backend)
+                    for streaming in (False, True):
+                        sec, _ = _time_stage(lambda: parser.parse_sections_to_blocks(zf, *styles, streaming=streaming),
+                                             repeat)
+                        results[f"{name}/{backend}/{'stream' if streaming else 'tree'}"] = sec
+                        row.append(sec)
+            print(f"{name:>12} {size / 1024:7.0f} " + " ".join(f"{sec * 1e3:14.2f}" for sec in row))
+    finally:
+        xmlbackend.use(previous)
+        for _, target in docs[1:]:
+            os.unlink(target)
+        os.rmdir(tmpdir)
+    if mismatches:
+        sys.exit(1)
+    return results
+
+
+# --- 합성 문서 ----------------------------------------------------------------
+
+FACES = ["바탕", "돋움", "굴림", "바탕체", "돋움체", "궁서", "맑은 고딕", "HY헤드라인M"]
+HEIGHTS = [10.0, 11.0, 12.0, 9.0, 14.0, 16.0, 20.0]
+ALIGNS = ["left", "justify", "center", "right"]
+WORDS = ("본교 학년 평가 계획 안내 학부모 가정 학생 교육 활동 일정 참가 신청 결과 수업 "
+         "교과 국어 수학 과학 사회 영어 체험 봉사 상담 급식 방과후 안전 건강 행사 "
+         "Hello HWPX 2025 12.2.(화) 3~6 A+ &amp; 서·논술형").split()
+
+# 이름 있는 묶음: 작은 안내문 한 장부터 여러 구역에 걸친 큰 문서까지
+CORPUS_PRESETS = {
+    "small": dict(sections=1, paragraphs=20, tables=2, rows=4, cols=4, depth=1, styles=4),
+    "medium": dict(sections=2, paragraphs=200, tables=20, rows=8, cols=5, depth=2, styles=12),
+    "large": dict(sections=8, paragraphs=1600, tables=120, rows=12, cols=6, depth=2, styles=32),
+}
+
+
+def _style_pool(n):
+    """서로 다른 글자/문단 모양 n 개 (parser 가 돌려주는 style dict 모양)."""
+    pool = []
+    for i in range(max(n, 1)):
+        pool.append({
+            "Align": ALIGNS[i % len(ALIGNS)],
+            "FaceName": FACES[i % len(FACES)],
+            "Height": HEIGHTS[(i // len(FACES)) % len(HEIGHTS)],
+            "Bold": bool((i // 2) % 2),
+        })
+    return pool
+
+
+def _words(rng, lo, hi):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(lo, hi))).replace("&amp;", "&")
+
+
+def _synthetic_segments(rng, pool, lo, hi, max_runs=3):
+    segments = []
+    for _ in range(rng.randint(1, max_runs)):
+        style = rng.choice(pool)
+        text = _words(rng, lo, hi) + " "
+        if segments and segments[-1]["style"] is style:
+            segments[-1]["text"] += text
+        else:
+            segments.append({"text": text, "style": style})
+    segments[-1]["text"] = segments[-1]["text"].rstrip()
+    return segments
+
+
+def _synthetic_table(rng, pool, rows, cols, depth):
+    """rows x cols 표. depth > 1 이면 첫 행 첫 칸에 한 단계 작은 표를 넣는다."""
+    data, cell_styles, cell_segments, cell_merges, cell_nested = [], [], [], [], []
+    for r in range(rows):
+        row_data, row_styles, row_segs, row_merge, row_nested = [], [], [], [], []
+        for c in range(cols):
+            segs = _synthetic_segments(rng, pool, 1, 4, max_runs=2)
+            row_data.append("".join(seg["text"] for seg in segs))
+            row_styles.append(segs[0]["style"])
+            row_segs.append(segs)
+            row_merge.append({"colSpan": 1, "rowSpan": 1,
+                              "bgColor": "#D9D9D9" if r == 0 else None,
+                              "width": 42520 // cols, "height": 1000})
+            nested = []
+            if depth > 1 and r == 0 and c == 0:
+                nested.append(dict(type="table", **_synthetic_table(
+                    rng, pool, max(2, rows // 2), max(2, cols // 2), depth - 1)))
+            row_nested.append(nested)
+        data.append(row_data)
+        cell_styles.append(row_styles)
+        cell_segments.append(row_segs)
+        cell_merges.append(row_merge)
+        cell_nested.append(row_nested)
+    return {"data": data, "cell_styles": cell_styles, "cell_segments": cell_segments,
+            "cell_merges": cell_merges, "cell_nested": cell_nested}
+
+
+def synthetic_sections(paragraphs=20, tables=2, rows=4, cols=4, depth=1, styles=4, sections=1, seed=0):
+    """
+    구역마다 노드 리스트를 돌려준다 (doclib 노드 모양). 문단/표 수는 전체 문서 기준이고
+    구역에 고르게 나뉘며, 표는 문단 사이에 고르게 끼워 넣는다. seed 가 같으면 같은 문서다.
+    """
+    rng = random.Random(seed)
+    pool = _style_pool(styles)
+    out = []
+    for s in range(sections):
+        n_p = paragraphs // sections + (1 if s < paragraphs % sections else 0)
+        n_t = tables // sections + (1 if s < tables % sections else 0)
+        every = n_p // n_t if n_t else None
+        nodes = []
+        for i in range(n_p):
+            segs = _synthetic_segments(rng, pool, 4, 24)
+            base = segs[0]["style"]
+            nodes.append({
+                "content": "".join(seg["text"] for seg in segs),
+                "style": {"FaceName": base["FaceName"], "Height": base["Height"],
+                          "Bold": base["Bold"], "Align": base["Align"]},
+                "segments": segs,
+            })
+            if every and (i + 1) % every == 0 and n_t:
+                nodes.append(_synthetic_table(rng, pool, rows, cols, depth))
+                n_t -= 1
+        for _ in range(n_t):
+            nodes.append(_synthetic_table(rng, pool, rows, cols, depth))
+        out.append(nodes)
+    return out
+
+
+def write_synthetic_hwpx(target, **params):
+    """
+    synthetic_sections(**params) 를 hwpxwriter 로 .hwpx 에 쓴다. target 은 경로나 파일 객체.
+    """
+    from hwpxwriter import HwpxWriter
+    with HwpxWriter(target, title="synthetic") as writer:
+        for s, nodes in enumerate(synthetic_sections(**params)):
+            if s:
+                writer.new_section()
+            for node in nodes:
+                writer.add_node(node)
+    return target
+
+
+def make_corpus(out_dir, presets=None, **params):
+    """
+    out_dir 에 합성 문서를 만든다. params 가 있으면 그 설정으로 synthetic.hwpx 하나,
+    없으면 presets(기본: CORPUS_PRESETS 전부)마다 <이름>.hwpx 하나씩. 만든 경로 리스트를 돌려준다.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = {"synthetic": params} if params else {name: CORPUS_PRESETS[name]
+                                                 for name in (presets or CORPUS_PRESETS)}
+    paths = []
+    for name, kw in jobs.items():
+        path = os.path.join(out_dir, f"{name}.hwpx")
+        write_synthetic_hwpx(path, **kw)
+        paths.append(path)
+    return paths
+
+
+# --- 단계별 파이프라인 ---------------------------------------------------------
+
+def _time_stage(fn, repeat):
+    """fn() 을 repeat 번 돌려 가장 짧은 시간과 마지막 결과를 돌려준다."""
+    best, result = None, None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def pipeline_stages(data, repeat=3):
+    """
+    .hwpx 바이트 하나에 대해 단계별 최소 시간(초)을 잰다.
+      header       header.xml 해석 (캐시 없이)
+      sections     section*.xml 을 block 으로 (parse_sections_to_blocks)
+      spec         blocks_to_document_spec
+      json         json.dumps (parser 가 파일에 쓰는 것과 같은 indent=2)
+      com          render_parsed_spec -> RecordingHwp (COM 호출 자체 비용은 빠짐)
+      com_optimize 위와 같되 hwpproxy.StateTrackingHwp 를 끼움
+      native       hwpxwriter 로 메모리에 .hwpx 쓰기
+    """
+    import parser
+    from doclib import render_parsed_spec
+    from hwpproxy import StateTrackingHwp
+    from hwpsession import RecordingHwp
+    from hwpxwriter import write_hwpx_from_spec
+
+    zf = zipfile.ZipFile(io.BytesIO(data))
+
+    def header():
+        with zf.open(parser.HEADER_NAME) as f:
+            return parser.styles_from_header_root(ET.parse(f).getroot())
+
+    def com():
+        hwp = RecordingHwp()
+        render_parsed_spec(hwp, spec)
+        return len(hwp.calls)
+
+    def com_optimize():
+        hwp = StateTrackingHwp(RecordingHwp())
+        render_parsed_spec(hwp, spec)
+        return hwp.stats()
+
+    times = {}
+    times["header"], styles = _time_stage(header, repeat)
+    times["sections"], blocks = _time_stage(lambda: parser.parse_sections_to_blocks(zf, *styles), repeat)
+    times["spec"], spec = _time_stage(lambda: parser.blocks_to_document_spec(blocks), repeat)
+    times["json"], _ = _time_stage(lambda: json.dumps(spec, ensure_ascii=False, indent=2), repeat)
+    times["com"], calls = _time_stage(com, repeat)
+    times["com_optimize"], _ = _time_stage(com_optimize, repeat)
+    times["native"], _ = _time_stage(lambda: write_hwpx_from_spec(spec, io.BytesIO()), repeat)
+    zf.close()
+    info = {"blocks": len(blocks), "bytes": len(data), "com_calls": calls}
+    return times, info
+
+
+def bench_pipeline(presets=None, repeat=3):
+    """
+    CORPUS_PRESETS 의 합성 문서마다 pipeline_stages 를 잰다. 문서는 메모리에서 만든다.
+    결과: {"<묶음>/<단계>": 초}
+    """
+    results = {}
+    names = presets or list(CORPUS_PRESETS)
+    stages = None
+    rows = []
+    for name in names:
+        data = write_synthetic_hwpx(io.BytesIO(), **CORPUS_PRESETS[name]).getvalue()
+        times, info = pipeline_stages(data, repeat=repeat)
+        stages = list(times)
+        for stage, sec in times.items():
+            results[f"{name}/{stage}"] = sec
+        rows.append((name, info, times))
+
+    print(f"{'corpus':>8} {'KB':>7} {'blocks':>7} " + " ".join(f"{s:>12}" for s in stages) + "   (ms)")
+    for name, info, times in rows:
+        print(f"{name:>8} {info['bytes'] / 1024:7.0f} {info['blocks']:>7} "
+              + " ".join(f"{times[s] * 1e3:12.2f}" for s in stages))
+    return results
+
+
+BENCHES = {
+    "segments": bench_segments,
+    "nested": bench_nested,
+    "text": bench_text,
+    "pipeline": bench_pipeline,
+    "header": bench_header,
+    "memory": bench_memory,
+    "xml": bench_xml,
+}
+
+
+# --- 기준값 저장 / 비교 -------------------------------------------------------
+
+def flatten_results(name, results):
+    """
+    벤치마크 결과를 {"<벤치>/<항목>": 초} 로 편다.
+    dict 는 값이 숫자인 항목만, 리스트(행)는 첫 열을 이름 삼아 이름이 _s 로 끝나는 열만 쓴다.
+    """
+    flat = {}
+    if isinstance(results, dict):
+        for key, val in results.items():
+            if isinstance(val, (int, float)):
+                flat[f"{name}/{key}"] = float(val)
+    elif isinstance(results, list):
+        for row in results:
+            label = next(iter(row.values()))
+            for key, val in row.items():
+                if key.endswith("_s"):
+                    flat[f"{name}/{label}/{key}"] = float(val)
+    return flat
+
+
+def _git_revision():
+    try:
+        import subprocess
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_baseline(path, metrics):
+    baseline = {
+        "commit": _git_revision(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": metrics,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def compare_baseline(path, metrics, threshold=1.25, out=sys.stdout):
+    """
+    기준값 파일과 비교해 항목별 배율(지금/기준)을 출력한다.
+    threshold 배 넘게 느려진 항목 이름 리스트를 돌려준다. 한쪽에만 있는 항목은 건너뛴다.
+    """
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = baseline.get("results", {})
+    print(f"기준값: {path} (commit {baseline.get('commit')}, {baseline.get('created')})", file=out)
+    print(f"{'항목':<32} {'기준(ms)':>10} {'지금(ms)':>10} {'배율':>7}", file=out)
+    regressions = []
+    for key in sorted(metrics):
+        if key not in base or base[key] <= 0:
+            continue
+        ratio = metrics[key] / base[key]
+        mark = ""
+        if ratio > threshold:
+            regressions.append(key)
+            mark = "  << 느려짐"
+        print(f"{key:<32} {base[key] * 1e3:10.2f} {metrics[key] * 1e3:10.2f} {ratio:6.2f}x{mark}", file=out)
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="성능 측정")
+    ap.add_argument("names", nargs="*", help=f"돌릴 벤치마크 (기본: 전부, 가능: {', '.join(BENCHES)})")
+    ap.add_argument("--save", metavar="JSON", help="결과를 기준값 파일로 저장")
+    ap.add_argument("--compare", metavar="JSON", help="기준값 파일과 비교 (느려진 항목이 있으면 종료 코드 1)")
+    ap.add_argument("--threshold", type=float, default=1.25, help="느려짐으로 볼 배율 (기본 1.25)")
+    ap.add_argument("--make-corpus", metavar="DIR", help="벤치마크 대신 합성 .hwpx 를 DIR 에 만든다")
+    ap.add_argument("--preset", action="append", choices=list(CORPUS_PRESETS),
+                    help="--make-corpus/pipeline 에 쓸 묶음 (여러 번 지정 가능, 기본: 전부)")
+    for opt in ("sections", "paragraphs", "tables", "rows", "cols", "depth", "styles", "seed"):
+        ap.add_argument(f"--{opt}", type=int, help="--make-corpus: 직접 지정한 설정으로 한 개 만든다")
+    args = ap.parse_args()
+
+    if args.make_corpus:
+        params = {opt: getattr(args, opt) for opt in
+                  ("sections", "paragraphs", "tables", "rows", "cols", "depth", "styles", "seed")
+                  if getattr(args, opt) is not None}
+        for path in make_corpus(args.make_corpus, presets=args.preset, **params):
+            print(f"{path} ({os.path.getsize(path) / 1024:.0f} KB)")
+        return
+
+    names = args.names or list(BENCHES)
+    for name in names:
+        if name not in BENCHES:
+            print(f"알 수 없는 벤치마크: {name} (가능: {', '.join(BENCHES)})")
+            sys.exit(1)
+    metrics = {}
+    for name in names:
+        print(f"== {name}")
+        results = BENCHES[name](presets=args.preset) if name == "pipeline" else BENCHES[name]()
+        metrics.update(flatten_results(name, results))
+
+    if args.save:
+        save_baseline(args.save, metrics)
+        print(f"기준값 저장: {args.save}")
+    if args.compare:
+        regressions = compare_baseline(args.compare, metrics, threshold=args.threshold)
+        if regressions:
+            print(f"느려진 항목 {len(regressions)}개: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
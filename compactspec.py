@@ -0,0 +1,123 @@
+import json
+
+# parsed_spec 의 압축 형식.
+# parser 출력은 segment / cell_styles / cell_segments 마다 같은 모양 dict
+# ({"FaceName", "Height", "Bold", "Align"})를 통째로 반복해서 JSON 대부분이 모양 정보다.
+# 압축 형식은 모양을 맨 위 "styles" 표에 한 번씩만 두고, 각 자리에는 그 번호만 적는다.
+#
+#   {
+#     "format": "compact", "version": 1,
+#     "styles": [{"Align": "left", "FaceName": "바탕", ...}, ...],
+#     "document": {
+#       "문단1": {"content": "...", "style": 0, "segments": [{"text": "...", "style": 0}]},
+#       "표1":   {"data": [...], "cell_styles": [[1, 1]], "cell_segments": [[[{"text": "..", "style": 1}]]],
+#                 "cell_nested": [[[ {...같은 모양의 표...} ]]], ...}
+#     }
+#   }
+#
+# 표의 "style"(cell_font/cell_size/cell_align)은 표마다 하나라 그대로 둔다.
+# 펼칠 때는 노드 하나씩 번호를 styles 의 dict 로 바꾸므로, 같은 모양은 모두 같은 dict 객체를
+# 가리킨다 (읽기 전용으로 쓴다).
+
+FORMAT = "compact"
+VERSION = 1
+
+
+def is_compact(spec):
+    return isinstance(spec, dict) and spec.get("format") == FORMAT and isinstance(spec.get("styles"), list)
+
+
+class _StyleIndex:
+    def __init__(self):
+        self.styles = []
+        self._ids = {}
+
+    def id(self, style):
+        key = json.dumps(style, sort_keys=True, ensure_ascii=False)
+        sid = self._ids.get(key)
+        if sid is None:
+            sid = self._ids[key] = len(self.styles)
+            self.styles.append(style)
+        return sid
+
+
+def _map_segments(segments, fn):
+    return [dict(seg, style=fn(seg["style"])) if "style" in seg else seg for seg in segments]
+
+
+def _map_node(node, fn):
+    """노드 안의 모든 글자/문단 모양 자리에 fn 을 적용한 새 노드."""
+    if not isinstance(node, dict):
+        return node
+    out = dict(node)
+    if "data" in node:
+        if node.get("cell_styles") is not None:
+            out["cell_styles"] = [[fn(s) for s in row] for row in node["cell_styles"]]
+        if node.get("cell_segments") is not None:
+            out["cell_segments"] = [[_map_segments(segs, fn) for segs in row]
+                                    for row in node["cell_segments"]]
+        if node.get("cell_nested") is not None:
+            out["cell_nested"] = [[[_map_node(inner, fn) for inner in cell] for cell in row]
+                                  for row in node["cell_nested"]]
+    else:
+        if "style" in node:
+            out["style"] = fn(node["style"])
+        if node.get("segments") is not None:
+            out["segments"] = _map_segments(node["segments"], fn)
+    return out
+
+
+def compact_spec(spec):
+    """parsed_spec -> 압축 형식. 이미 압축 형식이면 그대로 돌려준다."""
+    if is_compact(spec):
+        return spec
+    index = _StyleIndex()
+    doc = spec.get("document", spec)
+    document = {key: _map_node(node, index.id) for key, node in doc.items()}
+    return {"format": FORMAT, "version": VERSION, "styles": index.styles, "document": document}
+
+
+def expand_node(node, styles):
+    """압축 형식 노드 하나를 원래 형식으로 펼친다."""
+    return _map_node(node, lambda sid: styles[sid] if isinstance(sid, int) else sid)
+
+
+def iter_document(spec):
+    """
+    (key, node) 를 순서대로 돌려준다. 압축 형식이면 노드를 꺼낼 때마다 하나씩 펼친다.
+    spec 이 dict 가 아니면 이미 (key, node) 이터러블(specstream.read_spec_stream 등)로 보고 그대로 넘긴다.
+    doclib / hwpops / hwpxwriter 는 이것으로 세 형식을 똑같이 읽는다.
+    """
+    if not isinstance(spec, dict):
+        yield from spec
+        return
+    doc = spec.get("document", spec)
+    if not is_compact(spec):
+        yield from doc.items()
+        return
+    styles = spec["styles"]
+    for key, node in doc.items():
+        yield key, expand_node(node, styles)
+
+
+def expand_spec(spec):
+    """압축 형식 -> 원래 parsed_spec 전체."""
+    if not is_compact(spec):
+        return spec
+    return {"document": dict(iter_document(spec))}
+
+
+def load_spec(path):
+    """parsed_spec.json 을 읽는다. 압축 형식은 펼치지 않은 채로 돌려준다 (iter_document 로 읽는다)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_spec(spec, path, compact=True):
+    if compact:
+        spec = compact_spec(spec)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(spec, f, ensure_ascii=False, separators=(",", ":"))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(expand_spec(spec), f, ensure_ascii=False, indent=2)
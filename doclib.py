@@ -1,9 +1,11 @@
 import json
 import yaml
 
-from pyhwpx import Hwp
 import re
 
+from compactspec import iter_document
+from profiling import stage, wrap_hwp
+
 def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
     red = int(hex_color[0:2], 16)
@@ -21,48 +23,86 @@ def set_alignment(hwp, align):
     elif align == "justify":
         hwp.ParagraphShapeAlignJustify()
 
+# 인라인 마크업: **굵게**, _기울임_ / *기울임*, <u>밑줄</u>
+# 같은 위치에서는 위 순서대로 우선한다 (** 가 * 보다 먼저).
+# SEGMENT_RE 가 문법 정의다. parse_segments 는 이것으로 search 하는 것과 같은 결과를 내지만,
+# 닫는 표시가 없는 여는 표시가 많으면 re 는 여는 표시마다 줄 끝까지 다시 훑으므로(제곱 시간)
+# 표시별로 닫는 위치를 직접 찾고 그 결과를 재사용한다.
+SEGMENT_RE = re.compile(r'\*\*(.+?)\*\*|_(.+?)_|\*(.+?)\*|<u>(.+?)</u>')
+SEGMENT_FLAGS = ("bold", "italic", "italic", "underline")
+# 여는 표시 후보(OPENER_RE 가 찾는 글자) -> 그 자리에서 시도할 (여는 표시, 닫는 표시, 플래그), 우선순위 순
+SEGMENT_MARKERS = {
+    "*": (("**", "**", "bold"), ("*", "*", "italic")),
+    "_": (("_", "_", "italic"),),
+    "<u>": (("<u>", "</u>", "underline"),),
+}
+OPENER_RE = re.compile(r'[*_]|<u>')
+
 def parse_segments(text):
-    patterns = [
-        (r'\*\*(.+?)\*\*', 'bold'),
-        (r'_(.+?)_', 'italic'),
-        (r'\*(.+?)\*', 'italic'),
-        (r'<u>(.+?)</u>', 'underline')
-    ]
+    """
+    마크업 텍스트를 segment 목록으로 나눈다.
+    [{"text": ...}, {"text": ..., "bold": True}, {"text": ..., "italic": True, "underline": True}, ...]
+
+    여는 표시 후보를 앞에서부터 찾고, 닫는 표시/줄바꿈의 다음 위치는 찾은 결과를 기억해 두어
+    같은 구간을 다시 훑지 않는다. 그래서 닫히지 않은 표시가 섞여 있어도 본문 길이에 대해
+    선형으로 동작한다 (중첩 한 단마다 안쪽 구간을 한 번 더 본다). 마크업 안쪽은 다시 나눠서
+    **굵게 _기울임_** 같은 중첩도 플래그를 합쳐 처리한다.
+    """
     segments = []
-    i = 0
-    while i < len(text):
-        match = None
-        for pat, typ in patterns:
-            m = re.match(pat, text[i:])
-            if m:
-                match = (m, typ)
-                break
-        if match:
-            m, typ = match
-            val = m.group(1)
-            pre = text[:i]
-            if pre:
-                segments.append({"text": pre})
-            segment = {"text": val}
-            if typ == "bold":
-                segment["bold"] = True
-            elif typ == "italic":
-                segment["italic"] = True
-            segments.append(segment)
-            text = text[i+len(m.group(0)):]
-            i = 0
-        else:
-            i += 1
-    if text:
-        segments.append({"text": text})
+    _tokenize(text, 0, len(text), {}, segments)
     return segments
 
+def _tokenize(text, pos, end, flags, out):
+    find = text.find
+    search = OPENER_RE.search
+    # 찾는 문자열 -> (찾기 시작한 위치, 찾은 위치 또는 -1). 다음 찾기가 그 사이에서 시작하면
+    # 결과가 같으므로 다시 훑지 않는다 (-1 이면 그 뒤 어디서 찾아도 없다)
+    found = {}
+    get = found.get
+    scan = pos
+    while scan < end:
+        m = search(text, scan, end)
+        if m is None:
+            break
+        i = m.start()
+        for opener, closer, flag in SEGMENT_MARKERS[m.group()]:
+            if opener == m.group() or text.startswith(opener, i):
+                # SEGMENT_RE 의 opener(.+?)closer: 안쪽은 한 글자 이상, 줄바꿈 없이
+                inner = i + len(opener)
+                hit = get(closer)
+                if hit is None or hit[0] > inner + 1 or 0 <= hit[1] <= inner:
+                    hit = found[closer] = (inner + 1, find(closer, inner + 1, end))
+                close = hit[1]
+                if close >= 0:
+                    hit = get("\n")
+                    if hit is None or hit[0] > inner or 0 <= hit[1] < inner:
+                        hit = found["\n"] = (inner, find("\n", inner, end))
+                    if hit[1] < 0 or hit[1] > close:
+                        break
+        else:
+            scan = i + 1
+            continue
+        if i > pos:
+            out.append(dict(flags, text=text[pos:i]))
+        inner_flags = dict(flags)
+        inner_flags[flag] = True
+        if search(text, inner, close) is None:
+            # 안쪽에 다른 표시가 없으면 (대부분) 다시 나눌 것 없이 한 조각
+            inner_flags["text"] = text[inner:close]
+            out.append(inner_flags)
+        else:
+            _tokenize(text, inner, close, inner_flags, out)
+        pos = scan = close + len(closer)
+    if pos < end:
+        out.append(dict(flags, text=text[pos:end]))
+
 def insert_role_and_style(hwp, content_dict, styles, role):
     base_opts = {
         "FaceName": styles[role]["FaceName"],
         "Height": styles[role]["Height"],
         "Bold": styles[role]["Bold"],
         "Italic": False,
+        "UnderlineType": 0,
     }
     set_alignment(hwp, styles[role]["Align"])
     segments = parse_segments(content_dict[role])
@@ -70,6 +110,7 @@ def insert_role_and_style(hwp, content_dict, styles, role):
         opts = base_opts.copy()
         opts["Bold"]   = seg.get("bold", base_opts["Bold"])
         opts["Italic"] = seg.get("italic", base_opts["Italic"])
+        opts["UnderlineType"] = 1 if seg.get("underline") else 0
         hwp.set_font(**opts)
         hwp.insert_text(seg["text"] if isinstance(seg, dict) else seg)
         hwp.set_font(**base_opts)
@@ -184,13 +225,30 @@ def set_current_cell_size(hwp, width_hu, height_hu):
 
 
 
-def generate_hwp_from_spec(spec, filename="output.hwpx"):
+def generate_hwp_from_spec(spec, filename="output.hwpx", profile=None):
     """
     spec 이 parsed_spec(json) 형식이면 `insert_paragraph_from_node` /
     `insert_table_and_style`를 사용하고,
     옛 role+styles 형식이면 insert_role_and_style을 사용한다.
+    profile(profiling.Profiler)을 넘기면 "generate/..." 단계와 Hwp 호출을 기록한다.
+    """
+    with stage(profile, "generate"):
+        with stage(profile, "hwp_start"):
+            from pyhwpx import Hwp
+            hwp = wrap_hwp(profile, Hwp())
+        with stage(profile, "render"):
+            render_spec(hwp, spec)
+        with stage(profile, "save"):
+            hwp.save_as(filename)
+        with stage(profile, "quit"):
+            hwp.quit()
+
+
+def render_spec(hwp, spec):
+    """
+    generate_hwp_from_spec 의 본문. 이미 떠 있는 hwp 의 현재 문서에 spec 을 그려 넣기만 하고
+    저장/종료는 하지 않는다 (hwpsession 에서 인스턴스를 재사용할 때 사용).
     """
-    hwp = Hwp()
     doc = spec.get("document", spec)
 
     # 첫 항목으로 스펙 형태 판별
@@ -200,8 +258,8 @@ def generate_hwp_from_spec(spec, filename="output.hwpx"):
     )
 
     if is_parsed:
-        # === 새 스펙 경로 (parser 출력) ===
-        for _, node in doc.items():
+        # === 새 스펙 경로 (parser 출력, 압축 형식 포함) ===
+        for _, node in iter_document(spec):
             # 표 블록
             if isinstance(node, dict) and isinstance(node.get("data"), list):
                 insert_table_and_style(
@@ -238,9 +296,6 @@ def generate_hwp_from_spec(spec, filename="output.hwpx"):
                     col_aligns=cell_aligns,
                 )
 
-    hwp.save_as(filename)
-    hwp.quit()
-
 
 def heuristic_style_for_key(key):
     # 예시: key가 'title', 'header'면 굵게, 크게 등
@@ -254,8 +309,6 @@ def heuristic_style_for_key(key):
     return {key: style_map.get(key, {"FaceName":"바탕체", "Height":11, "Bold":False, "Align":"left"})}
 
 
-from pyhwpx import Hwp
-
 def insert_paragraph_from_node(hwp, node):
     """
     node: {"content": str, "style": {...}, "segments": [...]}
@@ -297,12 +350,48 @@ def insert_paragraph_from_node(hwp, node):
     hwp.insert_text("\r\n")
 
 
-def generate_hwp_from_parsed_spec(spec, filename="output.hwpx"):
-    from pyhwpx import Hwp
-    hwp = Hwp()
-    doc = spec["document"]
-
-    for _, node in doc.items():
+def generate_hwp_from_parsed_spec(spec, filename="output.hwpx", backend="com", optimize=False, profile=None):
+    """
+    backend="com"    : pyhwpx(Hwp) 로 한글을 직접 조작해서 생성 (Windows + 한글 필요)
+    backend="native" : hwpxwriter 로 HWPX 패키지를 직접 씀 (한글 설치 불필요)
+    spec 은 dict 대신 (key, node) 이터레이터(specstream.read_spec_stream 등)여도 되고,
+    그 경우 노드를 하나씩 받아 그리므로 문서 전체를 메모리에 두지 않는다.
+    optimize=True 이면 (com) hwpproxy.StateTrackingHwp 로 중복 호출을 걸러내고
+    {"requested", "issued", "saved", "saved_by"} 호출 통계를 돌려준다 (saved_by: 종류별로 줄인 수).
+    profile(profiling.Profiler)을 넘기면 "generate/..." 단계와 (com) 실제로 한글에 보낸 호출을
+    메서드 이름별로 기록한다.
+    """
+    if backend == "native":
+        from hwpxwriter import write_hwpx_from_spec
+        with stage(profile, "generate"), stage(profile, "native_write"):
+            write_hwpx_from_spec(spec, filename)
+        return
+    if backend != "com":
+        raise ValueError(f"지원하지 않는 backend: {backend} (com/native만 지원)")
+
+    with stage(profile, "generate"):
+        with stage(profile, "hwp_start"):
+            from pyhwpx import Hwp
+            hwp = wrap_hwp(profile, Hwp())
+        if optimize:
+            from hwpproxy import StateTrackingHwp
+            hwp = StateTrackingHwp(hwp)
+        with stage(profile, "render"):
+            render_parsed_spec(hwp, spec)
+        with stage(profile, "save"):
+            hwp.save_as(filename)
+        with stage(profile, "quit"):
+            hwp.quit()
+    if optimize:
+        return hwp.stats()
+
+
+def render_parsed_spec(hwp, spec):
+    """
+    generate_hwp_from_parsed_spec 의 본문. 저장/종료는 호출한 쪽에서 한다.
+    spec 은 parsed_spec, 그 압축 형식(compactspec), (key, node) 이터레이터 모두 된다.
+    """
+    for _, node in iter_document(spec):
         if isinstance(node, dict) and isinstance(node.get("data"), list):
             # 표 블록
             insert_table_and_style(
@@ -319,6 +408,3 @@ def generate_hwp_from_parsed_spec(spec, filename="output.hwpx"):
         elif isinstance(node, dict) and ("content" in node or "segments" in node):
             insert_paragraph_from_node(hwp, node)
         # 기타 타입은 필요시 확장
-
-    hwp.save_as(filename)
-    hwp.quit()
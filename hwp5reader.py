@@ -0,0 +1,661 @@
+import io
+import re
+import sys
+import zlib
+import struct
+import zipfile
+from array import array
+from xml.sax.saxutils import escape, quoteattr
+
+from hwpxzip import RawZipBuilder
+
+# HWP 5.0(.hwp) 을 한글(COM) 없이 직접 읽는다.
+# .hwp 는 OLE 복합 문서(CFB) 안에 FileHeader / DocInfo / BodyText/SectionN 스트림이 들어 있고,
+# 압축 문서면 DocInfo 와 Section 스트림이 zlib(raw deflate)로 압축되어 있다.
+# 스트림 안은 (태그, 수준, 크기) 머리를 가진 레코드의 나열이다.
+#
+# 읽은 내용은 parser 가 .hwpx 에서 보는 모양 그대로의 header.xml / sectionN.xml 로 옮긴다
+# (parser 가 쓰는 요소/속성만). 그래서 모양 표와 block 은 parser 의 기존 함수가 똑같이 만들고,
+# .hwpx 를 한글로 저장했을 때와 같은 결과가 나온다. 옮기는 규칙:
+#   - 글꼴(한글), 글자 모양(크기/진하게/한글 글꼴), 문단 모양(정렬), 테두리/배경(면색/무늬색/그러데이션)
+#   - 문단: 글자 모양이 바뀌는 위치마다 hp:run, 글자는 hp:t. 탭/줄바꿈 등은 hp:t 의 자식 요소로
+#     넣고 뒤 글자는 그 tail 로 (.hwpx 와 같게 parser 는 탭 뒤 글자를 문단 글자로 보지 않는다)
+#   - 표: hp:tbl / hp:caption / hp:tr / hp:tc(subList, cellAddr, cellSpan, cellSz)
+#   - 머리말/꼬리말/각주/글상자 등 문단을 가진 다른 개체: hp:ctrl/hp:subList 아래 문단으로
+#
+#   with open_hwp_as_hwpx("old.hwp") as zf:        # 메모리 위의 .hwpx (zipfile.ZipFile)
+#       styles = parser.parse_header(zf)
+#
+# 암호 문서와 배포용 문서는 본문이 암호화되어 있어 읽지 않는다 (HwpUnsupported).
+# parser.open_hwpx 는 이때 한글(COM) 변환으로 넘어간다.
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+HWP_SIGNATURE = b"HWP Document File"
+
+MAXREGSECT = 0xFFFFFFFA     # 이보다 큰 섹터 번호는 사슬 끝/빈 섹터 같은 표시
+NOSTREAM = 0xFFFFFFFF
+
+DIR_STORAGE = 1
+DIR_STREAM = 2
+DIR_ROOT = 5
+
+# FileHeader 속성
+FLAG_COMPRESSED = 0x1
+FLAG_PASSWORD = 0x2
+FLAG_DISTRIBUTE = 0x4
+
+# 레코드 태그 (HWPTAG_BEGIN = 0x10)
+TAG_ID_MAPPINGS = 0x11
+TAG_FACE_NAME = 0x13
+TAG_BORDER_FILL = 0x14
+TAG_CHAR_SHAPE = 0x15
+TAG_PARA_SHAPE = 0x19
+TAG_PARA_HEADER = 0x42
+TAG_PARA_TEXT = 0x43
+TAG_PARA_CHAR_SHAPE = 0x44
+TAG_CTRL_HEADER = 0x47
+TAG_LIST_HEADER = 0x48
+TAG_TABLE = 0x4D
+
+# ID_MAPPINGS 의 개수 배열에서 한글 글꼴 수의 자리 (0: 그림 데이터)
+IDMAP_HANGUL_FONTS = 1
+
+
+def _ctrl_id(name):
+    """'tbl ' 같은 4글자 개체 id -> CTRL_HEADER 첫 4바이트(UINT32) 값"""
+    a, b, c, d = name.encode("ascii")
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+CTRL_TABLE = _ctrl_id("tbl ")
+CTRL_SECTION = _ctrl_id("secd")   # 구역 정의 (쪽 설정, 바탕쪽) — 본문 문단이 아니다
+
+# 문단 글자(PARA_TEXT)의 제어 문자. char 는 WCHAR 1개, inline/extended 는 WCHAR 8개를 차지한다.
+# extended 는 문단의 CTRL_HEADER 자식과 순서대로 짝이 맞는다.
+INLINE_CHARS = frozenset((4, 5, 6, 7, 8, 9, 19, 20))
+EXTENDED_CHARS = frozenset((1, 2, 3, 11, 12, 14, 15, 16, 17, 18, 21, 22, 23))
+CHAR_FIELD_END = 4
+# hp:t 안에 자식 요소로 들어가는 문자
+SPECIAL_CHAR_TAGS = {9: "tab", 10: "lineBreak", 24: "hyphen", 30: "nbSpace", 31: "fwSpace"}
+
+# UTF-16LE 에서 제어 문자(0~31) 하나. 짝수 위치에서 맞은 것만 쓴다.
+CONTROL_RE = re.compile(rb"[\x00-\x1f]\x00")
+
+ALIGNS = ["JUSTIFY", "LEFT", "RIGHT", "CENTER", "DISTRIBUTE", "DISTRIBUTE_SPACE"]
+
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>'
+NS_DECL = (
+    'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph" '
+    'xmlns:hs="http://www.hancom.co.kr/hwpml/2011/section" '
+    'xmlns:hc="http://www.hancom.co.kr/hwpml/2011/core" '
+    'xmlns:hh="http://www.hancom.co.kr/hwpml/2011/head"'
+)
+
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+I32 = struct.Struct("<i")
+
+
+class HwpUnsupported(ValueError):
+    """읽을 수 없는 종류의 .hwp (암호/배포용 문서, HWP 3.x 등)"""
+
+
+# 1) OLE 복합 문서 ---------------------------------------------------------------
+
+class OleFile:
+    """
+    CFB(OLE2) 파일에서 스트림을 경로("BodyText/Section0")로 꺼낸다. 읽기 전용, 파일 전체를 메모리에.
+    """
+
+    def __init__(self, data):
+        if data[:8] != OLE_SIGNATURE:
+            raise HwpUnsupported("OLE 복합 문서가 아님 (HWP 5.0 이전 문서이거나 .hwp 가 아님)")
+        self.data = data
+        major = U16.unpack_from(data, 0x1A)[0]
+        self.sector_size = 1 << U16.unpack_from(data, 0x1E)[0]
+        self.mini_sector_size = 1 << U16.unpack_from(data, 0x20)[0]
+        n_fat, dir_start = struct.unpack_from("<II", data, 0x2C)
+        self.mini_cutoff, mini_fat_start, n_mini_fat, difat_start, n_difat = \
+            struct.unpack_from("<IIIII", data, 0x38)
+        self.wide_sizes = major >= 4
+
+        # FAT 섹터 목록: 헤더의 109개 + DIFAT 섹터 사슬
+        fat_sectors = list(struct.unpack_from("<109I", data, 0x4C))
+        per_sector = self.sector_size // 4
+        sid = difat_start
+        for _ in range(n_difat):
+            if sid > MAXREGSECT:
+                break
+            entries = struct.unpack_from(f"<{per_sector}I", data, self._offset(sid))
+            fat_sectors.extend(entries[:-1])
+            sid = entries[-1]
+        fat = array("I")
+        for sid in fat_sectors[:n_fat]:
+            fat.frombytes(self._sector(sid))
+        if sys.byteorder == "big":
+            fat.byteswap()
+        self.fat = fat
+
+        self.dir_data = self._read_chain(dir_start, self.fat, self._sector)
+        root = self._dir_entry(0)
+        mini_fat = array("I")
+        if n_mini_fat and mini_fat_start <= MAXREGSECT:
+            mini_fat.frombytes(self._read_chain(mini_fat_start, self.fat, self._sector))
+            if sys.byteorder == "big":
+                mini_fat.byteswap()
+        self.mini_fat = mini_fat
+        self.mini_stream = self._read_chain(root[2], self.fat, self._sector, root[3]) \
+            if root[3] else b""
+        self.entries = {}   # 경로 -> (종류, 시작 섹터, 크기)
+        self._collect(root[4], "")
+
+    def _offset(self, sid):
+        return (sid + 1) * self.sector_size
+
+    def _sector(self, sid):
+        start = self._offset(sid)
+        return self.data[start:start + self.sector_size]
+
+    def _mini_sector(self, sid):
+        start = sid * self.mini_sector_size
+        return self.mini_stream[start:start + self.mini_sector_size]
+
+    @staticmethod
+    def _read_chain(start, fat, read, size=None):
+        parts = []
+        sid = start
+        limit = len(fat)
+        while sid < limit and len(parts) <= limit:
+            parts.append(read(sid))
+            sid = fat[sid]
+        data = b"".join(parts)
+        return data if size is None else data[:size]
+
+    def _dir_entry(self, i):
+        """i 번째 디렉터리 항목 -> (이름, 종류, 시작 섹터, 크기, 자식)"""
+        base = i * 128
+        raw = self.dir_data[base:base + 128]
+        if len(raw) < 128:
+            return None
+        name_len = U16.unpack_from(raw, 64)[0]
+        name = raw[:max(name_len - 2, 0)].decode("utf-16-le", errors="replace")
+        kind = raw[66]
+        start, = U32.unpack_from(raw, 116)
+        size, size_hi = struct.unpack_from("<II", raw, 120)
+        if self.wide_sizes:
+            size |= size_hi << 32
+        child, = U32.unpack_from(raw, 76)
+        return name, kind, start, size, child
+
+    def _collect(self, i, prefix):
+        # 한 저장소의 자식들은 이진 트리(left/right)로 이어져 있다
+        stack = [i]
+        seen = set()
+        while stack:
+            i = stack.pop()
+            if i == NOSTREAM or i in seen:
+                continue
+            seen.add(i)
+            entry = self._dir_entry(i)
+            if entry is None:
+                continue
+            left, right = struct.unpack_from("<II", self.dir_data, i * 128 + 68)
+            stack.extend((left, right))
+            name, kind, start, size, child = entry
+            path = prefix + name
+            self.entries[path] = (kind, start, size)
+            if kind == DIR_STORAGE:
+                self._collect(child, path + "/")
+
+    def listdir(self, storage):
+        """저장소 바로 아래 스트림 이름들"""
+        prefix = storage + "/"
+        return [path[len(prefix):] for path, (kind, _, _) in self.entries.items()
+                if kind == DIR_STREAM and path.startswith(prefix) and "/" not in path[len(prefix):]]
+
+    def exists(self, path):
+        return path in self.entries
+
+    def read(self, path):
+        try:
+            kind, start, size = self.entries[path]
+        except KeyError:
+            raise KeyError(f"스트림이 없음: {path}") from None
+        if size < self.mini_cutoff:
+            return self._read_chain(start, self.mini_fat, self._mini_sector, size)
+        return self._read_chain(start, self.fat, self._sector, size)
+
+
+# 2) 레코드 ---------------------------------------------------------------------
+
+def iter_records(data):
+    """
+    스트림 바이트 -> (태그, 수준, 내용) 을 차례로.
+    머리 UINT32: 태그 10비트, 수준 10비트, 크기 12비트 (0xFFF 면 다음 UINT32 가 크기)
+    """
+    pos = 0
+    end = len(data)
+    while pos + 4 <= end:
+        header, = U32.unpack_from(data, pos)
+        pos += 4
+        tag = header & 0x3FF
+        level = (header >> 10) & 0x3FF
+        size = header >> 20
+        if size == 0xFFF:
+            size, = U32.unpack_from(data, pos)
+            pos += 4
+        yield tag, level, data[pos:pos + size]
+        pos += size
+
+
+class Record:
+    """레코드 하나와 그 자식들 (수준이 하나 깊은 바로 뒤 레코드들)"""
+    __slots__ = ("tag", "level", "payload", "children")
+
+    def __init__(self, tag, level, payload):
+        self.tag = tag
+        self.level = level
+        self.payload = payload
+        self.children = []
+
+
+def record_tree(data):
+    """스트림 바이트 -> 최상위 Record 리스트"""
+    roots = []
+    stack = []
+    for tag, level, payload in iter_records(data):
+        rec = Record(tag, level, payload)
+        while stack and stack[-1].level >= level:
+            stack.pop()
+        (stack[-1].children if stack else roots).append(rec)
+        stack.append(rec)
+    return roots
+
+
+# 3) DocInfo -> header.xml --------------------------------------------------------
+# 트리를 만들지 않고 hwpxwriter 처럼 문자열로 바로 쓴다.
+
+def colorref(value):
+    """COLORREF(0x00BBGGRR) -> "#RRGGBB" (윗 바이트가 있으면 한글처럼 "#AARRGGBB")"""
+    r, g, b, a = value & 0xFF, (value >> 8) & 0xFF, (value >> 16) & 0xFF, value >> 24
+    if a:
+        return f"#{a:02X}{r:02X}{g:02X}{b:02X}"
+    return f"#{r:02X}{g:02X}{b:02X}"
+
+
+def _face_name(payload):
+    n, = U16.unpack_from(payload, 1)
+    return payload[3:3 + n * 2].decode("utf-16-le", errors="replace")
+
+
+def _border_fill_xml(out, bid, payload):
+    out.append(f'<hh:borderFill id="{bid}">')
+    pos = 32                      # UINT16 속성 + 테두리선 5개(왼/오/위/아래/대각선) x 6바이트
+    fill_type = U32.unpack_from(payload, pos)[0] if len(payload) >= pos + 4 else 0
+    pos += 4
+    if fill_type & 0x5:
+        out.append("<hc:fillBrush>")
+        if fill_type & 0x1:       # 단색/무늬
+            face, hatch = struct.unpack_from("<II", payload, pos)
+            pos += 12
+            face = "none" if face == 0xFFFFFFFF else colorref(face)
+            out.append(f'<hc:winBrush faceColor="{face}" hatchColor="{colorref(hatch)}"/>')
+        if fill_type & 0x2:       # 그림: 채우기 유형 BYTE + 그림 정보 5바이트 (뒤에 올 그러데이션 위치만 맞춘다)
+            pos += 1 + 5
+        if fill_type & 0x4:       # 그러데이션: 유형 BYTE, 기울임/중심 x,y/번짐 INT32, 색 수, (위치), 색
+            pos += 1 + 16
+            n, = U32.unpack_from(payload, pos)
+            pos += 4
+            if n > 2:
+                pos += 4 * n
+            out.append("<hc:gradation>")
+            for _ in range(n):
+                if pos + 4 > len(payload):
+                    break
+                out.append(f'<hc:color value="{colorref(U32.unpack_from(payload, pos)[0])}"/>')
+                pos += 4
+            out.append("</hc:gradation>")
+        out.append("</hc:fillBrush>")
+    out.append("</hh:borderFill>")
+
+
+def _char_shape_xml(out, cid, payload):
+    hangul_font, = U16.unpack_from(payload, 0)
+    height, = I32.unpack_from(payload, 42)
+    flags, = U32.unpack_from(payload, 46)
+    bold = "<hh:bold/>" if flags & 0x2 else ""
+    out.append(f'<hh:charPr id="{cid}" height="{height}"><hh:fontRef hangul="{hangul_font}"/>{bold}</hh:charPr>')
+
+
+def _para_shape_xml(out, pid, payload):
+    flags, = U32.unpack_from(payload, 0)
+    align = (flags >> 2) & 0x7
+    align = ALIGNS[align] if align < len(ALIGNS) else "JUSTIFY"
+    out.append(f'<hh:paraPr id="{pid}"><hh:align horizontal="{align}"/></hh:paraPr>')
+
+
+def header_xml(docinfo):
+    """DocInfo 스트림(압축 푼 바이트) -> parser.styles_from_header_root 가 읽는 header.xml (bytes)"""
+    fonts, border_fills, char_props, para_props = [], [], [], []
+    n_hangul = None
+    n_face = n_border = n_char = n_para = 0
+    for tag, _, payload in iter_records(docinfo):
+        if tag == TAG_ID_MAPPINGS:
+            n_hangul = U32.unpack_from(payload, IDMAP_HANGUL_FONTS * 4)[0]
+        elif tag == TAG_FACE_NAME:
+            # 글꼴은 언어별로 한글, 영문, 한자... 순서로 이어진다. 앞의 한글 글꼴만 쓴다.
+            if n_hangul is None or n_face < n_hangul:
+                fonts.append(f'<hh:font id="{n_face}" face={quoteattr(_face_name(payload))}/>')
+            n_face += 1
+        elif tag == TAG_BORDER_FILL:
+            n_border += 1           # 테두리/배경 id 는 1부터
+            _border_fill_xml(border_fills, n_border, payload)
+        elif tag == TAG_CHAR_SHAPE:
+            _char_shape_xml(char_props, n_char, payload)
+            n_char += 1
+        elif tag == TAG_PARA_SHAPE:
+            _para_shape_xml(para_props, n_para, payload)
+            n_para += 1
+    return "".join([
+        XML_HEAD, f"<hh:head {NS_DECL}><hh:refList>",
+        '<hh:fontfaces><hh:fontface lang="HANGUL">', *fonts, "</hh:fontface></hh:fontfaces>",
+        "<hh:borderFills>", *border_fills, "</hh:borderFills>",
+        "<hh:charProperties>", *char_props, "</hh:charProperties>",
+        "<hh:paraProperties>", *para_props, "</hh:paraProperties>",
+        "</hh:refList></hh:head>",
+    ]).encode("utf-8")
+
+
+# 4) BodyText/SectionN -> sectionN.xml ----------------------------------------------
+
+def _text_tokens(payload):
+    """
+    PARA_TEXT 내용 -> (위치, 글자 바이트 또는 None, 제어 문자 코드 또는 None) 을 차례로.
+    위치는 WCHAR 단위 (PARA_CHAR_SHAPE 의 위치와 같은 단위). 글자는 UTF-16LE 그대로 돌려주므로
+    잘라 쓸 때도 WCHAR 단위(2바이트)로 자른다.
+    """
+    pos = 0
+    end = len(payload)
+    while pos < end:
+        m = CONTROL_RE.search(payload, pos)
+        while m is not None and m.start() & 1:
+            m = CONTROL_RE.search(payload, m.start() + 1)
+        stop = m.start() if m is not None else end
+        if stop > pos:
+            yield pos // 2, payload[pos:stop], None
+        if m is None:
+            return
+        code = payload[stop]
+        yield stop // 2, None, code
+        pos = stop + (16 if code in INLINE_CHARS or code in EXTENDED_CHARS else 2)
+
+
+def _text_xml(raw):
+    return escape(raw.decode("utf-16-le", errors="replace"))
+
+
+class _ParagraphWriter:
+    """
+    문단 하나의 hp:run / hp:t 를 out 에 쓴다. 글자 모양이 바뀌는 위치마다 새 hp:run 을 연다.
+    탭 같은 문자는 열린 hp:t 안에 요소로 쓰고, 뒤 글자는 같은 hp:t 에 이어 쓴다 (XML 에서 tail).
+    """
+
+    def __init__(self, out, shape_starts):
+        self.out = out
+        self.shape_starts = shape_starts    # [(위치, 글자 모양 id)] 위치 순
+        self.next_shape = 0
+        self.in_run = False
+        self.in_t = False
+
+    def at(self, pos):
+        """pos 에서 시작하는 글자 모양이 있으면 run 을 바꾼다."""
+        starts = self.shape_starts
+        shape = None
+        while self.next_shape < len(starts) and starts[self.next_shape][0] <= pos:
+            shape = starts[self.next_shape][1]
+            self.next_shape += 1
+        if shape is None:
+            if self.in_run:
+                return
+            shape = starts[0][1] if starts else 0
+        self.close_run()
+        self.out.append(f'<hp:run charPrIDRef="{shape}">')
+        self.in_run = True
+
+    def next_boundary(self):
+        starts = self.shape_starts
+        return starts[self.next_shape][0] if self.next_shape < len(starts) else None
+
+    def _open_t(self):
+        if not self.in_t:
+            self.out.append("<hp:t>")
+            self.in_t = True
+
+    def text(self, text):
+        self._open_t()
+        self.out.append(text)
+
+    def special(self, name):
+        self._open_t()
+        self.out.append(f"<hp:{name}/>")
+
+    def close_text(self):
+        if self.in_t:
+            self.out.append("</hp:t>")
+            self.in_t = False
+
+    def close_run(self):
+        self.close_text()
+        if self.in_run:
+            self.out.append("</hp:run>")
+            self.in_run = False
+
+
+def _paragraph_xml(out, rec):
+    """PARA_HEADER Record -> hp:p"""
+    para_shape, = U16.unpack_from(rec.payload, 8)
+    text = None
+    shape_starts = []
+    ctrls = []
+    for child in rec.children:
+        if child.tag == TAG_PARA_TEXT:
+            text = child.payload
+        elif child.tag == TAG_PARA_CHAR_SHAPE:
+            shape_starts = list(struct.iter_unpack("<II", child.payload[:len(child.payload) // 8 * 8]))
+        elif child.tag == TAG_CTRL_HEADER:
+            ctrls.append(child)
+
+    out.append(f'<hp:p paraPrIDRef="{para_shape}">')
+    writer = _ParagraphWriter(out, shape_starts)
+    writer.at(0)
+    ctrl_iter = iter(ctrls)
+    if text is not None:
+        for pos, chunk, code in _text_tokens(text):
+            if chunk is not None:
+                # 글 중간에서 글자 모양이 바뀌면 잘라서 run 을 나눈다
+                while chunk:
+                    writer.at(pos)
+                    boundary = writer.next_boundary()
+                    if boundary is None or boundary >= pos + len(chunk) // 2:
+                        writer.text(_text_xml(chunk))
+                        break
+                    cut = (boundary - pos) * 2
+                    writer.text(_text_xml(chunk[:cut]))
+                    pos, chunk = boundary, chunk[cut:]
+                continue
+            writer.at(pos)
+            if code in SPECIAL_CHAR_TAGS:
+                writer.special(SPECIAL_CHAR_TAGS[code])
+            elif code in EXTENDED_CHARS:
+                writer.close_text()
+                ctrl = next(ctrl_iter, None)
+                if ctrl is not None:
+                    _control_xml(out, ctrl)
+            elif code == CHAR_FIELD_END:
+                writer.close_text()
+    # 글자에서 자리를 못 찾은 개체도 문단 끝에 붙여 둔다
+    writer.close_text()
+    for ctrl in ctrl_iter:
+        _control_xml(out, ctrl)
+    writer.close_run()
+    out.append("</hp:p>")
+
+
+def _control_xml(out, rec):
+    ctrl_id, = U32.unpack_from(rec.payload, 0)
+    if ctrl_id == CTRL_TABLE:
+        _table_xml(out, rec)
+    elif ctrl_id != CTRL_SECTION:
+        # 머리말/꼬리말/각주/글상자 등: 안쪽 문단들을 subList 로 (parser.walk 가 문단으로 내보낸다)
+        paragraphs = _nested_paragraphs(rec)
+        out.append("<hp:ctrl>")
+        if paragraphs:
+            out.append("<hp:subList>")
+            for para in paragraphs:
+                _paragraph_xml(out, para)
+            out.append("</hp:subList>")
+        out.append("</hp:ctrl>")
+
+
+def _nested_paragraphs(rec):
+    """개체 레코드 아래(도형 요소 안 포함)의 문단 레코드들. 문단 안으로는 더 내려가지 않는다."""
+    found = []
+    stack = list(reversed(rec.children))
+    while stack:
+        child = stack.pop()
+        if child.tag == TAG_PARA_HEADER:
+            found.append(child)
+        else:
+            stack.extend(reversed(child.children))
+    return found
+
+
+def _table_xml(out, rec):
+    """
+    표 개체: [캡션 LIST_HEADER + 문단들] TABLE, 그 뒤로 셀마다 LIST_HEADER + 문단들.
+    캡션은 .hwpx 처럼 hp:caption 으로 두므로 block 에는 들어가지 않고 글자 추출(--text)에만 나온다.
+    셀은 행 주소로 묶어 hp:tr 로 만든다.
+    """
+    table = None
+    caption = []        # 캡션 문단 레코드
+    cells = []          # [(행, LIST_HEADER 내용, [문단 레코드])]
+    for child in rec.children:
+        if child.tag == TAG_TABLE:
+            table = child
+        elif table is None:
+            if child.tag == TAG_PARA_HEADER:
+                caption.append(child)
+        elif child.tag == TAG_LIST_HEADER:
+            cells.append((U16.unpack_from(child.payload, 10)[0], child.payload, []))
+        elif child.tag == TAG_PARA_HEADER and cells:
+            cells[-1][2].append(child)
+    if table is None:
+        return
+
+    rows, cols = struct.unpack_from("<HH", table.payload, 4)
+    out.append(f'<hp:tbl rowCnt="{rows}" colCnt="{cols}">')
+    if caption:
+        out.append("<hp:caption><hp:subList>")
+        for para in caption:
+            _paragraph_xml(out, para)
+        out.append("</hp:subList></hp:caption>")
+    by_row = {}
+    for row, header, paragraphs in cells:
+        by_row.setdefault(row, []).append((header, paragraphs))
+    for row in sorted(by_row):
+        out.append("<hp:tr>")
+        for header, paragraphs in by_row[row]:
+            col, row_addr, col_span, row_span = struct.unpack_from("<4H", header, 8)
+            width, height = struct.unpack_from("<ii", header, 16)
+            border_fill, = U16.unpack_from(header, 32)
+            out.append(f'<hp:tc borderFillIDRef="{border_fill}"><hp:subList>')
+            for para in paragraphs:
+                _paragraph_xml(out, para)
+            out.append(
+                f'</hp:subList><hp:cellAddr colAddr="{col}" rowAddr="{row_addr}"/>'
+                f'<hp:cellSpan colSpan="{col_span}" rowSpan="{row_span}"/>'
+                f'<hp:cellSz width="{width}" height="{height}"/></hp:tc>'
+            )
+        out.append("</hp:tr>")
+    out.append("</hp:tbl>")
+
+
+def section_xml(section):
+    """BodyText/SectionN 스트림(압축 푼 바이트) -> sectionN.xml (bytes)"""
+    out = [XML_HEAD, f"<hs:sec {NS_DECL}>"]
+    for rec in record_tree(section):
+        if rec.tag == TAG_PARA_HEADER:
+            _paragraph_xml(out, rec)
+    out.append("</hs:sec>")
+    return "".join(out).encode("utf-8")
+
+
+# 5) 문서 --------------------------------------------------------------------------
+
+SECTION_STREAM_RE = re.compile(r"Section(\d+)$")
+
+
+class Hwp5Document:
+    """
+    .hwp 하나. 스트림은 필요할 때 꺼내 압축을 푼다.
+    - version: (주, 부, 빌드, 수정) 예: (5, 0, 3, 4)
+    - compressed: DocInfo/Section 이 압축되어 있는지
+    - sections: BodyText 안의 구역 스트림 이름 (번호 순)
+    """
+
+    def __init__(self, path_or_bytes):
+        if isinstance(path_or_bytes, (bytes, bytearray, memoryview)):
+            data = bytes(path_or_bytes)
+        else:
+            with open(path_or_bytes, "rb") as f:
+                data = f.read()
+        self.ole = OleFile(data)
+        if not self.ole.exists("FileHeader"):
+            raise HwpUnsupported("FileHeader 스트림이 없음")
+        header = self.ole.read("FileHeader")
+        if not header.startswith(HWP_SIGNATURE):
+            raise HwpUnsupported("HWP 문서가 아님")
+        version, flags = struct.unpack_from("<II", header, 32)
+        self.version = (version >> 24, (version >> 16) & 0xFF, (version >> 8) & 0xFF, version & 0xFF)
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        if flags & FLAG_PASSWORD:
+            raise HwpUnsupported("암호가 걸린 문서")
+        if flags & FLAG_DISTRIBUTE:
+            raise HwpUnsupported("배포용 문서")
+        numbered = []
+        for name in self.ole.listdir("BodyText"):
+            m = SECTION_STREAM_RE.match(name)
+            if m:
+                numbered.append((int(m.group(1)), "BodyText/" + name))
+        self.sections = [name for _, name in sorted(numbered)]
+
+    def stream(self, path):
+        data = self.ole.read(path)
+        return zlib.decompress(data, -15) if self.compressed else data
+
+    def header_xml(self):
+        return header_xml(self.stream("DocInfo"))
+
+    def section_xml(self, name):
+        return section_xml(self.stream(name))
+
+
+def hwp_to_hwpx_bytes(path_or_bytes, compress=False):
+    """
+    .hwp -> parser 가 읽을 수 있는 .hwpx(zip) 바이트.
+    mimetype, Contents/header.xml, Contents/sectionN.xml 만 들어 있다 (한글로 여는 용도가 아님).
+    메모리에서 바로 읽을 것이면 압축하지 않는 편이 빠르다.
+    """
+    doc = Hwp5Document(path_or_bytes)
+    z = RawZipBuilder()
+    z.add_bytes("mimetype", b"application/hwp+zip", compress=False)
+    z.add_bytes("Contents/header.xml", doc.header_xml(), compress=compress)
+    for i, name in enumerate(doc.sections):
+        z.add_bytes(f"Contents/section{i}.xml", doc.section_xml(name), compress=compress)
+    return z.getvalue()
+
+
+def open_hwp_as_hwpx(path_or_bytes):
+    """.hwp -> 메모리 위의 .hwpx 를 연 zipfile.ZipFile"""
+    return zipfile.ZipFile(io.BytesIO(hwp_to_hwpx_bytes(path_or_bytes)), "r")
+
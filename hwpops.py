@@ -0,0 +1,551 @@
+import copy
+import hashlib
+import json
+from collections import OrderedDict, Counter
+
+from compactspec import iter_document
+from doclib import hex_to_rgb, parse_segments, heuristic_style_for_key
+
+# {"document": ...} spec 을 평평한 연산(op) 목록으로 컴파일하고, 그 목록을
+# Hwp(COM) / 네이티브 HWPX writer / 비용 계산용 stub 중 하나로 실행한다.
+#
+# op 는 JSON 으로 그대로 저장할 수 있는 dict 이다.
+#   {"op": "set_char_shape", "style": {"FaceName", "Height", "Bold", ["Italic", "UnderlineType"]}}
+#   {"op": "insert_text", "text": str}
+#   {"op": "set_para_align", "align": "left|center|right|justify"}
+#   {"op": "create_table", "rows", "cols", "row_lengths", "merges"}
+#   {"op": "set_cell_align", "align": "left|center|right"}
+#   {"op": "set_cell_bg", "color": "#RRGGBB" 또는 원래 값}
+#   {"op": "move_cell", "moves": ["right"|"left"|"down"|"up", ...], "row", "col"}
+#   {"op": "end_table", "nested": bool}
+#
+# HwpExecutor 로 최적화하지 않은 목록을 실행하면 doclib.render_spec 과 똑같은 순서로
+# Hwp 메서드가 호출된다.
+
+MOVE_CALLS = {
+    "right": "TableRightCell",
+    "left": "TableLeftCell",
+    "down": "TableLowerCell",
+    "up": "TableUpperCell",
+}
+PARA_ALIGN_CALLS = {
+    "left": "ParagraphShapeAlignLeft",
+    "center": "ParagraphShapeAlignCenter",
+    "right": "ParagraphShapeAlignRight",
+    "justify": "ParagraphShapeAlignJustify",
+}
+CELL_ALIGN_CALLS = {
+    "left": "TableCellAlignLeftCenter",
+    "center": "TableCellAlignCenterCenter",
+    "right": "TableCellAlignRightCenter",
+}
+
+
+# --- 컴파일 -------------------------------------------------------------------
+
+def compile_spec(spec):
+    """doclib.render_spec 과 같은 규칙으로 spec 을 op 목록으로 바꾼다."""
+    ops = []
+    doc = spec.get("document", spec)
+
+    first_val = next(iter(doc.values()))
+    is_parsed = isinstance(first_val, dict) and (
+        "content" in first_val or "data" in first_val
+    )
+
+    if is_parsed:
+        for _, node in iter_document(spec):
+            if isinstance(node, dict) and isinstance(node.get("data"), list):
+                _compile_table(
+                    ops,
+                    node["data"],
+                    cell_styles=node.get("cell_styles"),
+                    col_aligns=node.get("style", {}).get("cell_align"),
+                    cell_segments=node.get("cell_segments"),
+                    cell_merges=node.get("cell_merges"),
+                    cell_nested=node.get("cell_nested"),
+                )
+            elif isinstance(node, dict) and ("content" in node or "segments" in node):
+                _compile_paragraph(ops, node)
+    else:
+        for key, value in doc.items():
+            if isinstance(value, str) or (isinstance(value, dict) and "content" in value):
+                text = value if isinstance(value, str) else value["content"]
+                styles = heuristic_style_for_key(key)
+                _compile_role(ops, text, styles[key])
+            elif isinstance(value, dict) and "data" in value:
+                table_style = value.get("style", {})
+                cols = len(value["data"][0])
+                _compile_table(
+                    ops,
+                    value["data"],
+                    cell_bg_colors=[[table_style.get("header_bg")] * cols]
+                                   + [[None] * cols] * (len(value["data"]) - 1),
+                    col_aligns=table_style.get("cell_align"),
+                )
+    return ops
+
+
+def _compile_role(ops, text, style):
+    base_opts = {
+        "FaceName": style["FaceName"],
+        "Height": style["Height"],
+        "Bold": style["Bold"],
+        "Italic": False,
+        "UnderlineType": 0,
+    }
+    if style["Align"] in PARA_ALIGN_CALLS:
+        ops.append({"op": "set_para_align", "align": style["Align"]})
+    for seg in parse_segments(text):
+        opts = base_opts.copy()
+        opts["Bold"] = seg.get("bold", base_opts["Bold"])
+        opts["Italic"] = seg.get("italic", base_opts["Italic"])
+        opts["UnderlineType"] = 1 if seg.get("underline") else 0
+        ops.append({"op": "set_char_shape", "style": opts})
+        ops.append({"op": "insert_text", "text": seg["text"]})
+        ops.append({"op": "set_char_shape", "style": dict(base_opts)})
+    ops.append({"op": "insert_text", "text": "\r\n"})
+
+
+def _compile_paragraph(ops, node):
+    node_style = node.get("style", {})
+    segments = node.get("segments") or []
+    if segments:
+        for seg in segments:
+            s_style = seg.get("style", {})
+            ops.append({"op": "set_char_shape", "style": {
+                "FaceName": s_style.get("FaceName", node_style.get("FaceName", "바탕체")),
+                "Height": s_style.get("Height", node_style.get("Height", 11)),
+                "Bold": s_style.get("Bold", node_style.get("Bold", False)),
+            }})
+            ops.append({"op": "insert_text", "text": seg.get("text", "")})
+    else:
+        ops.append({"op": "set_char_shape", "style": {
+            "FaceName": node_style.get("FaceName", "바탕체"),
+            "Height": node_style.get("Height", 11),
+            "Bold": node_style.get("Bold", False),
+        }})
+        ops.append({"op": "insert_text", "text": node.get("content", "")})
+
+    align = node_style.get("Align", "left")
+    ops.append({"op": "set_para_align", "align": align if align in PARA_ALIGN_CALLS else "left"})
+    ops.append({"op": "insert_text", "text": "\r\n"})
+
+
+def _compile_table(ops, table_data, cell_styles=None, cell_bg_colors=None, col_aligns=None,
+                   cell_segments=None, cell_merges=None, cell_nested=None, nested=False):
+    rows, cols = len(table_data), len(table_data[0])
+    ops.append({
+        "op": "create_table",
+        "rows": rows,
+        "cols": cols,
+        "row_lengths": [len(row) for row in table_data],
+        "merges": cell_merges,
+    })
+
+    for r_idx, row in enumerate(table_data):
+        for c_idx, _ in enumerate(row):
+            base_style = cell_styles[r_idx][c_idx] if cell_styles else {}
+            segs = (cell_segments and cell_segments[r_idx][c_idx]) or None
+            merge_info = (cell_merges and cell_merges[r_idx][c_idx]) or {}
+            nested_tbls = (cell_nested and cell_nested[r_idx][c_idx]) or []
+
+            align = col_aligns[c_idx] if col_aligns else "left"
+            ops.append({"op": "set_cell_align", "align": align if align in CELL_ALIGN_CALLS else "left"})
+
+            bg = merge_info.get("bgColor")
+            if bg is None and cell_bg_colors:
+                bg = cell_bg_colors[r_idx][c_idx]
+            if bg:
+                ops.append({"op": "set_cell_bg", "color": bg})
+
+            if segs:
+                for seg in segs:
+                    s = seg.get("style", {})
+                    ops.append({"op": "set_char_shape", "style": {
+                        "FaceName": s.get("FaceName", base_style.get("FaceName", "바탕체")),
+                        "Height": s.get("Height", base_style.get("Height", 11)),
+                        "Bold": s.get("Bold", base_style.get("Bold", False)),
+                    }})
+                    ops.append({"op": "insert_text", "text": seg.get("text", "")})
+            else:
+                ops.append({"op": "set_char_shape", "style": {
+                    "FaceName": base_style.get("FaceName", "바탕체"),
+                    "Height": base_style.get("Height", 11),
+                    "Bold": base_style.get("Bold", False),
+                }})
+                ops.append({"op": "insert_text", "text": str(table_data[r_idx][c_idx])})
+
+            for inner in nested_tbls:
+                ops.append({"op": "insert_text", "text": "\r\n"})
+                _compile_table(
+                    ops,
+                    inner["data"],
+                    cell_styles=inner.get("cell_styles"),
+                    cell_segments=inner.get("cell_segments"),
+                    cell_merges=inner.get("cell_merges"),
+                    cell_nested=inner.get("cell_nested"),
+                    nested=True,
+                )
+
+            if c_idx < cols - 1:
+                ops.append({"op": "move_cell", "moves": ["right"], "row": r_idx, "col": c_idx + 1})
+        if r_idx < rows - 1:
+            ops.append({
+                "op": "move_cell",
+                "moves": ["down"] + ["left"] * (cols - 1),
+                "row": r_idx + 1,
+                "col": 0,
+            })
+
+    ops.append({"op": "end_table", "nested": nested})
+
+
+# --- 캐시 ---------------------------------------------------------------------
+
+_OPS_CACHE = OrderedDict()
+OPS_CACHE_SIZE = 256
+
+
+def spec_hash(spec):
+    raw = json.dumps(spec, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def compile_spec_cached(spec, optimize=True):
+    """같은 spec(해시 기준)은 다시 컴파일하지 않는다. 돌려받은 목록은 고치지 말 것."""
+    key = (spec_hash(spec), optimize)
+    ops = _OPS_CACHE.get(key)
+    if ops is not None:
+        _OPS_CACHE.move_to_end(key)
+        return ops
+    ops = compile_spec(spec)
+    if optimize:
+        ops = optimize_ops(ops)
+    _OPS_CACHE[key] = ops
+    if len(_OPS_CACHE) > OPS_CACHE_SIZE:
+        _OPS_CACHE.popitem(last=False)
+    return ops
+
+
+def save_ops(ops, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ops, f, ensure_ascii=False)
+
+
+def load_ops(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- 최적화 -------------------------------------------------------------------
+
+def optimize_ops(ops, wrap_rows=False):
+    """
+    op 목록을 줄인다. 결과 문서는 같다.
+    - 연속된 set_char_shape 는 하나로 합치고, 이미 적용된 글자 모양이면 버린다.
+    - 직전과 같은 문단/셀 정렬은 버린다.
+    - 사이에 다른 op 가 없는 insert_text 는 하나로 이어 붙인다.
+    - 커서를 옮기는 op(create_table, move_cell, end_table) 뒤에는 알고 있던 모양을 버린다.
+    - wrap_rows=True 면, 병합 없는 직사각형 표에서 행 끝 -> 다음 행 처음 이동
+      (TableLowerCell + TableLeftCell x (cols-1))을 TableRightCell 하나로 바꾼다.
+      (한글에서 마지막 열의 오른쪽 셀 이동이 다음 행 첫 셀로 넘어가는 동작에 기댄다)
+    """
+    out = []
+    font = {}
+    pending_font = None
+    para_align = cell_align = None
+    tables = []  # wrap_rows 판단용: 열린 표마다 직사각형/무병합 여부
+
+    def flush_font():
+        nonlocal pending_font
+        if not pending_font:
+            pending_font = None
+            return
+        changed = {k: v for k, v in pending_font.items() if k not in font or font[k] != v}
+        pending_font = None
+        if changed:
+            font.update(changed)
+            out.append({"op": "set_char_shape", "style": changed})
+
+    for op in ops:
+        kind = op["op"]
+        if kind == "set_char_shape":
+            pending_font = dict(pending_font or {})
+            pending_font.update(op["style"])
+            continue
+        if kind == "set_para_align":
+            if para_align != op["align"]:
+                para_align = op["align"]
+                out.append(op)
+            continue
+        if kind == "set_cell_align":
+            if cell_align != op["align"]:
+                cell_align = op["align"]
+                out.append(op)
+            continue
+
+        flush_font()
+        if kind == "insert_text":
+            prev = out[-1] if out else None
+            if prev is not None and prev["op"] == "insert_text":
+                out[-1] = {"op": "insert_text", "text": prev["text"] + op["text"]}
+            else:
+                out.append(op)
+            continue
+        if kind == "set_cell_bg":
+            out.append(op)
+            continue
+
+        # 커서 이동: 새 위치의 모양은 알 수 없다
+        font = {}
+        para_align = cell_align = None
+        if kind == "create_table":
+            merges = op.get("merges") or []
+            rect = all(n == op["cols"] for n in op["row_lengths"]) and all(
+                (m or {}).get("colSpan", 1) == 1 and (m or {}).get("rowSpan", 1) == 1
+                for row in merges for m in row
+            )
+            tables.append(rect)
+        elif kind == "end_table":
+            if tables:
+                tables.pop()
+        elif kind == "move_cell" and wrap_rows and tables and tables[-1] and op["col"] == 0 \
+                and op["moves"] and op["moves"][0] == "down":
+            op = dict(op, moves=["right"])
+        out.append(op)
+
+    flush_font()
+    return out
+
+
+# --- 실행기 -------------------------------------------------------------------
+
+class OpExecutor:
+    """op 이름과 같은 메서드(op_<이름>)로 dispatch 한다."""
+
+    def run(self, ops):
+        for op in ops:
+            fields = dict(op)
+            kind = fields.pop("op")
+            getattr(self, "op_" + kind)(**fields)
+        return self
+
+
+class HwpExecutor(OpExecutor):
+    """op 목록을 Hwp(또는 RecordingHwp / StateTrackingHwp)에 그대로 적용한다."""
+
+    def __init__(self, hwp):
+        self.hwp = hwp
+
+    def op_set_char_shape(self, style):
+        self.hwp.set_font(**style)
+
+    def op_insert_text(self, text):
+        self.hwp.insert_text(text)
+
+    def op_set_para_align(self, align):
+        getattr(self.hwp, PARA_ALIGN_CALLS[align])()
+
+    def op_create_table(self, rows, cols, row_lengths=None, merges=None):
+        self.hwp.create_table(rows, cols, treat_as_char=True)
+
+    def op_set_cell_align(self, align):
+        getattr(self.hwp, CELL_ALIGN_CALLS[align])()
+
+    def op_set_cell_bg(self, color):
+        if isinstance(color, str) and color.startswith("#"):
+            self.hwp.gradation_on_cell([hex_to_rgb(color)])
+        else:
+            self.hwp.gradation_on_cell([color])
+
+    def op_move_cell(self, moves, row=None, col=None):
+        for m in moves:
+            getattr(self.hwp, MOVE_CALLS[m])()
+
+    def op_end_table(self, nested=False):
+        if not nested:
+            self.hwp.MoveDown()
+
+
+class CostExecutor(OpExecutor):
+    """
+    아무것도 하지 않고, HwpExecutor 였다면 보냈을 Hwp 호출 수를 메서드 이름별로 센다.
+    estimate(seconds_per_call)로 대략의 COM 시간을 어림할 수 있다.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def op_set_char_shape(self, style):
+        self.calls["set_font"] += 1
+
+    def op_insert_text(self, text):
+        self.calls["insert_text"] += 1
+
+    def op_set_para_align(self, align):
+        self.calls[PARA_ALIGN_CALLS[align]] += 1
+
+    def op_create_table(self, rows, cols, row_lengths=None, merges=None):
+        self.calls["create_table"] += 1
+
+    def op_set_cell_align(self, align):
+        self.calls[CELL_ALIGN_CALLS[align]] += 1
+
+    def op_set_cell_bg(self, color):
+        self.calls["gradation_on_cell"] += 1
+
+    def op_move_cell(self, moves, row=None, col=None):
+        for m in moves:
+            self.calls[MOVE_CALLS[m]] += 1
+
+    def op_end_table(self, nested=False):
+        if not nested:
+            self.calls["MoveDown"] += 1
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+    def estimate(self, seconds_per_call=0.002):
+        return self.total * seconds_per_call
+
+
+class NativeExecutor(OpExecutor):
+    """
+    op 목록을 커서 흉내로 다시 문단/표 노드로 묶어서 hwpxwriter.HwpxWriter 로 쓴다.
+
+        NativeExecutor("out.hwpx").run(ops).close()
+    """
+
+    def __init__(self, filename):
+        from hwpxwriter import HwpxWriter
+        self.writer = HwpxWriter(filename)
+        self.font = {}
+        self.para_align = "left"
+        self.para_segments = []   # 최상위 현재 문단
+        self.tables = []          # 열린 표 frame 스택
+
+    # 현재 위치(문단 또는 셀)의 segment 목록
+    def _target(self):
+        if self.tables:
+            t = self.tables[-1]
+            return t["cells"].get(t["pos"])
+        return None
+
+    def _flush_paragraph(self):
+        segs, self.para_segments = self.para_segments, []
+        text = "".join(s["text"] for s in segs)
+        if not text:
+            return
+        style = dict(segs[0]["style"], Align=self.para_align)
+        self.writer.add_node({"content": text, "style": style, "segments": segs})
+
+    def op_set_char_shape(self, style):
+        self.font.update(style)
+        if "UnderlineType" in style:
+            self.font["Underline"] = bool(style["UnderlineType"])
+
+    def op_insert_text(self, text):
+        cell = self._target()
+        if cell is not None:
+            cell["segments"].append({"text": text, "style": dict(self.font)})
+            return
+        if self.tables:
+            return  # 없는 셀(모양이 어긋난 표)에 쓴 글자는 버린다
+        lines = text.replace("\r\n", "\n").split("\n")
+        for i, line in enumerate(lines):
+            if i > 0:
+                self._flush_paragraph()
+            if line:
+                self.para_segments.append({"text": line, "style": dict(self.font)})
+
+    def op_set_para_align(self, align):
+        if self.tables:
+            self.op_set_cell_align(align)
+        else:
+            self.para_align = align
+
+    def op_create_table(self, rows, cols, row_lengths=None, merges=None):
+        if not self.tables:
+            self._flush_paragraph()
+        row_lengths = row_lengths or [cols] * rows
+        cells = {}
+        for r, n in enumerate(row_lengths):
+            for c in range(n):
+                cells[(r, c)] = {"segments": [], "nested": [], "bg": None, "align": None}
+        self.tables.append({"pos": (0, 0), "cells": cells, "row_lengths": row_lengths, "merges": merges})
+
+    def op_set_cell_align(self, align):
+        cell = self._target()
+        if cell is not None:
+            cell["align"] = align
+
+    def op_set_cell_bg(self, color):
+        cell = self._target()
+        if cell is not None and isinstance(color, str) and color.startswith("#"):
+            cell["bg"] = color
+
+    def op_move_cell(self, moves, row=None, col=None):
+        self.tables[-1]["pos"] = (row, col)
+
+    def op_end_table(self, nested=False):
+        t = self.tables.pop()
+        data, cell_segments, cell_merges, cell_nested = [], [], [], []
+        for r, n in enumerate(t["row_lengths"]):
+            row_data, row_segs, row_merge, row_nested = [], [], [], []
+            for c in range(n):
+                cell = t["cells"][(r, c)]
+                text = "".join(s["text"] for s in cell["segments"])
+                row_data.append(text.replace("\r", "").replace("\n", ""))
+                row_segs.append(cell["segments"])
+                merge = copy.copy((t["merges"] and t["merges"][r][c]) or {})
+                merge["bgColor"] = cell["bg"]
+                row_merge.append(merge)
+                row_nested.append(cell["nested"])
+            data.append(row_data)
+            cell_segments.append(row_segs)
+            cell_merges.append(row_merge)
+            cell_nested.append(row_nested)
+
+        first_row = [t["cells"][(0, c)]["align"] or "left" for c in range(t["row_lengths"][0])]
+        node = {
+            "data": data,
+            "style": {"cell_align": first_row},
+            "cell_segments": cell_segments,
+            "cell_merges": cell_merges,
+            "cell_nested": cell_nested,
+        }
+        parent = self._target()
+        if nested and parent is not None:
+            # 중첩 표 직전에 넣은 줄바꿈은 표 문단이 대신하므로 떼어낸다
+            if parent["segments"] and parent["segments"][-1]["text"] == "\r\n":
+                parent["segments"].pop()
+            parent["nested"].append(dict(node, type="table"))
+        elif not self.tables:
+            self.writer.add_node(node)
+
+    def close(self):
+        self._flush_paragraph()
+        self.writer.close()
+
+
+def generate_from_ops(ops, filename="output.hwpx", backend="native", hwp=None):
+    """
+    컴파일된 op 목록을 실행한다.
+    backend="native": HWPX 를 직접 씀, backend="com": hwp(없으면 새 Hwp())에 적용 후 저장.
+    """
+    if backend == "native":
+        NativeExecutor(filename).run(ops).close()
+        return filename
+    if backend != "com":
+        raise ValueError(f"지원하지 않는 backend: {backend} (com/native만 지원)")
+    own = hwp is None
+    if own:
+        from pyhwpx import Hwp
+        hwp = Hwp()
+    HwpExecutor(hwp).run(ops)
+    hwp.save_as(filename)
+    if own:
+        hwp.quit()
+    return filename
@@ -0,0 +1,197 @@
+# doclib 과 Hwp 사이에 끼워서, 상태를 바꾸지 않는 COM 호출을 걸러내는 프록시.
+# 한글 자동화 호출은 하나하나가 프로세스 간 왕복이라, 같은 글꼴/정렬을 반복해서 거는 것만
+# 줄여도 표가 많은 문서에서 생성 시간이 크게 준다.
+
+PARA_ALIGN_CALLS = {
+    "ParagraphShapeAlignLeft": "left",
+    "ParagraphShapeAlignCenter": "center",
+    "ParagraphShapeAlignRight": "right",
+    "ParagraphShapeAlignJustify": "justify",
+}
+CELL_ALIGN_CALLS = {
+    "TableCellAlignLeftCenter": "left",
+    "TableCellAlignCenterCenter": "center",
+    "TableCellAlignRightCenter": "right",
+}
+# 커서 위치와 현재 글자/문단/셀 모양을 바꾸지 않는 호출
+STATE_NEUTRAL_CALLS = {"gradation_on_cell"}
+# 표 안에서 셀 하나만큼 커서를 옮기는 호출: (행 변화, 열 변화)
+CELL_MOVE_CALLS = {
+    "TableRightCell": (0, 1),
+    "TableLeftCell": (0, -1),
+    "TableLowerCell": (1, 0),
+    "TableUpperCell": (-1, 0),
+}
+
+
+class _TableFrame:
+    """create_table 로 만든 표 하나에서 커서가 있는 셀과, 지나온 셀들의 모양."""
+
+    __slots__ = ("rows", "cols", "row", "col", "cells", "fresh_font")
+
+    def __init__(self, rows, cols, fresh_font):
+        self.rows = rows
+        self.cols = cols
+        self.row = 0
+        self.col = 0
+        self.cells = {}               # (행, 열) -> (글자 모양, 문단 정렬, 셀 정렬)
+        self.fresh_font = fresh_font  # 아직 손대지 않은 셀의 글자 모양
+
+
+class StateTrackingHwp:
+    """
+    Hwp 를 감싸서 현재 글자 모양(set_font), 문단 정렬, 셀 정렬을 기억해 두고
+    바뀌는 게 없는 호출은 버리거나 합친다.
+
+    - set_font: 바로 보내지 않고 모아 두었다가 다음 insert_text(또는 다른 호출) 직전에
+      이미 적용된 값과 다른 항목만 한 번에 보낸다. 연속된 set_font 는 하나로 합쳐진다.
+    - ParagraphShapeAlign*/TableCellAlign*: 직전과 같은 정렬이면 버린다.
+      TableCellAlign* 는 셀 안 문단 정렬도 같이 바꾸므로 문단 정렬도 그 값으로 기억한다.
+    - 표 안: create_table 뒤에는 커서가 있는 셀(행, 열)을 따라가며 셀마다 모양을 따로 기억한다.
+      TableRightCell/TableLeftCell/TableLowerCell/TableUpperCell 로 옮기면 떠나는 셀의 모양을
+      적어 두고, 갈 셀이 이미 지나온 셀이면 그 모양을, 처음 가는 셀이면 표를 만들 때 커서의
+      글자 모양을 현재 상태로 삼는다 (한글은 새 표의 셀 글자 모양을 만들 때 커서의 것으로 채운다).
+      그래서 본문/셀과 같은 글꼴을 다시 거는 set_font 는 셀을 넘어가도 버려진다.
+      셀의 세로 정렬은 처음 가는 셀에서 알 수 없으므로 TableCellAlign* 은 셀마다 첫 호출은
+      그대로 보낸다 (doclib 은 셀마다 한 번만 걸므로 실제로 줄지는 않는다).
+    - 행 끝/표 끝을 넘는 셀 이동, MoveDown 처럼 표 밖으로 나가는 호출, 그 밖에 모르는 메서드는
+      새 위치의 모양을 알 수 없으므로 기억한 상태와 표 위치를 모두 버린다.
+
+    stats() 로 요청된 호출 수와 실제로 보낸 호출 수, 줄인 호출 수(종류별 포함)를 확인할 수 있다.
+    """
+
+    def __init__(self, hwp):
+        self._hwp = hwp
+        self._font = {}            # 한글에 실제로 적용된 글자 모양 (알려진 항목만)
+        self._pending_font = None  # 아직 보내지 않은 set_font 요청 (합쳐진 것)
+        self._para_align = None
+        self._cell_align = None
+        self._tables = []          # 커서가 들어가 있는 표들 (바깥 -> 안쪽)
+        self.requested = 0
+        self.issued = 0
+        self.saved_by = {"set_font": 0, "para_align": 0, "cell_align": 0}
+
+    # --- 상태 ---------------------------------------------------------------
+
+    def _invalidate(self):
+        self._font = {}
+        self._para_align = None
+        self._cell_align = None
+        self._tables = []
+
+    def _flush_font(self):
+        pending, self._pending_font = self._pending_font, None
+        if not pending:
+            return
+        changed = {k: v for k, v in pending.items() if k not in self._font or self._font[k] != v}
+        if not changed:
+            return
+        self.issued += 1
+        self.saved_by["set_font"] -= 1
+        self._hwp.set_font(**changed)
+        self._font.update(changed)
+
+    def _call(self, name, *args, **kwargs):
+        self.issued += 1
+        return getattr(self._hwp, name)(*args, **kwargs)
+
+    # --- 추적하는 호출 --------------------------------------------------------
+
+    def set_font(self, **kwargs):
+        self.requested += 1
+        # 일단 줄인 것으로 세고, 실제로 보낼 때(_flush_font) 하나씩 되돌린다
+        self.saved_by["set_font"] += 1
+        if self._pending_font is None:
+            self._pending_font = {}
+        self._pending_font.update(kwargs)
+
+    def insert_text(self, text):
+        self.requested += 1
+        self._flush_font()
+        # 줄바꿈으로 생긴 새 문단은 직전 글자/문단 모양을 그대로 이어받는다
+        return self._call("insert_text", text)
+
+    def create_table(self, rows, cols, *args, **kwargs):
+        self.requested += 1
+        self._flush_font()
+        result = self._call("create_table", rows, cols, *args, **kwargs)
+        # 커서는 새 표의 첫 셀로 들어간다. 셀의 글자 모양은 표를 만든 자리의 것
+        frame = _TableFrame(rows, cols, dict(self._font))
+        self._tables.append(frame)
+        self._enter_cell(frame)
+        return result
+
+    def _enter_cell(self, frame):
+        state = frame.cells.get((frame.row, frame.col))
+        if state is None:
+            self._font, self._para_align, self._cell_align = dict(frame.fresh_font), None, None
+        else:
+            font, self._para_align, self._cell_align = state
+            self._font = dict(font)
+
+    def _move_cell(self, name, d_row, d_col):
+        self.requested += 1
+        self._flush_font()
+        result = self._call(name)
+        frame = self._tables[-1] if self._tables else None
+        if frame is None:
+            self._invalidate()
+            return result
+        row, col = frame.row + d_row, frame.col + d_col
+        if not (0 <= row < frame.rows and 0 <= col < frame.cols):
+            # 행을 넘어가거나 표 밖으로 나가면 어디로 갔는지 확실하지 않다
+            self._invalidate()
+            return result
+        frame.cells[(frame.row, frame.col)] = (dict(self._font), self._para_align, self._cell_align)
+        frame.row, frame.col = row, col
+        self._enter_cell(frame)
+        return result
+
+    def _align(self, name, value, cell):
+        self.requested += 1
+        current = self._cell_align if cell else self._para_align
+        if current == value:
+            self.saved_by["cell_align" if cell else "para_align"] += 1
+            return None
+        result = self._call(name)
+        if cell:
+            self._cell_align = value
+        self._para_align = value
+        return result
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in PARA_ALIGN_CALLS:
+            return lambda: self._align(name, PARA_ALIGN_CALLS[name], cell=False)
+        if name in CELL_ALIGN_CALLS:
+            return lambda: self._align(name, CELL_ALIGN_CALLS[name], cell=True)
+        if name in CELL_MOVE_CALLS:
+            return lambda: self._move_cell(name, *CELL_MOVE_CALLS[name])
+
+        attr = getattr(self._hwp, name)
+        if not callable(attr):
+            # HAction/HParameterSet 등을 직접 쓰면 무엇이 바뀌는지 알 수 없다
+            self._flush_font()
+            self._invalidate()
+            return attr
+
+        def passthrough(*args, **kwargs):
+            self.requested += 1
+            self._flush_font()
+            result = self._call(name, *args, **kwargs)
+            if name not in STATE_NEUTRAL_CALLS:
+                self._invalidate()
+            return result
+
+        return passthrough
+
+    # --- 통계 ---------------------------------------------------------------
+
+    def stats(self):
+        return {
+            "requested": self.requested,
+            "issued": self.issued,
+            "saved": self.requested - self.issued,
+            "saved_by": dict(self.saved_by),
+        }
@@ -0,0 +1,220 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+from doclib import render_spec
+from hwpproxy import StateTrackingHwp
+
+# 한글(Hwp) 인스턴스를 문서마다 새로 띄우지 않고 재사용하기 위한 세션/풀.
+# 짧은 1쪽짜리 안내문은 생성 시간보다 Hwp() 기동/종료 시간이 더 길다.
+
+
+def default_hwp_factory():
+    from pyhwpx import Hwp
+    return Hwp()
+
+
+class RecordingHwp:
+    """
+    pyhwpx.Hwp 대역. 한글 없이(리눅스 등) 세션/풀 로직과 문서 초기화를 확인할 때 쓴다.
+    - calls: 생성 이후 모든 메서드 호출 (이름, args, kwargs)
+    - document: 마지막 clear() 이후 현재 문서에 대한 호출만
+    - saved: save_as 시점의 document 스냅샷 {filename: [...]}
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+        self.document = []
+        self.saved = {}
+        self.cleared = 0
+        self.quit_called = False
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            self.document.append((name, args, kwargs))
+
+        return method
+
+    def clear(self, option=1):
+        self.calls.append(("clear", (), {"option": option}))
+        self.document = []
+        self.cleared += 1
+
+    def save_as(self, filename, *args, **kwargs):
+        self.calls.append(("save_as", (filename,) + args, kwargs))
+        self.saved[filename] = list(self.document)
+
+    def quit(self):
+        self.calls.append(("quit", (), {}))
+        self.quit_called = True
+
+
+class HwpSession:
+    """
+    Hwp 인스턴스 하나를 붙잡고 여러 문서를 연달아 만든다.
+
+        with HwpSession() as s:
+            for spec, out in jobs:
+                s.generate(spec, out)
+
+    - 문서 사이에는 hwp.clear(option=1)로 현재 문서를 버리고 빈 문서로 되돌린다.
+    - 생성 중 예외가 나면 인스턴스 상태를 믿을 수 없으므로 닫고 다음 작업에서 새로 띄운다.
+    - recycle_after: 이 횟수만큼 문서를 만들면 인스턴스를 새로 띄운다 (메모리 누수 대비). None 이면 계속 사용.
+    - optimize: True 면 문서마다 hwpproxy.StateTrackingHwp 를 씌워 중복 호출을 걸러낸다.
+      줄인 호출 수는 saved_calls 에 누적된다.
+    """
+
+    def __init__(self, hwp_factory=None, recycle_after=None, optimize=False):
+        self.hwp_factory = hwp_factory or default_hwp_factory
+        self.recycle_after = recycle_after
+        self.optimize = optimize
+        self.saved_calls = 0
+        self.hwp = None
+        self.jobs = 0        # 이 세션이 만든 문서 수
+        self.starts = 0      # Hwp 인스턴스를 띄운 횟수
+        self._jobs_on_instance = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _ensure(self):
+        if self.hwp is None:
+            self.hwp = self.hwp_factory()
+            self.starts += 1
+            self._jobs_on_instance = 0
+        return self.hwp
+
+    def reset(self):
+        """현재 문서를 저장하지 않고 버린 뒤 빈 문서 상태로 만든다."""
+        if self.hwp is not None:
+            self.hwp.clear(option=1)
+
+    def generate(self, spec, filename):
+        hwp = self._ensure()
+        if self.optimize:
+            # 문서마다 상태를 새로 추적한다 (clear 뒤의 빈 문서 모양은 알 수 없으므로)
+            hwp = StateTrackingHwp(hwp)
+        try:
+            render_spec(hwp, spec)
+            hwp.save_as(filename)
+            self.reset()
+        except Exception:
+            self._discard()
+            raise
+        if self.optimize:
+            self.saved_calls += hwp.stats()["saved"]
+        self.jobs += 1
+        self._jobs_on_instance += 1
+        if self.recycle_after and self._jobs_on_instance >= self.recycle_after:
+            self.close()
+        return filename
+
+    def _discard(self):
+        hwp, self.hwp = self.hwp, None
+        if hwp is not None:
+            try:
+                hwp.quit()
+            except Exception:
+                pass
+
+    def close(self):
+        hwp, self.hwp = self.hwp, None
+        if hwp is not None:
+            hwp.quit()
+
+
+class HwpPool:
+    """
+    같은 프로세스 안에서 여러 스레드가 세션을 나눠 쓰는 풀.
+    세션은 처음 빌려갈 때 만들어지고, 반납되면 다음 작업이 그대로 재사용한다.
+
+        pool = HwpPool(size=2)
+        with pool.session() as s:
+            s.generate(spec, "out.hwpx")
+        pool.close()
+
+    (한글 COM 객체는 만든 스레드에서만 안정적으로 동작하므로, 스레드마다 따로
+     한글을 돌리려면 generate_many 처럼 프로세스당 세션 하나를 두는 쪽이 낫다.)
+    """
+
+    def __init__(self, size=1, hwp_factory=None, recycle_after=None, optimize=False):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._factory = hwp_factory
+        self._recycle_after = recycle_after
+        self._optimize = optimize
+
+    def acquire(self, timeout=None):
+        with self._lock:
+            if self._idle.empty() and len(self._all) < self.size:
+                s = HwpSession(self._factory, self._recycle_after, self._optimize)
+                self._all.append(s)
+                return s
+        return self._idle.get(timeout=timeout)
+
+    def release(self, session):
+        self._idle.put(session)
+
+    @contextmanager
+    def session(self, timeout=None):
+        s = self.acquire(timeout)
+        try:
+            yield s
+        finally:
+            self.release(s)
+
+    def generate(self, spec, filename):
+        with self.session() as s:
+            return s.generate(spec, filename)
+
+    def close(self):
+        with self._lock:
+            for s in self._all:
+                s.close()
+            self._all = []
+            self._idle = queue.LifoQueue()
+
+
+# --- 프로세스당 세션 하나 -----------------------------------------------------
+
+_worker_session = None
+
+
+def _init_worker(hwp_factory, recycle_after, optimize):
+    global _worker_session
+    _worker_session = HwpSession(hwp_factory, recycle_after, optimize)
+    atexit.register(_worker_session.close)
+
+
+def _worker_generate(spec, filename):
+    try:
+        _worker_session.generate(spec, filename)
+    except Exception as e:
+        return filename, f"{type(e).__name__}: {e}"
+    return filename, None
+
+
+def generate_many(jobs, workers=1, hwp_factory=None, recycle_after=None, optimize=False):
+    """
+    jobs: [(spec, filename), ...] 를 worker 프로세스마다 Hwp 세션 하나씩 두고 나눠 생성한다.
+    hwp_factory 는 프로세스로 넘어가므로 모듈 최상위 함수/클래스여야 한다.
+    반환: [(filename, 에러 메시지 또는 None)] (jobs 순서)
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(hwp_factory, recycle_after, optimize),
+    ) as pool:
+        futures = [pool.submit(_worker_generate, spec, filename) for spec, filename in jobs]
+        return [f.result() for f in futures]
@@ -0,0 +1,282 @@
+import re
+import html
+import xmlbackend as xb
+from parser import (
+    open_hwpx, list_section_files, parse_header, XMLNS_RE, ROOT_TAG_RE,
+    paragraph_block, parse_table_block,
+)
+
+# 문서 전체를 parse_hwpx_to_spec 으로 풀지 않고, 필요한 문단/표만 꺼내 보는 지연 로딩 문서.
+#
+#   with HwpxDocument("input.hwpx") as doc:
+#       title = doc.paragraphs[0]["content"]
+#       first_table = doc.tables[0]["data"]
+#       print(len(doc.tables), doc["표3"])
+#
+# section*.xml 은 처음 필요할 때 정규식으로 한 번 훑어 최상위 문단/표의 바이트 범위만 적어 두고
+# (색인), 실제 XML 해석은 꺼낸 block 하나에만 한다. 모양(header.xml)도 처음 해석이 필요할 때 읽는다.
+# 색인 규칙은 parser 의 walk() 와 같다: 표 밖의 문단(글자 있는 것만)과 최상위 표(셀 있는 것만)를
+# 시작 태그 순서대로.
+
+# CDATA/주석 안의 글자는 태그로 보지 않도록 통째로 건너뛴다 (name 이 None)
+SCAN_RE = re.compile(rb"<(/?)hp:(p|tbl|tc|t)(?=[\s>/])[^>]*?(/?)>|<!\[CDATA\[.*?\]\]>|<!--.*?-->", re.S)
+
+
+def t_head_text(data, pos, end=None):
+    """
+    pos(<hp:t> 바로 뒤)부터 첫 자식 요소(또는 end) 전까지의 글자 = ElementTree 의 t.text.
+    CDATA 는 그 안의 글자로 이어 붙이고, 주석/처리 지시는 건너뛴다 (해석기도 그렇게 한다).
+    """
+    end = len(data) if end is None else end
+    parts = []
+    while True:
+        lt = data.find(b"<", pos, end)
+        parts.append(data[pos:lt if lt >= 0 else end].decode("utf-8"))
+        if "&" in parts[-1]:
+            parts[-1] = html.unescape(parts[-1])
+        if lt < 0:
+            break
+        for opener, closer in ((b"<![CDATA[", b"]]>"), (b"<!--", b"-->"), (b"<?", b"?>")):
+            if data.startswith(opener, lt):
+                stop = data.find(closer, lt + len(opener), end)
+                stop = end if stop < 0 else stop
+                if opener == b"<![CDATA[":
+                    parts.append(data[lt + len(opener):stop].decode("utf-8"))
+                pos = stop + len(closer)
+                break
+        else:
+            break
+    return "".join(parts)
+
+
+def scan_section(data):
+    """
+    section XML(bytes)을 한 번 훑어 [(종류, 시작, 끝)] 을 돌려준다. 종류는 "paragraph" / "table".
+    """
+    entries = []        # [종류, 시작, 끝, 내보낼지]
+    p_stack = []        # 열린 문단 (표 안의 문단은 None)
+    tbl_depth = 0
+    top_tbl = None
+    for m in SCAN_RE.finditer(data):
+        close, name, selfclose = m.group(1), m.group(2), m.group(3)
+        if name is None:
+            continue
+        if name == b"t":
+            # run 바로 아래 <hp:t> 의 첫 글자(.text)에 공백 아닌 글자가 있으면 그 문단은 내보낸다
+            # (paragraph_block 이 strip() 한 내용으로 판단하므로 같게 맞춘다)
+            entry = p_stack[-1] if p_stack else None
+            if not close and not selfclose and entry is not None and not entry[3]:
+                if t_head_text(data, m.end()).strip():
+                    entry[3] = True
+        elif name == b"p":
+            if close:
+                entry = p_stack.pop()
+                if entry is not None:
+                    entry[2] = m.end()
+            elif not selfclose:
+                entry = None
+                if tbl_depth == 0:
+                    entry = ["paragraph", m.start(), None, False]
+                    entries.append(entry)
+                p_stack.append(entry)
+        elif name == b"tbl":
+            if close:
+                tbl_depth -= 1
+                if tbl_depth == 0:
+                    top_tbl[2] = m.end()
+            elif not selfclose:
+                if tbl_depth == 0:
+                    top_tbl = ["table", m.start(), None, False]
+                    entries.append(top_tbl)
+                tbl_depth += 1
+        elif name == b"tc" and not close and tbl_depth == 1:
+            top_tbl[3] = True
+    return [(kind, start, end) for kind, start, end, keep in entries if keep]
+
+
+class HwpxSection:
+    """section*.xml 하나. 바이트와 색인은 처음 필요할 때 만든다."""
+
+    def __init__(self, doc, name):
+        self.doc = doc
+        self.name = name
+        self._data = None
+        self._index = None
+        self._positions = {}
+        self._wrap = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self.doc.zf.read(self.name)
+        return self._data
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = scan_section(self.data)
+        return self._index
+
+    def positions(self, kind=None):
+        """kind(None 이면 전부)인 block 들의 색인 위치"""
+        positions = self._positions.get(kind)
+        if positions is None:
+            positions = [i for i, entry in enumerate(self.index) if kind is None or entry[0] == kind]
+            self._positions[kind] = positions
+        return positions
+
+    def _fragment_root(self, start, end):
+        if self._wrap is None:
+            # 조각만 떼어 해석하려면 루트 요소의 xmlns 선언이 필요하다
+            root_tag = ROOT_TAG_RE.search(self.data)
+            decls = b"".join(XMLNS_RE.findall(root_tag.group())) if root_tag else b""
+            self._wrap = (b"<wrap" + decls + b">", b"</wrap>")
+        head, tail = self._wrap
+        return xb.fromstring(head + self.data[start:end] + tail)[0]
+
+    def block(self, i):
+        """i 번째 block (parser 의 paragraph/table block: model.Paragraph / model.Table)"""
+        kind, start, end = self.index[i]
+        el = self._fragment_root(start, end)
+        para_shapes, char_shapes, border_fills = self.doc.styles
+        if kind == "paragraph":
+            return paragraph_block(el, para_shapes, char_shapes)
+        return parse_table_block(el, para_shapes, char_shapes, border_fills)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def blocks(self):
+        return BlockSequence(self.doc, [self])
+
+    @property
+    def paragraphs(self):
+        return BlockSequence(self.doc, [self], "paragraph")
+
+    @property
+    def tables(self):
+        return BlockSequence(self.doc, [self], "table")
+
+
+class BlockSequence:
+    """
+    여러 section 에 걸친 block 들의 지연 시퀀스. len / 인덱스(음수 포함) / 슬라이스 / 반복을 지원한다.
+    항목은 doclib 노드 모양(parse_hwpx_to_spec 의 "문단N"/"표N" 값)이다.
+    앞쪽 인덱스는 필요한 section 까지만 색인한다.
+    """
+
+    def __init__(self, doc, sections, kind=None):
+        self.doc = doc
+        self.sections = sections
+        self.kind = kind
+
+    def _locate(self, i):
+        if i < 0:
+            i += len(self)
+        if i >= 0:
+            for sec in self.sections:
+                positions = sec.positions(self.kind)
+                if i < len(positions):
+                    return sec, positions[i]
+                i -= len(positions)
+        raise IndexError("block index out of range")
+
+    def __len__(self):
+        return sum(len(sec.positions(self.kind)) for sec in self.sections)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        sec, pos = self._locate(i)
+        return self.doc._node(sec, pos)
+
+    def __iter__(self):
+        for sec in self.sections:
+            for pos in sec.positions(self.kind):
+                yield self.doc._node(sec, pos)
+
+
+class HwpxDocument:
+    """
+    .hwpx(또는 .hwp) 하나를 지연 로딩으로 연다.
+    - sections: HwpxSection 리스트 (zip 엔트리 이름만, 내용은 아직 읽지 않음)
+    - blocks / paragraphs / tables: 문서 전체에 걸친 BlockSequence
+    - doc["문단1"], doc["표3"]: parse_hwpx_to_spec 의 키로 바로 꺼내기
+    - styles: (para_shapes, char_shapes, border_fills) — 처음 block 을 해석할 때 읽는다
+    꺼낸 노드는 max_cached 개까지 기억해 두고 재사용한다 (읽기 전용으로 쓴다).
+    """
+
+    def __init__(self, path, max_cached=256):
+        self.path = path
+        self.zf = open_hwpx(path)
+        self.sections = [HwpxSection(self, name) for name in list_section_files(self.zf)]
+        self.max_cached = max_cached
+        self._styles = None
+        self._nodes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.zf is not None:
+            self.zf.close()
+            self.zf = None
+
+    @property
+    def styles(self):
+        if self._styles is None:
+            self._styles = parse_header(self.zf)
+        return self._styles
+
+    def _node(self, sec, pos):
+        key = (sec.name, pos)
+        node = self._nodes.get(key)
+        if node is None:
+            block = sec.block(pos)
+            node = block.to_spec()
+            if len(self._nodes) >= self.max_cached:
+                self._nodes.pop(next(iter(self._nodes)))
+            self._nodes[key] = node
+        return node
+
+    @property
+    def blocks(self):
+        return BlockSequence(self, self.sections)
+
+    @property
+    def paragraphs(self):
+        return BlockSequence(self, self.sections, "paragraph")
+
+    @property
+    def tables(self):
+        return BlockSequence(self, self.sections, "table")
+
+    def __getitem__(self, key):
+        """"문단N" / "표N" (1부터)"""
+        for prefix, seq in (("문단", self.paragraphs), ("표", self.tables)):
+            if key.startswith(prefix) and key[len(prefix):].isdigit():
+                n = int(key[len(prefix):])
+                if n >= 1:
+                    try:
+                        return seq[n - 1]
+                    except IndexError:
+                        break
+        raise KeyError(key)
+
+    def items(self):
+        """parse_hwpx_to_spec 과 같은 순서/키의 (key, node)"""
+        p_idx, t_idx = 1, 1
+        for sec in self.sections:
+            for pos, (kind, _, _) in enumerate(sec.index):
+                if kind == "paragraph":
+                    key, p_idx = f"문단{p_idx}", p_idx + 1
+                else:
+                    key, t_idx = f"표{t_idx}", t_idx + 1
+                yield key, self._node(sec, pos)
+
+    def to_spec(self):
+        return {"document": dict(self.items())}
@@ -0,0 +1,436 @@
+import os
+import re
+import sys
+import html
+import json
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+
+from hwpxdoc import scan_section, t_head_text
+from hwpxzip import RawZipBuilder, read_raw_member, STORED
+from parser import list_section_files
+
+# .hwpx 의 문단/표 셀 글자만 고쳐서 다시 저장한다. 한글(COM)도, parse -> spec -> 재생성도 거치지 않는다.
+#
+#   with HwpxPatch("안내문.hwpx") as doc:
+#       doc.set_text("문단3", "2025학년도 운영 계획")
+#       doc.replace_text("표2[1][0]", "학기초", "3월")
+#       doc.save("안내문-수정.hwpx")            # 경로를 빼면 원본을 덮어쓴다
+#
+# 키는 parse_hwpx_to_spec 이 붙이는 것과 같다: "문단N", "표N[행][열]" (행/열은 0부터, spec 의 data[r][c]).
+# 고친 section*.xml 만 바이트 단위로 잘라 붙여 새로 압축하고, 나머지 zip 엔트리(header.xml, 다른 구역,
+# 그림, 미리보기)는 압축된 바이트를 풀지 않고 그대로 옮긴다. 고친 문단/셀 밖의 XML 도 한 바이트도 바뀌지 않는다.
+#
+# - set_text: 그 문단(셀이면 셀의 첫 문단)의 첫 글자 묶음(hp:t)에 새 글자를 넣고 나머지 글자는 비운다.
+#   글자 모양은 첫 run 의 것을 따른다. 줄바꿈(\n)은 같은 문단 안의 줄 나눔(hp:lineBreak)으로.
+# - replace_text: 글자 묶음(hp:t) 안에서만 바꾼다. 모양이 바뀌는 곳(run 경계)에 걸친 글자는 찾지 못한다.
+# - 고친 문단의 줄 배치 캐시(hp:linesegarray)는 지운다 (한글이 열 때 다시 계산한다).
+#   미리보기(Preview/*)는 원본 것이 그대로 남는다.
+# - 한 번 연 동안 키 번호는 원본 기준이다. 문단을 비워도 뒤 번호가 당겨지지 않는다.
+
+KEY_RE = re.compile(r"^(문단|표)(\d+)(?:\[(\d+)\]\[(\d+)\])?$")
+TOKEN_RE = re.compile(rb"<(/?)hp:(p|run|t|tbl|tr|tc|linesegarray)(?=[\s>/])[^>]*?(/?)>")
+TAG_RE = re.compile(rb"<[^>]*>")
+
+
+def parse_key(key):
+    """"문단3" -> ("paragraph", 3, None), "표2[1][0]" -> ("table", 2, (1, 0))"""
+    m = KEY_RE.match(key)
+    if not m or int(m.group(2)) < 1:
+        raise KeyError(key)
+    kind = "paragraph" if m.group(1) == "문단" else "table"
+    cell = None
+    if m.group(3) is not None:
+        if kind != "table":
+            raise KeyError(key)
+        cell = (int(m.group(3)), int(m.group(4)))
+    elif kind == "table":
+        raise KeyError(f"표는 셀까지 지정해야 합니다: {key}")
+    return kind, int(m.group(2)), cell
+
+
+def _text_xml(text):
+    return escape(text).replace("\n", "<hp:lineBreak/>").encode("utf-8")
+
+
+# 바이트 범위 안의 구조 ---------------------------------------------------------------
+
+def _direct_paragraphs(data, start, end):
+    """[start, end) 안에서 다른 문단/표에 들어있지 않은 hp:p 들의 (시작, 끝)"""
+    found = []
+    p_depth = tbl_depth = 0
+    p_start = None
+    for m in TOKEN_RE.finditer(data, start, end):
+        close, name, selfclose = m.groups()
+        if selfclose:
+            continue
+        if name == b"tbl":
+            tbl_depth += -1 if close else 1
+        elif name == b"p":
+            if close:
+                p_depth -= 1
+                if p_depth == 0 and p_start is not None:
+                    found.append((p_start, m.end()))
+                    p_start = None
+            else:
+                if p_depth == 0 and tbl_depth == 0:
+                    p_start = m.start()
+                p_depth += 1
+    return found
+
+
+class _Paragraph:
+    """
+    문단 하나의 바이트 범위 안에서 그 문단 자신의 것(안쪽 표/개체의 문단 제외)만 적어 둔다.
+    - texts: [(여는 태그 시작, 내용 시작, 내용 끝, 닫는 태그 끝)]  (<hp:t/> 는 내용 시작/끝이 None)
+    - first_run: 첫 hp:run 여는 태그의 (시작, 끝, 빈 요소인지)
+    - lineseg: hp:linesegarray 의 (시작, 끝) 또는 None
+    """
+
+    def __init__(self, data, start, end):
+        self.start, self.end = start, end
+        self.texts = []
+        self.first_run = None
+        self.lineseg = None
+        depth = 0
+        for m in TOKEN_RE.finditer(data, start, end):
+            close, name, selfclose = m.groups()
+            if name == b"p":
+                if not selfclose:
+                    depth += -1 if close else 1
+                continue
+            if depth != 1 or close:
+                continue
+            if name == b"t":
+                if selfclose:
+                    self.texts.append((m.start(), None, None, m.end()))
+                else:
+                    close_at = data.find(b"</hp:t>", m.end(), end)
+                    self.texts.append((m.start(), m.end(), close_at, close_at + len(b"</hp:t>")))
+            elif name == b"run" and self.first_run is None:
+                self.first_run = (m.start(), m.end(), bool(selfclose))
+            elif name == b"linesegarray" and not selfclose:
+                close_at = data.find(b"</hp:linesegarray>", m.end(), end)
+                self.lineseg = (m.start(), close_at + len(b"</hp:linesegarray>"))
+
+    def text(self, data):
+        """parser 가 보는 글자: 각 hp:t 의 첫 글자(.text)만 (탭/줄바꿈 뒤는 빠진다)"""
+        parts = []
+        for _, c_start, c_end, _ in self.texts:
+            if c_start is None:
+                continue
+            parts.append(t_head_text(data, c_start, c_end))
+        return "".join(parts)
+
+
+def _table_cell_range(data, start, end, row, col):
+    """표 범위 안에서 data[row][col] 셀(hp:tc)의 (시작, 끝). 셀이 없는 행은 parser 처럼 건너뛴다."""
+    tbl_depth = 0
+    rows = []          # [[(tc 시작, tc 끝)]]
+    current = None
+    tc_start = None
+    for m in TOKEN_RE.finditer(data, start, end):
+        close, name, selfclose = m.groups()
+        if selfclose or name not in (b"tbl", b"tr", b"tc"):
+            continue
+        if name == b"tbl":
+            tbl_depth += -1 if close else 1
+            continue
+        if tbl_depth != 1:
+            continue
+        if name == b"tr":
+            if close:
+                if current:
+                    rows.append(current)
+                current = None
+            else:
+                current = []
+        elif close:
+            current.append((tc_start, m.end()))
+        else:
+            tc_start = m.start()
+        if len(rows) > row:
+            break
+    if row < len(rows) and col < len(rows[row]):
+        return rows[row][col]
+    raise IndexError(f"셀 없음: [{row}][{col}]")
+
+
+# 구역 -------------------------------------------------------------------------------
+
+class _Section:
+    def __init__(self, name, data, info):
+        self.name = name
+        self.info = info
+        self.data = data
+        self.entries = [[kind, start, end] for kind, start, end in scan_section(data)]
+        self.dirty = False
+
+    def count(self, kind):
+        return sum(1 for entry in self.entries if entry[0] == kind)
+
+    def entry(self, kind, i):
+        return [entry for entry in self.entries if entry[0] == kind][i]
+
+    def splice(self, edits):
+        """edits: [(시작, 끝, 새 바이트)] (겹치지 않음). 뒤에서부터 바꾸고 색인 위치를 옮긴다."""
+        data = self.data
+        for start, end, new in sorted(edits, key=lambda e: e[0], reverse=True):
+            data = data[:start] + new + data[end:]
+            delta = len(new) - (end - start)
+            if not delta:
+                continue
+            for entry in self.entries:
+                if entry[1] >= end:
+                    entry[1] += delta
+                    entry[2] += delta
+                elif entry[2] >= end:
+                    entry[2] += delta
+        self.data = data
+        self.dirty = True
+
+
+class HwpxPatch:
+    """
+    .hwpx 하나를 열어 문단/표 셀 글자를 고친다.
+    - get_text(key): parser 가 보는 글자 (문단: content, 셀: data[r][c])
+    - set_text(key, text) / replace_text(key, old, new, count=-1)
+    - save(path=None): 고친 구역만 다시 압축해서 쓴다. path 가 없으면 원본을 덮어쓴다.
+    구역 XML 은 처음 필요할 때 읽는다.
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.compresslevel = compresslevel
+        self._fp = open(path, "rb")
+        self.zf = zipfile.ZipFile(self._fp)
+        self.section_names = list_section_files(self.zf)
+        self._sections = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.zf is not None:
+            self.zf.close()
+            self._fp.close()
+            self.zf = None
+
+    def _section(self, name):
+        sec = self._sections.get(name)
+        if sec is None:
+            info = self.zf.getinfo(name)
+            sec = self._sections[name] = _Section(name, self.zf.read(info), info)
+        return sec
+
+    def _locate(self, key):
+        """key -> (구역, [문단 (시작, 끝)])"""
+        kind, n, cell = parse_key(key)
+        i = n - 1
+        for name in self.section_names:
+            sec = self._section(name)
+            count = sec.count(kind)
+            if i >= count:
+                i -= count
+                continue
+            _, start, end = sec.entry(kind, i)
+            if cell is None:
+                return sec, [(start, end)]
+            try:
+                start, end = _table_cell_range(sec.data, start, end, *cell)
+            except IndexError:
+                raise KeyError(key) from None
+            return sec, _direct_paragraphs(sec.data, start, end)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self._locate(key)
+        except KeyError:
+            return False
+        return True
+
+    def get_text(self, key):
+        sec, spans = self._locate(key)
+        texts = [_Paragraph(sec.data, start, end).text(sec.data) for start, end in spans]
+        if KEY_RE.match(key).group(3) is None:
+            return "".join(texts).strip()
+        return " ".join(t for t in texts if t)
+
+    def __getitem__(self, key):
+        return self.get_text(key)
+
+    def __setitem__(self, key, text):
+        self.set_text(key, text)
+
+    def set_text(self, key, text):
+        sec, spans = self._locate(key)
+        data = sec.data
+        new = _text_xml(text)
+        edits = []
+        for i, (start, end) in enumerate(spans):
+            para = _Paragraph(data, start, end)
+            placed = i > 0
+            for open_start, c_start, c_end, close_end in para.texts:
+                content = b"" if placed else new
+                placed = True
+                if c_start is None:
+                    if content:
+                        edits.append((open_start, close_end,
+                                      data[open_start:close_end - 2].rstrip() + b">" + content + b"</hp:t>"))
+                else:
+                    edits.append((c_start, c_end, content))
+            if not placed:
+                # 글자 묶음이 없는 문단: 첫 run 에 넣는다 (run 도 없으면 새로)
+                run = para.first_run
+                t = b"<hp:t>" + new + b"</hp:t>"
+                if run is None:
+                    at = data.index(b">", start) + 1
+                    edits.append((at, at, b'<hp:run charPrIDRef="0">' + t + b"</hp:run>"))
+                elif run[2]:
+                    tag = data[run[0]:run[1] - 2].rstrip()
+                    edits.append((run[0], run[1], tag + b">" + t + b"</hp:run>"))
+                else:
+                    edits.append((run[1], run[1], t))
+            if para.lineseg:
+                edits.append((*para.lineseg, b""))
+        sec.splice(edits)
+
+    def replace_text(self, key, old, new, count=-1):
+        """글자 묶음(hp:t) 안의 old 를 new 로. 바꾼 횟수를 돌려준다."""
+        if not old:
+            raise ValueError("old 가 비어 있습니다")
+        sec, spans = self._locate(key)
+        data = sec.data
+        edits = []
+        replaced = 0
+        for start, end in spans:
+            para = _Paragraph(data, start, end)
+            changed = False
+            for _, c_start, c_end, _ in para.texts:
+                if c_start is None:
+                    continue
+                # 내용 안의 글자 조각(요소 사이)마다 따로 바꾼다
+                for piece_start, piece_end in _text_pieces(data, c_start, c_end):
+                    if count >= 0 and replaced >= count:
+                        break
+                    text = html.unescape(data[piece_start:piece_end].decode("utf-8"))
+                    n = text.count(old)
+                    if not n:
+                        continue
+                    if count >= 0:
+                        n = min(n, count - replaced)
+                    edits.append((piece_start, piece_end, _text_xml(text.replace(old, new, n))))
+                    replaced += n
+                    changed = True
+            if changed and para.lineseg:
+                edits.append((*para.lineseg, b""))
+        if edits:
+            sec.splice(edits)
+        return replaced
+
+    @property
+    def modified(self):
+        return [sec.name for sec in self._sections.values() if sec.dirty]
+
+    def to_bytes(self):
+        """고친 구역만 새로 압축하고 나머지 엔트리는 압축된 바이트 그대로 옮긴 .hwpx"""
+        z = RawZipBuilder()
+        for info in self.zf.infolist():
+            sec = self._sections.get(info.filename)
+            if sec is not None and sec.dirty:
+                z.add_bytes(info.filename, sec.data, compress=info.compress_type != STORED,
+                            level=self.compresslevel, date_time=info.date_time)
+                continue
+            raw = read_raw_member(self._fp, info)
+            z.add_raw(info.filename, info.compress_type, info.CRC, info.file_size, raw, info.date_time)
+        return z.getvalue()
+
+    def save(self, path=None):
+        data = self.to_bytes()
+        target = path or self.path
+        if os.path.abspath(target) == os.path.abspath(self.path):
+            # 원본을 덮어쓸 때는 다 쓴 뒤 바꿔치기한다 (열려 있는 원본은 먼저 닫는다)
+            self.close()
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        else:
+            with open(target, "wb") as f:
+                f.write(data)
+        return target
+
+
+def _text_pieces(data, start, end):
+    """hp:t 내용 [start, end) 에서 요소 태그 사이의 글자 조각 (시작, 끝)"""
+    pos = start
+    for m in TAG_RE.finditer(data, start, end):
+        if m.start() > pos:
+            yield pos, m.start()
+        pos = m.end()
+    if end > pos:
+        yield pos, end
+
+
+def patch_hwpx(path, out_path=None, set_texts=None, replacements=None):
+    """
+    set_texts: {key: text}, replacements: [(key, old, new)] 를 한 번에 적용해 저장한다.
+    반환: {"sections": 고친 구역 이름들, "replaced": replace 횟수 합}
+    """
+    replaced = 0
+    with HwpxPatch(path) as doc:
+        for key, text in (set_texts or {}).items():
+            doc.set_text(key, text)
+        for key, old, new in replacements or ():
+            replaced += doc.replace_text(key, old, new)
+        sections = doc.modified
+        doc.save(out_path)
+    return {"sections": sections, "replaced": replaced}
+
+
+def main():
+    # python hwpxpatch.py in.hwpx [out.hwpx] --set 문단3=새 글자 --replace "표1[0][1]" 오타 수정
+    # python hwpxpatch.py in.hwpx out.hwpx --edits edits.json     # {"문단3": "...", "표1[0][1]": "..."}
+    # python hwpxpatch.py in.hwpx --get "표1[0][1]"
+    ap = argparse.ArgumentParser(description="hwpx 의 문단/표 셀 글자만 고쳐 저장 (나머지는 그대로)")
+    ap.add_argument("input")
+    ap.add_argument("output", nargs="?", default=None, help="출력 경로 (기본: 원본 덮어쓰기)")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=TEXT")
+    ap.add_argument("--replace", action="append", nargs=3, default=[], metavar=("KEY", "OLD", "NEW"))
+    ap.add_argument("--edits", metavar="JSON", help="{key: text} JSON 파일")
+    ap.add_argument("--get", action="append", default=[], metavar="KEY", help="글자를 출력만 한다")
+    args = ap.parse_args()
+
+    if args.get:
+        with HwpxPatch(args.input) as doc:
+            for key in args.get:
+                print(f"{key}\t{doc.get_text(key)}")
+        return
+
+    set_texts = {}
+    if args.edits:
+        with open(args.edits, encoding="utf-8") as f:
+            set_texts.update(json.load(f))
+    for item in args.set:
+        key, sep, text = item.partition("=")
+        if not sep:
+            ap.error(f"--set 은 KEY=TEXT 형식이어야 합니다: {item}")
+        set_texts[key] = text
+    if not set_texts and not args.replace:
+        ap.error("--set / --replace / --edits 중 하나가 필요합니다")
+    try:
+        result = patch_hwpx(args.input, args.output, set_texts, [tuple(r) for r in args.replace])
+    except KeyError as e:
+        print(f"없는 키: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.output or args.input} 저장 (고친 구역: {', '.join(result['sections']) or '없음'}, "
+          f"바꾼 곳 {result['replaced']}개)")
+
+
+if __name__ == "__main__":
+    main()
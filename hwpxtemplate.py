@@ -0,0 +1,337 @@
+import os
+import re
+import sys
+import json
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+
+from hwpxzip import RawZipBuilder, read_raw_member, STORED
+
+# 기존 .hwpx 를 템플릿으로 한 번 읽어 두고, 값만 바꿔 같은 모양의 문서를 대량으로 찍어낸다.
+# 한글(COM)을 거치지 않고 section XML 의 글자만 치환하므로 한글이 없어도 된다.
+#
+# 자리표시자 (한글에서 본문/표 셀에 그대로 입력):
+#   {{이름}}           context["이름"]
+#   {{학교.이름}}      context["학교"]["이름"]
+#   {{학생.이름}}      표의 한 행에 있으면, context["학생"] 이 리스트일 때 그 행을 항목 수만큼 반복
+#
+#   tpl = HwpxTemplate("안내문.hwpx")
+#   tpl.render({"이름": "홍길동", "학생": [{"이름": "가"}, {"이름": "나"}]}, "out.hwpx")
+#
+# 주의
+# - 자리표시자는 한 글자 모양(run) 안에 통째로 있어야 한다. 입력 도중 서식이 바뀌어
+#   {{ 와 }} 사이가 run 으로 쪼개지면 인식되지 않는다.
+# - 반복 행을 세로로 걸치는 병합 셀(rowSpan > 1)은 다루지 않는다.
+# - 줄 배치 캐시(hp:linesegarray)는 글자가 바뀌면 틀어지므로 자리표시자가 있는 section 에서는 지운다.
+#   한글이 문서를 열 때 다시 계산한다. 미리보기(Preview/*)는 템플릿 것이 그대로 남는다.
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+LINESEG_RE = re.compile(r"<hp:linesegarray>.*?</hp:linesegarray>", re.S)
+
+TOKEN_RE = re.compile(
+    r"(?P<tbl><hp:tbl\b[^>]*>)"
+    r"|(?P<etbl></hp:tbl>)"
+    r"|(?P<tr><hp:tr\b[^>]*>)"
+    r"|(?P<etr></hp:tr>)"
+    r'|(?P<addr><hp:cellAddr\b[^>]*?\browAddr=")(?P<row>\d+)"'
+    r"|\{\{\s*(?P<field>[\w.]+)\s*\}\}"
+)
+ROWCNT_RE = re.compile(r'\browCnt="(\d+)"')
+
+_MISSING = object()
+
+
+def _is_section(name):
+    return name.startswith("Contents/section") and name.endswith(".xml")
+
+
+class _Table:
+    __slots__ = ("rows", "groups")
+
+    def __init__(self):
+        self.rows = 0       # 지금까지 연 <hp:tr> 수 (= 다음 행 번호)
+        self.groups = []    # 반복 행의 (행 번호, 리스트 이름)
+
+
+def compile_section(xml):
+    """
+    section XML 문자열을 렌더링용 노드 리스트로 바꾼다. 노드는
+      str                                       그대로 출력
+      ("field", name)                           자리표시자
+      ("rowcnt", table)                         <hp:tbl rowCnt="..."> 값
+      ("rowaddr", table, row)                   <hp:cellAddr rowAddr="..."> 값
+      ("rows", list_name, table, row, nodes)    반복 행
+    반복 행이 없는 표의 rowcnt/rowaddr 는 마지막에 문자열로 접힌다.
+    """
+    root = []
+    stack = [root]          # 노드를 쌓고 있는 리스트 (맨 위가 현재)
+    tables = []             # 열려 있는 표
+    rows = []               # 열려 있는 행: [표, 행 번호, 직접 들어있는 반복 리스트 이름]
+    pos = 0
+    for m in TOKEN_RE.finditer(xml):
+        out = stack[-1]
+        if m.start() > pos:
+            out.append(xml[pos:m.start()])
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "tbl":
+            table = _Table()
+            tables.append(table)
+            tag = m.group()
+            cnt = ROWCNT_RE.search(tag)
+            if cnt:
+                out.append(tag[:cnt.start(1)])
+                out.append(("rowcnt", table))
+                out.append(tag[cnt.end(1):])
+            else:
+                out.append(tag)
+        elif kind == "etbl":
+            tables.pop()
+            out.append(m.group())
+        elif kind == "tr":
+            table = tables[-1]
+            rows.append([table, table.rows, None])
+            table.rows += 1
+            stack.append([m.group()])
+        elif kind == "etr":
+            table, row, list_name = rows.pop()
+            nodes = stack.pop()
+            nodes.append(m.group())
+            if list_name:
+                table.groups.append((row, list_name))
+                stack[-1].append(("rows", list_name, table, row, nodes))
+            else:
+                stack[-1].extend(nodes)
+        elif kind == "row":
+            out.append(m.group("addr"))
+            out.append(("rowaddr", tables[-1], int(m.group("row"))) if tables else m.group("row"))
+            out.append('"')
+        else:
+            name = m.group("field")
+            out.append(("field", name))
+            if rows and "." in name and rows[-1][2] is None:
+                rows[-1][2] = name.split(".", 1)[0]
+    root.append(xml[pos:])
+    return _fold(root)
+
+
+def _fold(nodes):
+    """반복 행이 없는 표의 행 수/행 주소를 문자열로 바꾸고 이웃한 문자열을 합친다."""
+    out = []
+    for node in nodes:
+        if isinstance(node, tuple):
+            kind = node[0]
+            if kind == "rowcnt" and not node[1].groups:
+                node = str(node[1].rows)
+            elif kind == "rowaddr" and not node[1].groups:
+                node = str(node[2])
+            elif kind == "rows":
+                node = node[:4] + (_fold(node[4]),)
+        if isinstance(node, str) and out and isinstance(out[-1], str):
+            out[-1] += node
+        else:
+            out.append(node)
+    return out
+
+
+def collect_fields(nodes, fields=None):
+    """노드 리스트 안의 자리표시자 이름을 모은다 (반복 행 안쪽 포함)."""
+    if fields is None:
+        fields = []
+    for node in nodes:
+        if isinstance(node, tuple):
+            if node[0] == "field" and node[1] not in fields:
+                fields.append(node[1])
+            elif node[0] == "rows":
+                collect_fields(node[4], fields)
+    return fields
+
+
+def _format_value(value):
+    if value is None:
+        return ""
+    # 값 안의 줄바꿈은 같은 문단 안의 줄 나눔으로
+    return escape(str(value)).replace("\n", "<hp:lineBreak/>")
+
+
+class _Render:
+    """문서 하나를 렌더링하는 동안의 상태."""
+
+    def __init__(self, context, default):
+        self.context = context
+        self.default = default
+        self.counts = {}    # 표 -> [(행 번호, 반복 횟수)]
+
+    def lookup(self, name, scope):
+        parts = name.split(".")
+        head = parts[0]
+        if head in scope:
+            value = scope[head]
+        else:
+            value = self.context.get(head, _MISSING)
+        for part in parts[1:]:
+            if value is _MISSING:
+                break
+            value = value.get(part, _MISSING) if isinstance(value, dict) else _MISSING
+        if value is _MISSING:
+            if self.default is None:
+                raise KeyError(f"템플릿 값이 없음: {name}")
+            return self.default
+        return value
+
+    def table_counts(self, table, scope):
+        counts = []
+        for row, list_name in table.groups:
+            items = self.lookup(list_name, scope)
+            counts.append((row, len(items) if isinstance(items, (list, tuple)) else 1))
+        self.counts[table] = counts
+        return counts
+
+    def render(self, nodes, out, scope, current=None):
+        """current: (표, 반복 순번) - 지금 펼치고 있는 반복 행"""
+        for node in nodes:
+            if node.__class__ is str:
+                out.append(node)
+                continue
+            kind = node[0]
+            if kind == "field":
+                out.append(_format_value(self.lookup(node[1], scope)))
+            elif kind == "rowcnt":
+                table = node[1]
+                counts = self.table_counts(table, scope)
+                out.append(str(table.rows + sum(n - 1 for _, n in counts)))
+            elif kind == "rowaddr":
+                table, row = node[1], node[2]
+                shift = sum(n - 1 for r, n in self.counts.get(table, ()) if r < row)
+                if current is not None and current[0] is table:
+                    shift += current[1]
+                out.append(str(row + shift))
+            else:
+                _, list_name, table, row, body = node
+                items = self.lookup(list_name, scope)
+                if not isinstance(items, (list, tuple)):
+                    # 리스트가 아니면 {{학교.이름}} 같은 일반 자리표시자로 보고 한 번만
+                    self.render(body, out, scope, current)
+                    continue
+                for i, item in enumerate(items):
+                    inner = dict(scope)
+                    inner[list_name] = item
+                    self.render(body, out, inner, (table, i))
+
+
+class HwpxTemplate:
+    """
+    .hwpx 하나를 읽어 자리표시자가 있는 section 을 노드 리스트로 컴파일해 둔다.
+    나머지 엔트리(header.xml, 미리보기 이미지 등)는 압축된 바이트 그대로 한 번만 준비해 두고
+    문서마다 복사한다.
+
+    - fields: 템플릿 안의 자리표시자 이름 (등장 순서)
+    - default: 값이 없는 자리표시자에 넣을 문자열. None 이면 KeyError.
+    - compresslevel: 새로 쓰는 section 의 deflate 수준 (1 이면 더 빠르고 조금 크다)
+    """
+
+    def __init__(self, path, default=None, compresslevel=6):
+        self.path = path
+        self.default = default
+        self.compresslevel = compresslevel
+        self.sections = []          # [(name, date_time, nodes)]
+        self._base = RawZipBuilder()
+        with open(path, "rb") as fp, zipfile.ZipFile(fp) as zf:
+            infos = zf.infolist()
+            # mimetype 은 반드시 첫 엔트리, 무압축
+            infos.sort(key=lambda i: i.filename != "mimetype")
+            for info in infos:
+                if _is_section(info.filename):
+                    xml = zf.read(info).decode("utf-8")
+                    if PLACEHOLDER_RE.search(xml):
+                        xml = LINESEG_RE.sub("", xml)
+                        self.sections.append((info.filename, info.date_time, compile_section(xml)))
+                        continue
+                if info.filename == "mimetype" and info.compress_type != STORED:
+                    self._base.add_bytes("mimetype", zf.read(info), compress=False,
+                                         date_time=info.date_time)
+                    continue
+                raw = read_raw_member(fp, info)
+                self._base.add_raw(info.filename, info.compress_type, info.CRC,
+                                   info.file_size, raw, info.date_time)
+        self.fields = []
+        for _, _, nodes in self.sections:
+            collect_fields(nodes, self.fields)
+
+    def render_sections(self, context):
+        """{section 이름: XML 문자열}"""
+        result = {}
+        for name, _, nodes in self.sections:
+            out = []
+            _Render(context, self.default).render(nodes, out, {})
+            result[name] = "".join(out)
+        return result
+
+    def render_bytes(self, context):
+        z = self._base.copy()
+        for name, date_time, nodes in self.sections:
+            out = []
+            _Render(context, self.default).render(nodes, out, {})
+            z.add_bytes(name, "".join(out).encode("utf-8"),
+                        level=self.compresslevel, date_time=date_time)
+        return z.getvalue()
+
+    def render(self, context, filename):
+        data = self.render_bytes(context)
+        with open(filename, "wb") as f:
+            f.write(data)
+        return filename
+
+
+def render_many(template, jobs):
+    """
+    jobs: [(context, filename), ...] 를 같은 템플릿으로 차례로 생성한다.
+    반환: [(filename, 에러 메시지 또는 None)]
+    """
+    if not isinstance(template, HwpxTemplate):
+        template = HwpxTemplate(template)
+    results = []
+    for context, filename in jobs:
+        try:
+            template.render(context, filename)
+        except Exception as e:
+            results.append((filename, f"{type(e).__name__}: {e}"))
+        else:
+            results.append((filename, None))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="hwpx 템플릿 + JSON 데이터 -> 문서 여러 개")
+    ap.add_argument("template")
+    ap.add_argument("data", help="context 하나(객체) 또는 여러 개(배열)인 JSON 파일")
+    ap.add_argument("--out-dir", default=".")
+    ap.add_argument("--name", default="{index:04d}.hwpx",
+                    help="파일 이름 형식. {index} 와 context 의 최상위 값을 쓸 수 있다")
+    ap.add_argument("--default", default=None, help="값이 없는 자리표시자에 넣을 문자열")
+    args = ap.parse_args()
+
+    with open(args.data, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+
+    tpl = HwpxTemplate(args.template, default=args.default)
+    print(f"자리표시자 {len(tpl.fields)}개: {', '.join(tpl.fields)}")
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = []
+    for i, ctx in enumerate(data):
+        name = args.name.format(index=i, **{k: v for k, v in ctx.items() if k != "index"})
+        jobs.append((ctx, os.path.join(args.out_dir, name)))
+    results = render_many(tpl, jobs)
+    failed = [(f, e) for f, e in results if e]
+    print(f"완료: {len(results) - len(failed)}개, 실패: {len(failed)}개")
+    for f, e in failed:
+        print(f"  {f}: {e}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
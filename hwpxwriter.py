@@ -0,0 +1,557 @@
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from compactspec import iter_document
+
+# spec(dict) -> .hwpx 를 HWP(COM) 없이 직접 쓰는 백엔드.
+# doclib.generate_hwp_from_parsed_spec(..., backend="native") 에서 사용한다.
+# section0.xml 은 노드가 들어오는 대로 zip 엔트리에 바로 흘려 쓰고,
+# 실제로 쓰인 글자/문단/테두리 모양만 모아 마지막에 header.xml 을 만든다.
+
+NS_DECL = (
+    'xmlns:ha="http://www.hancom.co.kr/hwpml/2011/app" '
+    'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph" '
+    'xmlns:hp10="http://www.hancom.co.kr/hwpml/2016/paragraph" '
+    'xmlns:hs="http://www.hancom.co.kr/hwpml/2011/section" '
+    'xmlns:hc="http://www.hancom.co.kr/hwpml/2011/core" '
+    'xmlns:hh="http://www.hancom.co.kr/hwpml/2011/head" '
+    'xmlns:hhs="http://www.hancom.co.kr/hwpml/2011/history" '
+    'xmlns:hm="http://www.hancom.co.kr/hwpml/2011/master-page" '
+    'xmlns:hpf="http://www.hancom.co.kr/schema/2011/hpf" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" '
+    'xmlns:opf="http://www.idpf.org/2007/opf/" '
+    'xmlns:ooxmlchart="http://www.hancom.co.kr/hwpml/2016/ooxmlchart" '
+    'xmlns:hwpunitchar="http://www.hancom.co.kr/hwpml/2016/HwpUnitChar" '
+    'xmlns:epub="http://www.idpf.org/2007/ops" '
+    'xmlns:config="urn:oasis:names:tc:opendocument:xmlns:config:1.0"'
+)
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>'
+
+LANGS = ["HANGUL", "LATIN", "HANJA", "JAPANESE", "OTHER", "SYMBOL", "USER"]
+LANG_ATTRS = ["hangul", "latin", "hanja", "japanese", "other", "symbol", "user"]
+
+ALIGN_TO_HWPX = {"left": "LEFT", "center": "CENTER", "right": "RIGHT", "justify": "JUSTIFY"}
+
+# A4, 여백은 한글 기본값 (output.hwpx 와 동일)
+TEXT_WIDTH = 42520
+DEFAULT_CELL_HEIGHT = 1000
+
+# borderFill 1: 쪽 테두리(없음), 2: 글자용(없음). 표 셀용은 3부터 필요할 때 만든다.
+BF_PAGE = 1
+BF_CHAR = 2
+
+SEC_PR = (
+    '<hp:secPr id="" textDirection="HORIZONTAL" spaceColumns="1134" tabStop="8000" tabStopVal="4000" '
+    'tabStopUnit="HWPUNIT" outlineShapeIDRef="1" memoShapeIDRef="0" textVerticalWidthHead="0" masterPageCnt="0">'
+    '<hp:grid lineGrid="0" charGrid="0" wonggojiFormat="0"/>'
+    '<hp:startNum pageStartsOn="BOTH" page="0" pic="0" tbl="0" equation="0"/>'
+    '<hp:visibility hideFirstHeader="0" hideFirstFooter="0" hideFirstMasterPage="0" border="SHOW_ALL" '
+    'fill="SHOW_ALL" hideFirstPageNum="0" hideFirstEmptyLine="0" showLineNumber="0"/>'
+    '<hp:lineNumberShape restartType="0" countBy="0" distance="0" startNumber="0"/>'
+    '<hp:pagePr landscape="WIDELY" width="59528" height="84186" gutterType="LEFT_ONLY">'
+    '<hp:margin header="4252" footer="4252" gutter="0" left="8504" right="8504" top="5668" bottom="4252"/>'
+    '</hp:pagePr>'
+    '<hp:footNotePr><hp:autoNumFormat type="DIGIT" userChar="" prefixChar="" suffixChar=")" supscript="0"/>'
+    '<hp:noteLine length="-1" type="SOLID" width="0.12 mm" color="#000000"/>'
+    '<hp:noteSpacing betweenNotes="283" belowLine="567" aboveLine="850"/>'
+    '<hp:numbering type="CONTINUOUS" newNum="1"/><hp:placement place="EACH_COLUMN" beneathText="0"/>'
+    '</hp:footNotePr>'
+    '<hp:endNotePr><hp:autoNumFormat type="DIGIT" userChar="" prefixChar="" suffixChar=")" supscript="0"/>'
+    '<hp:noteLine length="14692344" type="SOLID" width="0.12 mm" color="#000000"/>'
+    '<hp:noteSpacing betweenNotes="0" belowLine="567" aboveLine="850"/>'
+    '<hp:numbering type="CONTINUOUS" newNum="1"/><hp:placement place="END_OF_DOCUMENT" beneathText="0"/>'
+    '</hp:endNotePr>'
+    + "".join(
+        f'<hp:pageBorderFill type="{t}" borderFillIDRef="{BF_PAGE}" textBorder="PAPER" headerInside="0" '
+        'footerInside="0" fillArea="PAPER"><hp:offset left="1417" right="1417" top="1417" bottom="1417"/>'
+        '</hp:pageBorderFill>'
+        for t in ("BOTH", "EVEN", "ODD")
+    )
+    + '</hp:secPr>'
+    '<hp:ctrl><hp:colPr id="" type="NEWSPAPER" layout="LEFT" colCount="1" sameSz="1" sameGap="0"/></hp:ctrl>'
+)
+
+VERSION_XML = (
+    XML_HEAD + '<hv:HCFVersion xmlns:hv="http://www.hancom.co.kr/hwpml/2011/version" '
+    'tagetApplication="WORDPROCESSOR" major="5" minor="1" micro="1" buildNumber="0" os="1" '
+    'xmlVersion="1.5" application="Hancom Office Hangul" appVersion="12, 0, 0, 4426 WIN32LEWindows_10"/>'
+)
+CONTAINER_XML = (
+    XML_HEAD + '<ocf:container xmlns:ocf="urn:oasis:names:tc:opendocument:xmlns:container" '
+    'xmlns:hpf="http://www.hancom.co.kr/schema/2011/hpf"><ocf:rootfiles>'
+    '<ocf:rootfile full-path="Contents/content.hpf" media-type="application/hwpml-package+xml"/>'
+    '</ocf:rootfiles></ocf:container>'
+)
+MANIFEST_XML = XML_HEAD + '<odf:manifest xmlns:odf="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0"/>'
+SETTINGS_XML = (
+    XML_HEAD + '<ha:HWPApplicationSetting xmlns:ha="http://www.hancom.co.kr/hwpml/2011/app" '
+    'xmlns:config="urn:oasis:names:tc:opendocument:xmlns:config:1.0">'
+    '<ha:CaretPosition listIDRef="0" paraIDRef="0" pos="0"/></ha:HWPApplicationSetting>'
+)
+
+
+class StyleTable:
+    """
+    section 을 쓰는 동안 만난 글자/문단/테두리 모양을 id로 interning 해 두었다가
+    header.xml 의 refList(fontfaces, borderFills, charProperties, paraProperties)로 내보낸다.
+    """
+
+    def __init__(self):
+        self.fonts = {}         # FaceName -> font id
+        self.char_shapes = {}   # (font id, height, bold, italic, underline) -> charPr id
+        self.para_shapes = {}   # align -> paraPr id
+        self.border_fills = {}  # bgColor(None 포함) -> borderFill id (셀용, 3부터)
+        # 기본 스타일(바탕글)이 가리킬 0번 모양을 먼저 만든다
+        self.char_id({"FaceName": "바탕체", "Height": 11, "Bold": False})
+        self.para_id("left")
+
+    def font_id(self, face):
+        if face not in self.fonts:
+            self.fonts[face] = len(self.fonts)
+        return self.fonts[face]
+
+    def char_id(self, style):
+        key = (
+            self.font_id(style.get("FaceName") or "바탕체"),
+            int(round(float(style.get("Height") or 11) * 100)),
+            bool(style.get("Bold")),
+            bool(style.get("Italic")),
+            bool(style.get("Underline")),
+        )
+        if key not in self.char_shapes:
+            self.char_shapes[key] = len(self.char_shapes)
+        return self.char_shapes[key]
+
+    def para_id(self, align):
+        align = ALIGN_TO_HWPX.get(align or "left", "LEFT")
+        if align not in self.para_shapes:
+            self.para_shapes[align] = len(self.para_shapes)
+        return self.para_shapes[align]
+
+    def cell_border_fill_id(self, bg_color):
+        if bg_color not in self.border_fills:
+            self.border_fills[bg_color] = len(self.border_fills) + 3
+        return self.border_fills[bg_color]
+
+    # --- header.xml ---------------------------------------------------------
+
+    def header_xml(self, sec_cnt=1):
+        parts = [XML_HEAD, f'<hh:head {NS_DECL} version="1.5" secCnt="{sec_cnt}">',
+                 '<hh:beginNum page="1" footnote="1" endnote="1" pic="1" tbl="1" equation="1"/>',
+                 '<hh:refList>']
+
+        fonts = sorted(self.fonts.items(), key=lambda kv: kv[1])
+        parts.append(f'<hh:fontfaces itemCnt="{len(LANGS)}">')
+        for lang in LANGS:
+            parts.append(f'<hh:fontface lang="{lang}" fontCnt="{len(fonts)}">')
+            for face, fid in fonts:
+                parts.append(f'<hh:font id="{fid}" face={quoteattr(face)} type="TTF" isEmbedded="0"/>')
+            parts.append('</hh:fontface>')
+        parts.append('</hh:fontfaces>')
+
+        cell_fills = sorted(self.border_fills.items(), key=lambda kv: kv[1])
+        parts.append(f'<hh:borderFills itemCnt="{len(cell_fills) + 2}">')
+        parts.append(_border_fill_xml(BF_PAGE, "NONE", None))
+        parts.append(_border_fill_xml(BF_CHAR, "NONE", None))
+        for bg, bid in cell_fills:
+            parts.append(_border_fill_xml(bid, "SOLID", bg))
+        parts.append('</hh:borderFills>')
+
+        chars = sorted(self.char_shapes.items(), key=lambda kv: kv[1])
+        parts.append(f'<hh:charProperties itemCnt="{len(chars)}">')
+        for (fid, height, bold, italic, underline), cid in chars:
+            parts.append(_char_pr_xml(cid, fid, height, bold, italic, underline))
+        parts.append('</hh:charProperties>')
+
+        parts.append('<hh:tabProperties itemCnt="1"><hh:tabPr id="0" autoTabLeft="0" autoTabRight="0"/>'
+                     '</hh:tabProperties>')
+
+        paras = sorted(self.para_shapes.items(), key=lambda kv: kv[1])
+        parts.append(f'<hh:paraProperties itemCnt="{len(paras)}">')
+        for align, pid in paras:
+            parts.append(_para_pr_xml(pid, align))
+        parts.append('</hh:paraProperties>')
+
+        parts.append('<hh:styles itemCnt="1"><hh:style id="0" type="PARA" name="바탕글" engName="Normal" '
+                     'paraPrIDRef="0" charPrIDRef="0" nextStyleIDRef="0" langID="1042" lockForm="0"/>'
+                     '</hh:styles>')
+        parts.append('</hh:refList>')
+        parts.append('<hh:compatibleDocument targetProgram="HWP201X"><hh:layoutCompatibility/>'
+                     '</hh:compatibleDocument>')
+        parts.append('<hh:docOption><hh:linkinfo path="" pageInherit="0" footnoteInherit="0"/></hh:docOption>')
+        parts.append('</hh:head>')
+        return "".join(parts)
+
+
+def _border_fill_xml(bid, line_type, bg_color):
+    borders = "".join(
+        f'<hh:{side} type="{line_type}" width="0.12 mm" color="#000000"/>'
+        for side in ("leftBorder", "rightBorder", "topBorder", "bottomBorder")
+    )
+    fill = ""
+    if bg_color:
+        fill = (f'<hc:fillBrush><hc:winBrush faceColor="{bg_color}" hatchColor="#999999" alpha="0"/>'
+                '</hc:fillBrush>')
+    return (
+        f'<hh:borderFill id="{bid}" threeD="0" shadow="0" centerLine="NONE" breakCellSeparateLine="0">'
+        '<hh:slash type="NONE" Crooked="0" isCounter="0"/><hh:backSlash type="NONE" Crooked="0" isCounter="0"/>'
+        f'{borders}<hh:diagonal type="SOLID" width="0.1 mm" color="#000000"/>{fill}</hh:borderFill>'
+    )
+
+
+def _lang_attrs(value):
+    return " ".join(f'{a}="{value}"' for a in LANG_ATTRS)
+
+
+def _char_pr_xml(cid, fid, height, bold, italic, underline):
+    return (
+        f'<hh:charPr id="{cid}" height="{height}" textColor="#000000" shadeColor="none" useFontSpace="0" '
+        f'useKerning="0" symMark="NONE" borderFillIDRef="{BF_CHAR}">'
+        f'<hh:fontRef {_lang_attrs(fid)}/><hh:ratio {_lang_attrs(100)}/><hh:spacing {_lang_attrs(0)}/>'
+        f'<hh:relSz {_lang_attrs(100)}/><hh:offset {_lang_attrs(0)}/>'
+        + ('<hh:italic/>' if italic else '')
+        + ('<hh:bold/>' if bold else '')
+        + f'<hh:underline type="{"BOTTOM" if underline else "NONE"}" shape="SOLID" color="#000000"/>'
+        '<hh:strikeout shape="NONE" color="#000000"/><hh:outline type="NONE"/>'
+        '<hh:shadow type="NONE" color="#C0C0C0" offsetX="10" offsetY="10"/></hh:charPr>'
+    )
+
+
+def _para_pr_xml(pid, align):
+    return (
+        f'<hh:paraPr id="{pid}" tabPrIDRef="0" condense="0" fontLineHeight="0" snapToGrid="1" '
+        'suppressLineNumbers="0" checked="0">'
+        f'<hh:align horizontal="{align}" vertical="BASELINE"/><hh:heading type="NONE" idRef="0" level="0"/>'
+        '<hh:breakSetting breakLatinWord="KEEP_WORD" breakNonLatinWord="KEEP_WORD" widowOrphan="0" '
+        'keepWithNext="0" keepLines="0" pageBreakBefore="0" lineWrap="BREAK"/>'
+        '<hh:autoSpacing eAsianEng="0" eAsianNum="0"/>'
+        '<hh:margin><hc:intent value="0" unit="HWPUNIT"/><hc:left value="0" unit="HWPUNIT"/>'
+        '<hc:right value="0" unit="HWPUNIT"/><hc:prev value="0" unit="HWPUNIT"/>'
+        '<hc:next value="0" unit="HWPUNIT"/></hh:margin>'
+        '<hh:lineSpacing type="PERCENT" value="160" unit="HWPUNIT"/>'
+        f'<hh:border borderFillIDRef="{BF_CHAR}" offsetLeft="0" offsetRight="0" offsetTop="0" offsetBottom="0" '
+        'connect="0" ignoreMargin="0"/></hh:paraPr>'
+    )
+
+
+def _content_hpf(n_sections, title=""):
+    items = "".join(
+        f'<opf:item id="section{i}" href="Contents/section{i}.xml" media-type="application/xml"/>'
+        for i in range(n_sections)
+    )
+    spine = "".join(f'<opf:itemref idref="section{i}" linear="yes"/>' for i in range(n_sections))
+    return (
+        XML_HEAD + f'<opf:package {NS_DECL} version="" unique-identifier="" id="">'
+        f'<opf:metadata><opf:title>{escape(title)}</opf:title><opf:language>ko</opf:language></opf:metadata>'
+        '<opf:manifest><opf:item id="header" href="Contents/header.xml" media-type="application/xml"/>'
+        f'{items}<opf:item id="settings" href="settings.xml" media-type="application/xml"/></opf:manifest>'
+        f'<opf:spine><opf:itemref idref="header" linear="yes"/>{spine}</opf:spine></opf:package>'
+    )
+
+
+# --- section0.xml ------------------------------------------------------------
+
+def _text_xml(text):
+    return f"<hp:t>{escape(text)}</hp:t>" if text else "<hp:t/>"
+
+
+class _ParagraphBuilder:
+    """
+    run(글자 모양 id, 텍스트)을 모아 <hp:p> 들로 만든다.
+    텍스트 안의 줄바꿈은 같은 문단 모양의 새 문단으로 나눈다.
+    """
+
+    def __init__(self, para_id):
+        self.para_id = para_id
+        self.paras = [[]]   # 문단별 run XML 조각 목록
+
+    def add_text(self, char_id, text):
+        lines = text.replace("\r\n", "\n").split("\n")
+        for i, line in enumerate(lines):
+            if i > 0:
+                self.paras.append([])
+            if line:
+                self.paras[-1].append(f'<hp:run charPrIDRef="{char_id}">{_text_xml(line)}</hp:run>')
+
+    def add_control(self, char_id, control_xml, new_para=True):
+        if new_para and self.paras[-1]:
+            self.paras.append([])
+        self.paras[-1].append(f'<hp:run charPrIDRef="{char_id}">{control_xml}<hp:t/></hp:run>')
+
+    def xml(self, prefix_run=""):
+        out = []
+        for i, runs in enumerate(self.paras):
+            body = "".join(runs) or '<hp:run charPrIDRef="0"/>'
+            if i == 0 and prefix_run:
+                body = prefix_run + body
+            out.append(
+                f'<hp:p id="0" paraPrIDRef="{self.para_id}" styleIDRef="0" pageBreak="0" '
+                f'columnBreak="0" merged="0">{body}</hp:p>'
+            )
+        return "".join(out)
+
+
+def _layout_cells(table_data, cell_merges):
+    """
+    rowSpan/colSpan 을 반영해 각 셀의 (rowAddr, colAddr, rowSpan, colSpan)을 계산한다.
+    parser 출력처럼 병합으로 가려진 셀이 data 에서 빠져 있는 형태를 가정한다.
+    반환: (placements[r][c], row_cnt, col_cnt)
+    """
+    occupied = set()
+    placements = []
+    col_cnt = 0
+    row_cnt = len(table_data)
+    for r_idx, row in enumerate(table_data):
+        col = 0
+        row_place = []
+        for c_idx, _ in enumerate(row):
+            merge = (cell_merges and cell_merges[r_idx][c_idx]) or {}
+            cs = max(int(merge.get("colSpan") or 1), 1)
+            rs = max(int(merge.get("rowSpan") or 1), 1)
+            while (r_idx, col) in occupied:
+                col += 1
+            for rr in range(r_idx, r_idx + rs):
+                for cc in range(col, col + cs):
+                    occupied.add((rr, cc))
+            row_place.append((r_idx, col, rs, cs))
+            col += cs
+            col_cnt = max(col_cnt, col)
+            row_cnt = max(row_cnt, r_idx + rs)
+        placements.append(row_place)
+    return placements, row_cnt, col_cnt
+
+
+class HwpxWriter:
+    """
+    doclib 의 COM 경로(insert_paragraph_from_node / insert_table_and_style)와
+    같은 노드 모양을 받아 HWPX 패키지를 직접 쓴다.
+
+        with HwpxWriter("out.hwpx") as w:
+            for node in spec["document"].values():
+                w.add_node(node)
+    """
+
+    def __init__(self, filename, title=""):
+        self.filename = filename
+        self.title = title
+        self.styles = StyleTable()
+        self._tbl_id = 0
+        self._buf = []
+        self._buf_len = 0
+        self._zf = zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED)
+        # mimetype 은 반드시 첫 엔트리, 무압축
+        self._zf.writestr(zipfile.ZipInfo("mimetype"), "application/hwp+zip", zipfile.ZIP_STORED)
+        self._zf.writestr("version.xml", VERSION_XML)
+        self._zf.writestr("META-INF/container.xml", CONTAINER_XML)
+        self._zf.writestr("META-INF/manifest.xml", MANIFEST_XML)
+        self._n_sections = 0
+        self._open_section()
+
+    def _open_section(self):
+        self._section = self._zf.open(f"Contents/section{self._n_sections}.xml", "w")
+        self._n_sections += 1
+        self._first = True
+        self._write(XML_HEAD + f"<hs:sec {NS_DECL}>")
+
+    def _close_section(self):
+        if self._first:
+            # 빈 구역이라도 구역 정의를 가진 문단 하나는 있어야 한다
+            self._emit(_ParagraphBuilder(0))
+        self._write("</hs:sec>")
+        self._flush()
+        self._section.close()
+
+    def new_section(self):
+        """지금 구역을 닫고 다음 section{n}.xml 을 연다. 이후 노드는 새 구역에 쓰인다."""
+        self._close_section()
+        self._open_section()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write(self, s):
+        self._buf.append(s)
+        self._buf_len += len(s)
+        if self._buf_len > 64 * 1024:
+            self._flush()
+
+    def _flush(self):
+        if self._buf:
+            self._section.write("".join(self._buf).encode("utf-8"))
+            self._buf = []
+            self._buf_len = 0
+
+    def _emit(self, builder):
+        # 첫 문단 첫 run 에 구역 정의(secPr)를 넣어야 한글이 쪽 설정을 읽는다
+        prefix = ""
+        if self._first:
+            prefix = f'<hp:run charPrIDRef="0">{SEC_PR}</hp:run>'
+            self._first = False
+        self._write(builder.xml(prefix))
+
+    # --- 노드 ---------------------------------------------------------------
+
+    def add_node(self, node):
+        if isinstance(node, dict) and isinstance(node.get("data"), list):
+            self.add_table(
+                node["data"],
+                cell_styles=node.get("cell_styles"),
+                col_aligns=node.get("style", {}).get("cell_align"),
+                cell_segments=node.get("cell_segments"),
+                cell_merges=node.get("cell_merges"),
+                cell_nested=node.get("cell_nested"),
+            )
+        elif isinstance(node, dict) and ("content" in node or "segments" in node):
+            self.add_paragraph(node)
+        # 기타 타입은 필요시 확장
+
+    def add_paragraph(self, node):
+        base = node.get("style", {})
+        builder = _ParagraphBuilder(self.styles.para_id(base.get("Align", "left")))
+        segments = node.get("segments") or []
+        if segments:
+            for seg in segments:
+                s_style = seg.get("style", {})
+                char_id = self.styles.char_id({
+                    "FaceName": s_style.get("FaceName", base.get("FaceName", "바탕체")),
+                    "Height": s_style.get("Height", base.get("Height", 11)),
+                    "Bold": s_style.get("Bold", base.get("Bold", False)),
+                    "Italic": s_style.get("Italic", False),
+                    "Underline": s_style.get("Underline", False),
+                })
+                builder.add_text(char_id, seg.get("text", ""))
+        else:
+            char_id = self.styles.char_id({
+                "FaceName": base.get("FaceName", "바탕체"),
+                "Height": base.get("Height", 11),
+                "Bold": base.get("Bold", False),
+            })
+            builder.add_text(char_id, node.get("content", ""))
+        self._emit(builder)
+
+    def add_table(self, table_data, cell_styles=None, col_aligns=None, cell_segments=None,
+                  cell_merges=None, cell_nested=None):
+        if not table_data or not table_data[0]:
+            return
+        builder = _ParagraphBuilder(self.styles.para_id("left"))
+        builder.add_control(0, self._table_xml(
+            table_data, cell_styles, col_aligns, cell_segments, cell_merges, cell_nested))
+        self._emit(builder)
+
+    def _table_xml(self, table_data, cell_styles, col_aligns, cell_segments, cell_merges, cell_nested):
+        placements, row_cnt, col_cnt = _layout_cells(table_data, cell_merges)
+
+        # 열 너비: colSpan=1 셀의 width 를 우선, 없으면 본문 폭을 균등 분배
+        col_w = [None] * col_cnt
+        for r_idx, row in enumerate(table_data):
+            for c_idx, _ in enumerate(row):
+                merge = (cell_merges and cell_merges[r_idx][c_idx]) or {}
+                _, col, _, cs = placements[r_idx][c_idx]
+                if cs == 1 and merge.get("width") and col_w[col] is None:
+                    col_w[col] = int(merge["width"])
+        default_w = TEXT_WIDTH // max(col_cnt, 1)
+        col_w = [w or default_w for w in col_w]
+
+        rows_xml = []
+        row_h = [DEFAULT_CELL_HEIGHT] * row_cnt
+        for r_idx, row in enumerate(table_data):
+            cells_xml = []
+            for c_idx, _ in enumerate(row):
+                base_style = cell_styles[r_idx][c_idx] if cell_styles else {}
+                segs = (cell_segments and cell_segments[r_idx][c_idx]) or None
+                merge = (cell_merges and cell_merges[r_idx][c_idx]) or {}
+                nested_tbls = (cell_nested and cell_nested[r_idx][c_idx]) or []
+                row_addr, col_addr, rs, cs = placements[r_idx][c_idx]
+
+                # 정렬은 COM 경로와 같이 열 정렬(cell_align)만 본다
+                align = col_aligns[c_idx] if col_aligns and c_idx < len(col_aligns) else "left"
+                builder = _ParagraphBuilder(self.styles.para_id(align))
+
+                if segs:
+                    for seg in segs:
+                        s = seg.get("style", {})
+                        char_id = self.styles.char_id({
+                            "FaceName": s.get("FaceName", base_style.get("FaceName", "바탕체")),
+                            "Height": s.get("Height", base_style.get("Height", 11)),
+                            "Bold": s.get("Bold", base_style.get("Bold", False)),
+                            "Italic": s.get("Italic", False),
+                            "Underline": s.get("Underline", False),
+                        })
+                        builder.add_text(char_id, seg.get("text", ""))
+                else:
+                    char_id = self.styles.char_id({
+                        "FaceName": base_style.get("FaceName", "바탕체"),
+                        "Height": base_style.get("Height", 11),
+                        "Bold": base_style.get("Bold", False),
+                    })
+                    builder.add_text(char_id, str(table_data[r_idx][c_idx]))
+
+                for inner in nested_tbls:
+                    builder.add_control(0, self._table_xml(
+                        inner["data"],
+                        inner.get("cell_styles"),
+                        None,
+                        inner.get("cell_segments"),
+                        inner.get("cell_merges"),
+                        inner.get("cell_nested"),
+                    ))
+
+                bf_id = self.styles.cell_border_fill_id(merge.get("bgColor"))
+                width = int(merge.get("width") or sum(col_w[col_addr:col_addr + cs]))
+                height = int(merge.get("height") or DEFAULT_CELL_HEIGHT * rs)
+                if rs == 1:
+                    row_h[row_addr] = max(row_h[row_addr], height)
+
+                cells_xml.append(
+                    f'<hp:tc name="" header="0" hasMargin="0" protect="0" editable="0" dirty="0" '
+                    f'borderFillIDRef="{bf_id}">'
+                    '<hp:subList id="" textDirection="HORIZONTAL" lineWrap="BREAK" vertAlign="CENTER" '
+                    'linkListIDRef="0" linkListNextIDRef="0" textWidth="0" textHeight="0" hasTextRef="0" '
+                    f'hasNumRef="0">{builder.xml()}</hp:subList>'
+                    f'<hp:cellAddr colAddr="{col_addr}" rowAddr="{row_addr}"/>'
+                    f'<hp:cellSpan colSpan="{cs}" rowSpan="{rs}"/>'
+                    f'<hp:cellSz width="{width}" height="{height}"/>'
+                    '<hp:cellMargin left="510" right="510" top="141" bottom="141"/></hp:tc>'
+                )
+            rows_xml.append("<hp:tr>" + "".join(cells_xml) + "</hp:tr>")
+
+        self._tbl_id += 1
+        tbl_bf = self.styles.cell_border_fill_id(None)
+        return (
+            f'<hp:tbl id="{self._tbl_id}" zOrder="{self._tbl_id}" numberingType="TABLE" '
+            'textWrap="TOP_AND_BOTTOM" textFlow="BOTH_SIDES" lock="0" dropcapstyle="None" pageBreak="CELL" '
+            f'repeatHeader="1" rowCnt="{row_cnt}" colCnt="{col_cnt}" cellSpacing="0" '
+            f'borderFillIDRef="{tbl_bf}" noAdjust="0">'
+            f'<hp:sz width="{sum(col_w)}" widthRelTo="ABSOLUTE" height="{sum(row_h)}" heightRelTo="ABSOLUTE" '
+            'protect="0"/>'
+            '<hp:pos treatAsChar="1" affectLSpacing="0" flowWithText="1" allowOverlap="0" holdAnchorAndSO="0" '
+            'vertRelTo="PARA" horzRelTo="COLUMN" vertAlign="TOP" horzAlign="LEFT" vertOffset="0" horzOffset="0"/>'
+            '<hp:outMargin left="141" right="141" top="141" bottom="141"/>'
+            '<hp:inMargin left="510" right="510" top="141" bottom="141"/>'
+            + "".join(rows_xml) + "</hp:tbl>"
+        )
+
+    # --- 마무리 -------------------------------------------------------------
+
+    def close(self):
+        if self._zf is None:
+            return
+        self._close_section()
+        self._zf.writestr("Contents/header.xml", self.styles.header_xml())
+        self._zf.writestr("Contents/content.hpf", _content_hpf(self._n_sections, self.title))
+        self._zf.writestr("settings.xml", SETTINGS_XML)
+        self._zf.close()
+        self._zf = None
+
+
+def write_hwpx_from_spec(spec, filename="output.hwpx"):
+    """
+    parsed_spec 형식({"document": {...}}, 압축 형식 포함)을 HWP 없이 바로 .hwpx 로 쓴다.
+    """
+    with HwpxWriter(filename) as writer:
+        for _, node in iter_document(spec):
+            writer.add_node(node)
+    return filename
@@ -0,0 +1,96 @@
+import struct
+import time
+import zlib
+
+# 압축을 다시 풀지 않고 zip 엔트리를 옮겨 담는 최소한의 zip 작성기.
+# 같은 템플릿에서 문서를 수백 개 찍어낼 때 header.xml, 미리보기 이미지 같은
+# 바뀌지 않는 엔트리는 원본의 압축된 바이트를 그대로 복사하고, 바뀐 section 만 새로 압축한다.
+# (zip64 는 지원하지 않는다. hwpx 엔트리는 4GB 를 넘지 않는다.)
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+
+LOCAL_SIG = 0x04034B50
+CENTRAL_SIG = 0x02014B50
+END_SIG = 0x06054B50
+
+FLAG_UTF8 = 0x800
+STORED = 0
+DEFLATED = 8
+
+
+def _dos_time(date_time):
+    y, mo, d, h, mi, s = date_time
+    return (h << 11) | (mi << 5) | (s // 2), ((y - 1980) << 9) | (mo << 5) | d
+
+
+def read_raw_member(fp, zinfo):
+    """
+    열린 zip 파일(fp)에서 zinfo 엔트리의 압축된 바이트를 그대로 읽는다.
+    로컬 헤더의 extra 길이는 중앙 디렉터리와 다를 수 있으므로 로컬 헤더를 직접 읽는다.
+    """
+    fp.seek(zinfo.header_offset)
+    header = fp.read(LOCAL_HEADER.size)
+    fields = LOCAL_HEADER.unpack(header)
+    if fields[0] != LOCAL_SIG:
+        raise ValueError(f"로컬 헤더가 아님: {zinfo.filename}")
+    fp.seek(fields[9] + fields[10], 1)
+    return fp.read(zinfo.compress_size)
+
+
+class RawZipBuilder:
+    """
+    메모리 위에서 zip 을 만든다.
+
+        base = RawZipBuilder()
+        base.add_bytes("mimetype", b"application/hwp+zip", compress=False)
+        base.add_raw(name, method, crc, file_size, raw, date_time)   # 원본에서 복사
+        z = base.copy()                  # 공통 부분은 한 번만 만들어 두고 문서마다 복사
+        z.add_bytes("Contents/section0.xml", data)
+        open("out.hwpx", "wb").write(z.getvalue())
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._central = []
+
+    def copy(self):
+        other = RawZipBuilder()
+        other._buf = bytearray(self._buf)
+        other._central = list(self._central)
+        return other
+
+    def add_raw(self, name, method, crc, file_size, raw, date_time=None):
+        name_bytes = name.encode("utf-8")
+        flags = 0 if name.isascii() else FLAG_UTF8
+        dtime, ddate = _dos_time(date_time or time.localtime()[:6])
+        version = 20 if method == DEFLATED else 10
+        offset = len(self._buf)
+        self._buf += LOCAL_HEADER.pack(
+            LOCAL_SIG, version, flags, method, dtime, ddate,
+            crc, len(raw), file_size, len(name_bytes), 0,
+        )
+        self._buf += name_bytes
+        self._buf += raw
+        self._central.append(CENTRAL_HEADER.pack(
+            CENTRAL_SIG, 20, version, flags, method, dtime, ddate,
+            crc, len(raw), file_size, len(name_bytes), 0, 0, 0, 0, 0, offset,
+        ) + name_bytes)
+
+    def add_bytes(self, name, data, compress=True, level=6, date_time=None):
+        crc = zlib.crc32(data)
+        if compress:
+            c = zlib.compressobj(level, zlib.DEFLATED, -15)
+            raw = c.compress(data) + c.flush()
+            self.add_raw(name, DEFLATED, crc, len(data), raw, date_time)
+        else:
+            self.add_raw(name, STORED, crc, len(data), data, date_time)
+
+    def getvalue(self):
+        central = b"".join(self._central)
+        end = END_RECORD.pack(
+            END_SIG, 0, 0, len(self._central), len(self._central),
+            len(central), len(self._buf), 0,
+        )
+        return bytes(self._buf) + central + end
@@ -1,7 +1,11 @@
 import sys
 import json
 import yaml
+import argparse
+from contextlib import nullcontext
 from doclib import generate_hwp_from_parsed_spec
+from specstream import is_stream_path, read_spec_stream
+from profiling import Profiler, stage
 
 def load_spec(path):
     if path.endswith('.json'):
@@ -15,17 +19,41 @@ def load_spec(path):
 
 def main():
     if len(sys.argv) < 2:
-        print("사용법: python main.py parsed_spec.json [output.hwpx]")
+        print("사용법: python main.py (parsed_spec.json | spec.ndjson | -) [output.hwpx] [--backend com|native]")
         sys.exit(1)
 
-    spec_path = sys.argv[1]
-    output = sys.argv[2] if len(sys.argv) >= 3 else "output.hwpx"
+    ap = argparse.ArgumentParser(description="parsed_spec.json -> hwpx 생성")
+    ap.add_argument("spec_path", help=".json, 또는 NDJSON 스트림(.ndjson/.jsonl, -: stdin)")
+    ap.add_argument("output", nargs="?", default="output.hwpx")
+    ap.add_argument("--backend", choices=["com", "native"], default="com",
+                    help="com: 한글(pyhwpx)로 생성, native: 한글 없이 HWPX 직접 생성")
+    ap.add_argument("--optimize", action="store_true",
+                    help="(com) 글꼴/정렬이 바뀌지 않는 중복 호출을 걸러냄")
+    ap.add_argument("--profile", action="store_true",
+                    help="단계별 시간/메모리와 Hwp 메서드별 호출 수/시간을 stderr 로 출력")
+    ap.add_argument("--profile-out", metavar="JSON", help="--profile 결과를 JSON 으로 저장")
+    args = ap.parse_args()
 
-    with open(spec_path, encoding="utf-8") as f:
-        spec = json.load(f)
+    profile = Profiler() if args.profile or args.profile_out else None
+    try:
+        with profile if profile is not None else nullcontext():
+            if is_stream_path(args.spec_path):
+                # 한 줄씩 읽으며 바로 생성한다 (문서 전체를 메모리에 올리지 않음)
+                spec = read_spec_stream(args.spec_path)
+            else:
+                with stage(profile, "load_spec"), open(args.spec_path, encoding="utf-8") as f:
+                    spec = json.load(f)
 
-    generate_hwp_from_parsed_spec(spec, filename=output)
-    print(f"완료: {output}")
+            stats = generate_hwp_from_parsed_spec(spec, filename=args.output, backend=args.backend,
+                                                  optimize=args.optimize, profile=profile)
+    finally:
+        # 생성이 실패해도 tracemalloc 을 끄고(with), 그때까지의 보고서는 남긴다
+        if profile is not None:
+            profile.write_report(args.profile_out)
+    print(f"완료: {args.output}")
+    if stats:
+        by_kind = ", ".join(f"{k} {v}" for k, v in stats["saved_by"].items())
+        print(f"COM 호출 {stats['requested']}회 중 {stats['saved']}회 생략 ({by_kind})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,248 @@
+# 파서가 만드는 block 의 메모리 절약형 표현.
+#
+# 예전에는 run 마다 모양 dict, 셀마다 병합 dict 와 모양 dict 사본을 새로 만들었다.
+# 여기서는 __slots__ 클래스에 값만 담고, 글자 모양(Style)은 값이 같으면 한 객체를 같이 쓴다
+# (같은 charPrIDRef/paraPrIDRef 의 run 은 모두 같은 Style). JSON 으로 내보낼 때만 dict 를 만든다.
+#
+#   Paragraph.to_spec() / Table.to_spec()  ->  parse_hwpx_to_spec 의 "문단N"/"표N" 노드 (예전과 같은 JSON)
+#   to_block() / block_from_dict()          ->  예전 block dict 와 오가기 (구역 캐시 JSON)
+#   block["data"], block.get("cell_nested") ->  예전 block dict 처럼 읽기 (호환용, 읽을 때마다 새로 만든다)
+
+
+class Style:
+    """run 하나의 글자 모양. intern_style() 로만 만들고 고치지 않는다."""
+
+    __slots__ = ("align", "face", "height", "bold", "_items")
+
+    def __init__(self, align, face, height, bold):
+        self.align = align
+        self.face = face
+        self.height = height
+        self.bold = bold
+        # parser 가 예전에 만들던 dict 와 같은 키 순서 (없는 값은 키도 없다)
+        self._items = tuple((k, v) for k, v in (("Align", align), ("FaceName", face),
+                                                ("Height", height), ("Bold", bold)) if v is not None)
+
+    def to_dict(self):
+        return dict(self._items)
+
+    def __reduce__(self):
+        # 다른 프로세스에서 풀어도 그쪽 표에 다시 등록되게
+        return intern_style, (self.align, self.face, self.height, self.bold)
+
+    def __repr__(self):
+        return f"Style({self.to_dict()})"
+
+
+_STYLES = {}
+
+
+def intern_style(align, face=None, height=None, bold=None):
+    """값이 같은 Style 은 프로세스 안에서 하나만 만든다."""
+    key = (align, face, height, bold)
+    style = _STYLES.get(key)
+    if style is None:
+        style = _STYLES.setdefault(key, Style(align, face, height, bold))
+    return style
+
+
+def style_from_dict(d):
+    return intern_style(d.get("Align"), d.get("FaceName"), d.get("Height"), d.get("Bold"))
+
+
+class Segment:
+    """같은 모양으로 이어지는 글자. text 는 run 을 이어 붙이는 동안만 바뀐다."""
+
+    __slots__ = ("text", "style")
+
+    def __init__(self, text, style):
+        self.text = text
+        self.style = style
+
+    def to_dict(self):
+        return {"text": self.text, "style": self.style.to_dict()}
+
+
+def _segments_to_dicts(segments):
+    return [seg.to_dict() for seg in segments]
+
+
+def _segments_from_dicts(items):
+    return tuple(Segment(d["text"], style_from_dict(d.get("style") or {})) for d in items or ())
+
+
+class _BlockView:
+    """예전 block dict 처럼 block["키"] / block.get("키") 로 읽기 (FIELDS 의 함수로 그때그때 만든다)."""
+
+    __slots__ = ()
+    FIELDS = {}
+
+    def __getitem__(self, key):
+        try:
+            field = self.FIELDS[key]
+        except KeyError:
+            raise KeyError(key) from None
+        return field(self)
+
+    def get(self, key, default=None):
+        field = self.FIELDS.get(key)
+        return default if field is None else field(self)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+
+class Paragraph(_BlockView):
+    """표 밖의 문단 하나. content 는 앞뒤 공백을 뗀 전체 글자."""
+
+    __slots__ = ("content", "segments")
+    type = "paragraph"
+
+    def __init__(self, content, segments):
+        self.content = content
+        self.segments = segments
+
+    def to_block(self):
+        return {"type": "paragraph", "content": self.content, "segments": _segments_to_dicts(self.segments)}
+
+    def to_spec(self):
+        """doclib 문단 노드 (parser.paragraph_node 와 같은 모양)"""
+        base = self.segments[0].style if self.segments else None
+        return {
+            "content": self.content,
+            "style": {
+                "FaceName": base.face if base and base.face is not None else "바탕체",
+                "Height": base.height if base and base.height is not None else 11,
+                "Bold": base.bold if base and base.bold is not None else False,
+                "Align": base.align if base and base.align is not None else "left",
+            },
+            "segments": _segments_to_dicts(self.segments),
+        }
+
+    FIELDS = {
+        "type": lambda b: "paragraph",
+        "content": lambda b: b.content,
+        "segments": lambda b: _segments_to_dicts(b.segments),
+    }
+
+
+class Cell:
+    """
+    표 셀 하나. segments 는 중첩 표 밖 문단들의 segment 를 이어 놓은 것, text 는 그 문단 글자들을
+    공백으로 이은 것(빈 문단은 빠짐), nested 는 이 셀에 바로 들어있는 표들.
+    셀 모양(cell_styles)은 첫 segment 의 모양이므로 따로 두지 않는다.
+    """
+
+    __slots__ = ("text", "segments", "col_span", "row_span", "bg_color", "width", "height", "nested")
+
+    def __init__(self, text, segments, col_span=1, row_span=1, bg_color=None, width=None, height=None,
+                 nested=()):
+        self.text = text
+        self.segments = segments
+        self.col_span = col_span
+        self.row_span = row_span
+        self.bg_color = bg_color
+        self.width = width
+        self.height = height
+        self.nested = nested
+
+    def style_dict(self):
+        return self.segments[0].style.to_dict() if self.segments else {}
+
+    def merge_dict(self):
+        return {
+            "colSpan": self.col_span,
+            "rowSpan": self.row_span,
+            "bgColor": self.bg_color,
+            "width": self.width,
+            "height": self.height,
+        }
+
+
+class Table(_BlockView):
+    """표 하나. rows 는 셀이 하나 이상인 행들 (행마다 Cell 튜플)."""
+
+    __slots__ = ("rows",)
+    type = "table"
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def _grid(self, fn):
+        return [[fn(cell) for cell in row] for row in self.rows]
+
+    def data(self):
+        return self._grid(lambda cell: cell.text)
+
+    def cell_styles(self):
+        return self._grid(Cell.style_dict)
+
+    def cell_segments(self):
+        return self._grid(lambda cell: _segments_to_dicts(cell.segments))
+
+    def cell_merges(self):
+        return self._grid(Cell.merge_dict)
+
+    def cell_nested(self):
+        return self._grid(lambda cell: [t.to_block() for t in cell.nested])
+
+    def to_block(self):
+        return {
+            "type": "table",
+            "data": self.data(),
+            "style": {},
+            "cell_styles": self.cell_styles(),
+            "cell_segments": self.cell_segments(),
+            "cell_merges": self.cell_merges(),
+            "cell_nested": self.cell_nested(),
+        }
+
+    def to_spec(self):
+        """doclib 표 노드 (parser.table_node 와 같은 모양)"""
+        cols = len(self.rows[0]) if self.rows else 0
+        return {
+            "data": self.data(),
+            "style": {
+                "cell_font": "바탕체",
+                "cell_size": 11,
+                "cell_align": ["left"] * cols,
+            },
+            "cell_styles": self.cell_styles(),
+            "cell_segments": self.cell_segments(),
+            "cell_merges": self.cell_merges(),
+            "cell_nested": self.cell_nested(),
+        }
+
+    FIELDS = {
+        "type": lambda b: "table",
+        "data": data,
+        "style": lambda b: {},
+        "cell_styles": cell_styles,
+        "cell_segments": cell_segments,
+        "cell_merges": cell_merges,
+        "cell_nested": cell_nested,
+    }
+
+
+def block_from_dict(d):
+    """예전 block dict (구역 캐시 JSON) -> Paragraph / Table"""
+    if d.get("type") == "paragraph":
+        return Paragraph(d["content"], _segments_from_dicts(d.get("segments")))
+    rows = []
+    empty = [[]] * len(d["data"])
+    for r, texts in enumerate(d["data"]):
+        segs = (d.get("cell_segments") or empty)[r]
+        merges = (d.get("cell_merges") or empty)[r]
+        nested = (d.get("cell_nested") or empty)[r]
+        row = []
+        for c, text in enumerate(texts):
+            merge = merges[c] if c < len(merges) else {}
+            row.append(Cell(
+                text,
+                _segments_from_dicts(segs[c] if c < len(segs) else ()),
+                merge.get("colSpan", 1), merge.get("rowSpan", 1), merge.get("bgColor"),
+                merge.get("width"), merge.get("height"),
+                tuple(block_from_dict(t) for t in (nested[c] if c < len(nested) else ())),
+            ))
+        rows.append(tuple(row))
+    return Table(tuple(rows))
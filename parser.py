@@ -1,25 +1,47 @@
 import os, sys, json
-from pyhwpx import Hwp
+import re
+import html
 import zipfile
 import xml.etree.ElementTree as ET
 import json
-
-NS = {
-    "hp": "http://www.hancom.co.kr/hwpml/2011/paragraph",
-    "hh": "http://www.hancom.co.kr/hwpml/2011/head"
-}
-HP = "{http://www.hancom.co.kr/hwpml/2011/paragraph}"
+import glob
+import time
+import argparse
+from collections import deque, OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from compactspec import compact_spec
+from specstream import write_spec_stream
+from profiling import Profiler, stage
+from hwp5reader import HwpUnsupported, open_hwp_as_hwpx
+from model import Paragraph, Table, Cell, Segment, intern_style, block_from_dict
+import xmlbackend as xb
+from xmlbackend import NS, HP
+
+# 자주 찾는 태그 (xb.children / xb.child 에 넘긴다)
+RUN_TAG, T_TAG, TR_TAG, TC_TAG = f"{HP}run", f"{HP}t", f"{HP}tr", f"{HP}tc"
+CELL_SPAN_TAG, CELL_SZ_TAG = f"{HP}cellSpan", f"{HP}cellSz"
+XMLNS_RE = re.compile(rb'\sxmlns:\w+="[^"]*"')
+ROOT_TAG_RE = re.compile(rb"<[^?!][^>]*>")
+
+# .hwp 를 읽는 방법. "native"(기본): hwp5reader 로 직접, "com": 한글(pyhwpx)로 .hwpx 변환 후.
+# native 로 못 읽는 문서(암호/배포용 등)는 자동으로 com 으로 넘어간다.
+HWP_READER = os.environ.get("HWP_READER", "native")
 
 def ensure_hwpx(input_path: str) -> str:
     """
     input_path가 .hwpx면 그대로 사용,
     .hwp면 pyhwpx로 hwpx로 변환한 뒤 그 경로를 리턴한다.
     그 외 확장자는 에러.
+    (한글이 필요한 느린 경로다. 해석만 할 때는 open_hwpx 를 쓴다.)
     """
     ext = os.path.splitext(input_path)[1].lower()
     if ext == ".hwpx":
         return input_path
     if ext == ".hwp":
+        from pyhwpx import Hwp
+
         hwpx_path = os.path.splitext(input_path)[0] + ".hwpx"
 
         hwp = Hwp()  # pyhwpx 래퍼. 내부에서 보안 모듈 등록까지 처리[web:148][web:331]
@@ -32,93 +54,318 @@ def ensure_hwpx(input_path: str) -> str:
 
     raise ValueError(f"지원하지 않는 확장자: {ext} (hwp/hwpx만 지원)")
 
-def parse_styles_from_header(zf: zipfile.ZipFile):
+def open_hwpx(input_path: str) -> zipfile.ZipFile:
     """
-    header.xml의 refList에서
-    - fontfaces: 언어별 폰트 id -> faceName
-    - charPr: charShapeID -> (Height, FaceName)
-    - paraPr: paraShapeID -> Align
-    을 추출한다.
+    .hwpx 는 그대로 열고, .hwp 는 hwp5reader 로 메모리 위의 .hwpx 를 만들어 연다 (한글 불필요).
+    HWP_READER=com 이거나 hwp5reader 가 읽지 못하는 문서면 ensure_hwpx(한글 변환)로 연다.
+    .hwp 에서 만든 zip 은 파일 경로가 없다 (zf.filename 이 None).
     """
-    para_shapes = {}   # id -> {"Align": ...}
-    char_shapes = {}   # id -> {"Height": ..., "FaceName": ...}
+    ext = os.path.splitext(input_path)[1].lower()
+    if ext == ".hwp" and HWP_READER != "com":
+        try:
+            return open_hwp_as_hwpx(input_path)
+        except HwpUnsupported:
+            pass
+    return zipfile.ZipFile(ensure_hwpx(input_path), "r")
+
+HEADER_NAME = "Contents/header.xml"
+
+# 같은 학교 템플릿에서 나온 문서는 header.xml 이 바이트 단위로 같다.
+# zip 엔트리의 (CRC32, 크기)를 키로 해석 결과를 프로세스 안에서 재사용하고,
+# HWPX_HEADER_CACHE 가 지정되면 디스크에도 JSON 으로 남겨 프로세스 간에 공유한다.
+# 디스크 캐시 파일 이름에는 형식 버전이 들어간다: 저장하는 모양이 바뀌면 올려서 옛 파일을 쓰지 않게 한다.
+_HEADER_CACHE = {}
+HEADER_CACHE_DIR = os.environ.get("HWPX_HEADER_CACHE")
+HEADER_CACHE_FORMAT = 1
+
+# header.xml 해석 방식. "eager"(기본): refList 전체를 트리로 읽는다.
+# "lazy": 구역들이 실제로 가리키는 charPr/paraPr/borderFill id 만 골라 해석한다 (HeaderIndex).
+# 모양이 수백 개 정의된 템플릿에서 몇십 개만 쓰는 문서에 맞는다. 결과는 쓰이는 id 에 대해 같다.
+# 대신 id 를 모으려고 구역을 한 번 더 읽으므로 본문이 큰 문서에서는 오히려 느리다.
+# "auto": header.xml 이 구역들을 합친 것보다 크면 lazy, 아니면 eager (zip 목록의 크기로만 판단).
+HEADER_MODE = os.environ.get("HWPX_HEADER_MODE", "eager")
+_LAZY_HEADERS = {}
+
+ALIGN_MAP = {
+    "LEFT": "left",
+    "RIGHT": "right",
+    "CENTER": "center",
+    "JUSTIFY": "justify",
+    "BOTH": "justify",
+}
 
+def header_fingerprint(zf: zipfile.ZipFile):
+    """header.xml 엔트리의 (CRC32, 크기). 없으면 None."""
     try:
-        with zf.open("Contents/header.xml") as f:
-            tree = ET.parse(f)
+        info = zf.getinfo(HEADER_NAME)
     except KeyError:
-        return para_shapes, char_shapes
+        return None
+    return (info.CRC, info.file_size)
+
+def parse_header(zf: zipfile.ZipFile, cache_dir: str | None = None, lazy: bool | None = None):
+    """
+    header.xml 을 한 번만 읽어서 (para_shapes, char_shapes, border_fills)를 같이 만든다.
+    결과는 (CRC32, 크기) 기준으로 캐시되므로 돌려받은 dict 는 읽기 전용으로 쓴다.
+    lazy=True 면 이 문서의 구역들이 가리키는 id 만 해석한다 (None 이면 HWPX_HEADER_MODE 를 따른다).
+    이미 전체를 해석해 둔 header 가 있으면 그것을 쓰고, 디스크 캐시는 읽거나 쓰지 않는다.
+    """
+    key = header_fingerprint(zf)
+    if key is None:
+        return {}, {}, {}
+
+    styles = _HEADER_CACHE.get(key)
+    if styles is not None:
+        return styles
+
+    if lazy is None:
+        lazy = HEADER_MODE == "lazy" or (HEADER_MODE == "auto" and _header_dominates(zf))
+    if lazy:
+        index = _LAZY_HEADERS.get(key)
+        if index is None:
+            index = _LAZY_HEADERS[key] = HeaderIndex(zf.read(HEADER_NAME))
+        return index.resolve(*collect_style_refs(zf))
+
+    cache_dir = cache_dir or HEADER_CACHE_DIR
+    if cache_dir:
+        styles = _load_header_cache(cache_dir, key)
+
+    if styles is None:
+        with zf.open(HEADER_NAME) as f:
+            root = xb.parse(f)
+        styles = styles_from_header_root(root)
+        if cache_dir:
+            _save_header_cache(cache_dir, key, styles)
+
+    _HEADER_CACHE[key] = styles
+    return styles
+
+def _header_dominates(zf: zipfile.ZipFile):
+    """header.xml 이 구역 XML 들을 합친 것보다 큰지 (압축 전 크기)"""
+    sections = sum(zf.getinfo(sec).file_size for sec in list_section_files(zf))
+    return zf.getinfo(HEADER_NAME).file_size >= sections
+
+def clear_header_cache():
+    _HEADER_CACHE.clear()
+    _LAZY_HEADERS.clear()
+
+def _header_cache_path(cache_dir, key):
+    crc, size = key
+    return os.path.join(cache_dir, f"header-v{HEADER_CACHE_FORMAT}-{crc:08x}-{size}.json")
+
+def _load_header_cache(cache_dir, key):
+    path = _header_cache_path(cache_dir, key)
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # JSON 키는 문자열이므로 id 를 다시 int 로
+    return tuple(
+        {int(k): v for k, v in raw[name].items()}
+        for name in ("para_shapes", "char_shapes", "border_fills")
+    )
+
+def _save_header_cache(cache_dir, key, styles):
+    para_shapes, char_shapes, border_fills = styles
+    path = _header_cache_path(cache_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "para_shapes": para_shapes,
+            "char_shapes": char_shapes,
+            "border_fills": border_fills,
+        }, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def styles_from_header_root(root: ET.Element):
+    """
+    header.xml 의 refList 를 한 번 훑어서
+    - fontfaces: 언어별 폰트 id -> faceName
+    - charPr: charShapeID -> (Height, FaceName, Bold)
+    - paraPr: paraShapeID -> Align
+    - borderFill: borderFillID -> fillColor
+    를 추출한다.
+    """
+    para_shapes = {}   # id -> {"Align": ...}
+    char_shapes = {}   # id -> {"Height": ..., "FaceName": ..., "Bold": ...}
+    border_fills = {}  # id -> {"fillColor": ...}
 
-    root = tree.getroot()
     ref_list = root.find("hh:refList", NS)
     if ref_list is None:
-        return para_shapes, char_shapes
-
-    # 1) fontfaces: 언어(HANGUL/LATIN 등)별 id->face 맵 만들기 [web:150]
-    font_map = {}  # {"HANGUL": {0:"함초롬돋움", 1:"함초롬바탕"}, ...}
-    fontfaces = ref_list.find("hh:fontfaces", NS)
-    if fontfaces is not None:
-        for ff in fontfaces.findall("hh:fontface", NS):
-            lang = ff.get("lang")  # ex) "HANGUL"
-            lang_fonts = {}
-            for font in ff.findall("hh:font", NS):
-                fid = int(font.get("id"))
-                face = font.get("face")
-                lang_fonts[fid] = face
-            font_map[lang] = lang_fonts
-
-    # 2) charPr: 높이 + fontRef.hangul -> FaceName 매핑 [web:157]
-    char_props = ref_list.find("hh:charProperties", NS)
-    if char_props is not None:
-        for char_pr in char_props.findall("hh:charPr", NS):
-            cid = int(char_pr.get("id"))
-            height_raw = char_pr.get("height")
-            height_pt = int(height_raw) / 100.0 if height_raw and height_raw.isdigit() else None
-
-            # 기본값: bold=False
-            is_bold = False
-            # 하위 엘리먼트 중에 <hh:bold>가 있으면 True [web:163]
-            for child in char_pr:
-                if child.tag == "{" + NS["hh"] + "}bold":
-                    is_bold = True
-                    break
+        return para_shapes, char_shapes, border_fills
+
+    hh = "{" + NS["hh"] + "}"
+    hangul_fonts = {}   # fontfaces 의 HANGUL 폰트 id -> face
+    char_font_ids = {}  # charPr id -> fontRef.hangul id (fontfaces 순서와 무관하게 마지막에 연결)
+
+    for group in ref_list:
+        tag = group.tag
+
+        # 1) fontfaces: HANGUL 폰트 id->face 맵 [web:150]
+        if tag == hh + "fontfaces":
+            for ff in group.findall("hh:fontface", NS):
+                if ff.get("lang") == "HANGUL":
+                    hangul_fonts.update(fonts_from_fontface_el(ff))
+
+        # 2) charPr: 높이 + bold + fontRef.hangul [web:157][web:163]
+        elif tag == hh + "charProperties":
+            for char_pr in group.findall("hh:charPr", NS):
+                cid = int(char_pr.get("id"))
+                char_shapes[cid], hangul_id = char_shape_from_el(char_pr)
+                if hangul_id is not None:
+                    char_font_ids[cid] = hangul_id
+
+        # 3) paraPr: 문단 정렬 [web:157]
+        elif tag == hh + "paraProperties":
+            for para_pr in group.findall("hh:paraPr", NS):
+                para_shapes[int(para_pr.get("id"))] = para_shape_from_el(para_pr)
+
+        # 4) borderFill: 셀 배경색
+        elif tag == hh + "borderFills":
+            for bf in group.findall("hh:borderFill", NS):
+                bid = bf.get("id")
+                if not bid or not bid.isdigit():
+                    continue
+                border_fills[int(bid)] = {"fillColor": pick_fill_color_from_borderfill(bf)}
+
+    for cid, hid in char_font_ids.items():
+        char_shapes[cid]["FaceName"] = hangul_fonts.get(hid)
+
+    return para_shapes, char_shapes, border_fills
+
+def fonts_from_fontface_el(ff: ET.Element):
+    """<hh:fontface> 하나 -> 폰트 id -> faceName"""
+    return {int(font.get("id")): font.get("face") for font in ff.findall("hh:font", NS)}
+
+def char_shape_from_el(char_pr: ET.Element):
+    """<hh:charPr> 하나 -> ({"Height", "FaceName": None, "Bold"}, fontRef.hangul id 또는 None)"""
+    hh = "{" + NS["hh"] + "}"
+    height_raw = char_pr.get("height")
+    height_pt = int(height_raw) / 100.0 if height_raw and height_raw.isdigit() else None
+
+    is_bold = False
+    hangul_id = None
+    for child in char_pr:
+        if child.tag == hh + "bold":
+            is_bold = True
+        elif child.tag == hh + "fontRef":
+            hangul_id = child.get("hangul")
+
+    shape = {
+        "Height": height_pt,
+        "FaceName": None,
+        "Bold": is_bold
+    }
+    return shape, int(hangul_id) if hangul_id is not None and hangul_id.isdigit() else None
+
+def para_shape_from_el(para_pr: ET.Element):
+    """<hh:paraPr> 하나 -> {"Align": ...}"""
+    align_el = para_pr.find("hh:align", NS)
+    if align_el is not None:
+        horiz = align_el.get("horizontal", "LEFT").upper()
+        return {"Align": ALIGN_MAP.get(horiz, "left")}
+    return {"Align": "left"}
+
 
-            # fontRef 하위 요소에서 hangul 폰트 id 가져오기
-            face_name = None
-            font_ref = char_pr.find("hh:fontRef", NS)
-            if font_ref is not None:
-                hangul_id = font_ref.get("hangul")
-                if hangul_id is not None and hangul_id.isdigit():
-                    hid = int(hangul_id)
-                    hangul_fonts = font_map.get("HANGUL", {})
-                    face_name = hangul_fonts.get(hid)
-
-            char_shapes[cid] = {
-                "Height": height_pt,
-                "FaceName": face_name,
-                "Bold": is_bold
-            }
-
-    # 3) paraPr: 문단 정렬 추출 [web:157]
-    para_props = ref_list.find("hh:paraProperties", NS)
-    if para_props is not None:
-        for para_pr in para_props.findall("hh:paraPr", NS):
-            pid = int(para_pr.get("id"))
-            align_el = para_pr.find("hh:align", NS)
-            if align_el is not None:
-                horiz = align_el.get("horizontal", "LEFT").upper()
-                align_map = {
-                    "LEFT": "left",
-                    "RIGHT": "right",
-                    "CENTER": "center",
-                    "JUSTIFY": "justify",
-                    "BOTH": "justify",
-                }
-                align = align_map.get(horiz, "left")
+# 이름마다 따로 찾는다 (고정 접두사로 찾는 편이 한 번에 묶은 패턴보다 세 배쯤 빠르다)
+STYLE_REF_RES = tuple(re.compile(name + rb'="(\d+)"') for name in (b"paraPrIDRef", b"charPrIDRef", b"borderFillIDRef"))
+HEADER_ITEM_RE = re.compile(rb"<hh:(charPr|paraPr|borderFill|fontface)\s[^>]*?(/?)>")
+HEADER_ID_RE = re.compile(rb'\sid="(\d+)"')
+HEADER_LANG_RE = re.compile(rb'\slang="([^"]*)"')
+
+def collect_style_refs(zf: zipfile.ZipFile, sections=None):
+    """
+    구역들이 실제로 가리키는 (paraPr id, charPr id, borderFill id) 집합.
+    XML 을 트리로 만들지 않고 바이트에서 ...IDRef="N" 만 찾는다.
+    """
+    found = (set(), set(), set())
+    for sec in sections if sections is not None else list_section_files(zf):
+        data = zf.read(sec)
+        for ids, pattern in zip(found, STYLE_REF_RES):
+            ids.update(set(pattern.findall(data)))
+    return tuple({int(v) for v in ids} for ids in found)
+
+class HeaderIndex:
+    """
+    header.xml(bytes) 안의 charPr/paraPr/borderFill/fontface 위치만 먼저 색인해 두고,
+    resolve() 로 요청받은 id 의 조각만 잘라 해석한다 (styles_from_header_root 와 같은 규칙).
+    해석한 결과는 누적되므로 같은 템플릿의 다음 문서는 새로 쓰인 id 만 해석한다.
+    hh 접두사가 표준 네임스페이스가 아니면 전체를 해석하는 방식으로 돌아간다.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        root_tag = ROOT_TAG_RE.search(data)
+        decls = b"".join(XMLNS_RE.findall(root_tag.group())) if root_tag else b""
+        self._wrap = (b"<wrap" + decls + b">", b"</wrap>")
+        self.spans = {b"charPr": {}, b"paraPr": {}, b"borderFill": {}}
+        self.hangul_fontfaces = []
+        self.para_shapes, self.char_shapes, self.border_fills = {}, {}, {}
+        self._hangul_fonts = None
+        self._full = b'xmlns:hh="' + NS["hh"].encode() + b'"' not in decls
+        if self._full:
+            return
+        for m in HEADER_ITEM_RE.finditer(data):
+            name, selfclose = m.groups()
+            if selfclose:
+                end = m.end()
             else:
-                align = "left"
-            para_shapes[pid] = {"Align": align}
+                end = data.find(b"</hh:" + name + b">", m.end())
+                if end < 0:
+                    continue
+                end += len(name) + 6
+            if name == b"fontface":
+                lang = HEADER_LANG_RE.search(m.group())
+                if lang and lang.group(1) == b"HANGUL":
+                    self.hangul_fontfaces.append((m.start(), end))
+                continue
+            ident = HEADER_ID_RE.search(m.group())
+            if ident:
+                self.spans[name][int(ident.group(1))] = (m.start(), end)
+
+    def _parse(self, spans):
+        """조각들을 한 번에 감싸서 해석한 요소 리스트"""
+        if not spans:
+            return []
+        head, tail = self._wrap
+        return list(xb.fromstring(head + b"".join(self.data[s:e] for s, e in spans) + tail))
+
+    def resolve(self, para_ids, char_ids, border_fill_ids):
+        """요청한 id 들을 해석해 (para_shapes, char_shapes, border_fills) 를 돌려준다 (header 에 없는 id 는 빠진다)."""
+        if self._full:
+            if not (self.para_shapes or self.char_shapes or self.border_fills):
+                self.para_shapes, self.char_shapes, self.border_fills = \
+                    styles_from_header_root(xb.fromstring(self.data))
+            return self.para_shapes, self.char_shapes, self.border_fills
+
+        todo = [pid for pid in sorted(para_ids) if pid not in self.para_shapes and pid in self.spans[b"paraPr"]]
+        for pid, el in zip(todo, self._parse([self.spans[b"paraPr"][pid] for pid in todo])):
+            self.para_shapes[pid] = para_shape_from_el(el)
+
+        todo = [cid for cid in sorted(char_ids) if cid not in self.char_shapes and cid in self.spans[b"charPr"]]
+        for cid, el in zip(todo, self._parse([self.spans[b"charPr"][cid] for cid in todo])):
+            shape, hangul_id = char_shape_from_el(el)
+            if hangul_id is not None:
+                if self._hangul_fonts is None:
+                    self._hangul_fonts = {}
+                    for ff in self._parse(self.hangul_fontfaces):
+                        self._hangul_fonts.update(fonts_from_fontface_el(ff))
+                shape["FaceName"] = self._hangul_fonts.get(hangul_id)
+            self.char_shapes[cid] = shape
+
+        todo = [bid for bid in sorted(border_fill_ids)
+                if bid not in self.border_fills and bid in self.spans[b"borderFill"]]
+        for bid, el in zip(todo, self._parse([self.spans[b"borderFill"][bid] for bid in todo])):
+            self.border_fills[bid] = {"fillColor": pick_fill_color_from_borderfill(el)}
+
+        return self.para_shapes, self.char_shapes, self.border_fills
 
+def parse_styles_from_header(zf: zipfile.ZipFile):
+    """
+    (para_shapes, char_shapes) — parse_header()의 일부만 돌려주는 호환용 함수.
+    """
+    para_shapes, char_shapes, _ = parse_header(zf)
     return para_shapes, char_shapes
 
 def paragraph_to_markdown(p_el: ET.Element, char_shapes: dict):
@@ -126,7 +373,7 @@ def paragraph_to_markdown(p_el: ET.Element, char_shapes: dict):
     각 run의 charPrIDRef를 보고 Bold 여부를 판단,
     Bold 구간을 **로 감싸 Markdown 문자열로 만든다.
     """
-    runs = p_el.findall("hp:run", NS)
+    runs = list(xb.children(p_el, RUN_TAG))
     if not runs:
         # run이 없다면 예전 방식으로
         return extract_text_runs(p_el)
@@ -149,7 +396,7 @@ def paragraph_to_markdown(p_el: ET.Element, char_shapes: dict):
 
         # run 내부 모든 t 텍스트 합치기
         txt_parts = []
-        for t in run.findall("hp:t", NS):
+        for t in xb.children(run, T_TAG):
             if t.text:
                 txt_parts.append(t.text)
         result.append("".join(txt_parts))
@@ -165,7 +412,7 @@ def paragraph_to_markdown(p_el: ET.Element, char_shapes: dict):
 def paragraph_to_segments(p_el, para_shapes, char_shapes):
     """
     하나의 <hp:p>를 run 단위로 잘라, style이 바뀔 때마다 새 segment를 만드는 함수.
-    segment = {"text": "...", "style": {...}}
+    segment = model.Segment(text, style) — 모양이 같은 run 은 같은 Style 객체라서 is 로 비교한다.
     """
     segments = []
 
@@ -177,32 +424,22 @@ def paragraph_to_segments(p_el, para_shapes, char_shapes):
         align = para_shapes.get(pid, {}).get("Align", "left")
 
     # run 순회
-    for run in p_el.findall("hp:run", NS):
-        txt_parts = []
-        for t in run.findall("hp:t", NS):
-            if t.text:
-                txt_parts.append(t.text)
-        text = "".join(txt_parts)
+    for cid_ref, text in xb.run_texts(p_el):
         if not text:
             continue
 
         # run별 charShape
-        style = {"Align": align}
-        cid_ref = run.get("charPrIDRef")
-        if cid_ref and cid_ref.isdigit():
-            cs = char_shapes.get(int(cid_ref), {})
-            if cs.get("FaceName"):
-                style["FaceName"] = cs["FaceName"]
-            if cs.get("Height"):
-                style["Height"] = cs["Height"]
-            if cs.get("Bold") is not None:
-                style["Bold"] = cs["Bold"]
+        cs = char_shapes.get(int(cid_ref)) if cid_ref and cid_ref.isdigit() else None
+        if cs:
+            style = intern_style(align, cs.get("FaceName") or None, cs.get("Height") or None, cs.get("Bold"))
+        else:
+            style = intern_style(align)
 
         # 이전 segment와 style이 같으면 텍스트만 이어붙이고, 다르면 새 segment 생성
-        if segments and segments[-1]["style"] == style:
-            segments[-1]["text"] += text
+        if segments and segments[-1].style is style:
+            segments[-1].text += text
         else:
-            segments.append({"text": text, "style": style})
+            segments.append(Segment(text, style))
 
     return segments
 
@@ -211,229 +448,321 @@ def paragraph_to_segments(p_el, para_shapes, char_shapes):
 
 def extract_text_runs(p_el: ET.Element):
     parts = []
-    for run in p_el.findall("hp:run", NS):
-        for t in run.findall("hp:t", NS):
+    for run in xb.children(p_el, RUN_TAG):
+        for t in xb.children(run, T_TAG):
             if t.text:
                 parts.append(t.text)
-    for t in p_el.findall("hp:t", NS):
+    for t in xb.children(p_el, T_TAG):
         if t.text:
             parts.append(t.text)
     return "".join(parts).strip()
 
-def parse_sections_to_blocks(zf, para_shapes, char_shapes, border_fills):
+SECTION_NAME_RE = re.compile(r"Contents/section(\d*)\.xml$")
+
+def list_section_files(zf):
+    """Contents/section*.xml 을 구역 번호 순서로 (section10 이 section2 보다 뒤)."""
+    found = []
+    for n in zf.namelist():
+        m = SECTION_NAME_RE.match(n)
+        if m:
+            found.append((int(m.group(1) or -1), n))
+        elif n.startswith("Contents/section") and n.endswith(".xml"):
+            found.append((float("inf"), n))
+    return [n for _, n in sorted(found)]
+
+def parse_table_block(tbl_el, para_shapes, char_shapes, border_fills):
+    """
+    <hp:tbl> 요소 하나를 table block(model.Table)으로 만든다. 행이 하나도 없으면 None.
+    셀 안의 표는 같은 모양의 block 으로 Cell.nested 에 재귀적으로 들어간다 (spec 의 cell_nested[r][c]).
+    (walk()와 스트리밍 모드가 같이 쓴다)
+    """
+    rows = []
+
+    for tr in xb.children(tbl_el, TR_TAG):
+        row = []
+        for tc in xb.children(tr, TC_TAG):
+            col_span, row_span, bg_color, w, h = parse_tc_props(tc, border_fills)
+            cell_text, segments, nested_tables = parse_tc_contents(tc, para_shapes, char_shapes, border_fills)
+            row.append(Cell(cell_text, segments, col_span, row_span, bg_color, w, h, nested_tables))
+
+        if row:
+            rows.append(tuple(row))
+
+    if not rows:
+        return None
+    return Table(tuple(rows))
+
+def paragraph_block(p_el, para_shapes, char_shapes):
+    """<hp:p> 하나 -> paragraph block(model.Paragraph). 텍스트가 없으면 None."""
+    segs = paragraph_to_segments(p_el, para_shapes, char_shapes)
+    full_text = "".join(s.text for s in segs).strip()
+    if not full_text:
+        return None
+    return Paragraph(full_text, tuple(segs))
+
+def parse_sections_to_blocks(zf, para_shapes, char_shapes, border_fills, streaming=False, profile=None):
     blocks = []
-    section_files = sorted(
-        [n for n in zf.namelist()
-         if n.startswith("Contents/section") and n.endswith(".xml")]
-    )
+    for sec in list_section_files(zf):
+        blocks.extend(parse_section_blocks(zf, sec, para_shapes, char_shapes, border_fills, streaming,
+                                           profile=profile))
+    return blocks
+
 
-    for sec in section_files:
-        with zf.open(sec) as f:
-            tree = ET.parse(f)
-        root = tree.getroot()
-
-        section_el = root.find("hp:section", NS)
-        if section_el is None:
-            section_el = root
-
-        def walk(node, in_table=False):
-            tag = node.tag
-
-            if tag == f"{HP}tbl":
-                data = []
-                cell_styles = []
-                cell_segments = []
-                cell_merges = []
-                cell_nested = []  # ← 새로 추가
-
-                for tr in node.findall("hp:tr", NS):
-                    row_texts = []
-                    row_styles = []
-                    row_seglist = []
-                    row_merge = []
-                    row_nested = []
-
-                    for tc in tr.findall("hp:tc", NS):
-                        col_span, row_span, bg_color, w, h = parse_tc_props(tc, border_fills)
-                        cell_text, cell_style, segs_merged, nested_tables = parse_tc_contents(
-                            tc, para_shapes, char_shapes, border_fills
-                        )
-
-                        row_texts.append(cell_text)
-                        row_styles.append(cell_style)
-                        row_seglist.append(segs_merged)
-                        row_merge.append({
-                            "colSpan": col_span,
-                            "rowSpan": row_span,
-                            "bgColor": bg_color,
-                            "width": w,
-                            "height": h,
-                        })
-                        row_nested.append(nested_tables)
-
-                    if row_texts:
-                        data.append(row_texts)
-                        cell_styles.append(row_styles)
-                        cell_segments.append(row_seglist)
-                        cell_merges.append(row_merge)
-                        cell_nested.append(row_nested)
-
-                if data:
-                    blocks.append({
-                        "type": "table",
-                        "data": data,
-                        "style": {},
-                        "cell_styles": cell_styles,
-                        "cell_segments": cell_segments,
-                        "cell_merges": cell_merges,
-                        "cell_nested": cell_nested,   # ← 추가
-                    })
-                return
-
-            if tag == f"{HP}p" and not in_table:
-                segs = paragraph_to_segments(node, para_shapes, char_shapes)
-                full_text = "".join(s["text"] for s in segs).strip()
-                if full_text:
-                    blocks.append({
-                        "type": "paragraph",
-                        "content": full_text,
-                        "segments": segs,
-                    })
-
-            for child in list(node):
-                walk(child, in_table or tag == f"{HP}tbl")
-
-        walk(section_el, False)
+def parse_section_blocks(zf, sec, para_shapes, char_shapes, border_fills, streaming=False, profile=None):
+    """
+    section*.xml 하나를 block 리스트로.
+    profile(profiling.Profiler)을 넘기면 zip 읽기 / XML 해석 / walk 를 단계별로 잰다.
+    """
+    if streaming:
+        with stage(profile, "iterparse"):
+            return list(iter_section_file_blocks(zf, sec, para_shapes, char_shapes, border_fills))
 
+    blocks = []
+    with stage(profile, "zip_read"):
+        data = zf.read(sec)
+    with stage(profile, "xml_parse"):
+        root = xb.fromstring(data)
+    del data
+
+    section_el = root.find("hp:section", NS)
+    if section_el is None:
+        section_el = root
+
+    # 표 밖의 문단과 최상위 표를 문서 순서(전위)로. 문단 안의 표/문단도 따로 나온다.
+    TBL_TAG = f"{HP}tbl"
+    with stage(profile, "walk"):
+        for node in xb.top_items(section_el):
+            if node.tag == TBL_TAG:
+                block = parse_table_block(node, para_shapes, char_shapes, border_fills)
+            else:
+                block = paragraph_block(node, para_shapes, char_shapes)
+            if block:
+                blocks.append(block)
     return blocks
 
 
-def parse_single_table(tbl_el, para_shapes, char_shapes, border_fills):
+def iter_section_blocks(zf, para_shapes, char_shapes, border_fills):
     """
-    <hp:tbl> 요소 하나를 파싱해 table block(dict) 반환.
-    (기존 parse_sections_to_blocks 안의 표 처리 로직을 그대로 여기로 옮겼다고 보면 됨)
+    parse_sections_to_blocks 의 스트리밍 버전.
+    section*.xml 을 iterparse 로 읽으면서 표/문단의 끝 태그가 닫히는 대로 block 을 내보내고,
+    다 쓴 요소는 바로 비워서 섹션 크기와 상관없이 메모리를 일정하게 유지한다.
     """
-    data = []
-    cell_styles = []
-    cell_segments = []
-    cell_merges = []
+    for sec in list_section_files(zf):
+        yield from iter_section_file_blocks(zf, sec, para_shapes, char_shapes, border_fills)
 
-    for tr in tbl_el.findall("hp:tr", NS):
-        row_texts = []
-        row_styles = []
-        row_seglist = []
-        row_merge = []
 
-        for tc in tr.findall("hp:tc", NS):
-            # 크기/배경/병합 정보
-            col_span, row_span, bg_color, w, h = parse_tc_props(tc, border_fills)
+def iter_section_file_blocks(zf, sec, para_shapes, char_shapes, border_fills):
+    """
+    section*.xml 하나에 대한 iter_section_blocks.
 
-            cell_text_chunks = []
-            segs_merged = []
-            cell_style = None
-
-            # 이 시점에서는 "텍스트용 p"만 처리. (중첩 표는 밖에서 처리)
-            for p in tc.findall(".//hp:p", NS):
-                segs = paragraph_to_segments(p, para_shapes, char_shapes)
-                if segs:
-                    cell_text_chunks.append("".join(s["text"] for s in segs))
-                    if cell_style is None:
-                        cell_style = segs[0]["style"].copy()
-                    segs_merged.extend(segs)
-
-            row_texts.append(" ".join([t for t in cell_text_chunks if t]))
-            row_styles.append(cell_style or {})
-            row_seglist.append(segs_merged)
-            row_merge.append({
-                "colSpan": col_span,
-                "rowSpan": row_span,
-                "bgColor": bg_color,
-                "width": w,
-                "height": h,
-            })
-
-        if row_texts:
-            data.append(row_texts)
-            cell_styles.append(row_styles)
-            cell_segments.append(row_seglist)
-            cell_merges.append(row_merge)
+    walk()는 문단을 먼저 내보낸 뒤 그 안의 표를 내보내므로(전위 순회),
+    시작 태그 순서대로 자리를 예약해 두고 앞자리가 채워진 것부터 순서대로 내보낸다.
+    """
+    P_TAG, TBL_TAG = f"{HP}p", f"{HP}tbl"
+
+    with zf.open(sec) as f:
+        pending = deque()  # [완료 여부, block] — 시작 태그 순서
+        open_slots = []    # 아직 닫히지 않은 p/tbl 의 자리
+        tbl_depth = 0
+        root = None
+
+        for event, el in xb.iterparse(f, events=("start", "end")):
+            tag = el.tag
+            if event == "start":
+                if root is None:
+                    root = el
+                if tag == TBL_TAG:
+                    if tbl_depth == 0:
+                        slot = [False, None]
+                        pending.append(slot)
+                        open_slots.append(slot)
+                    tbl_depth += 1
+                elif tag == P_TAG and tbl_depth == 0:
+                    slot = [False, None]
+                    pending.append(slot)
+                    open_slots.append(slot)
+                continue
+
+            if tag == TBL_TAG:
+                tbl_depth -= 1
+                if tbl_depth:
+                    continue
+                slot = open_slots.pop()
+                slot[1] = parse_table_block(el, para_shapes, char_shapes, border_fills)
+            elif tag == P_TAG and tbl_depth == 0:
+                slot = open_slots.pop()
+                slot[1] = paragraph_block(el, para_shapes, char_shapes)
+            else:
+                continue
+            slot[0] = True
+            el.clear()
+
+            while pending and pending[0][0]:
+                block = pending.popleft()[1]
+                if block is not None:
+                    yield block
+
+            # 최상위 요소까지 끝났으면 루트에 붙어 있는 빈 껍데기도 떼어낸다
+            if not open_slots and root is not None:
+                del root[:]
+
+
+# 구역별 결과 캐시 ------------------------------------------------------------
+# 여러 구역 문서에서 한 구역만 고쳐 저장했을 때, 바뀌지 않은 구역은 다시 해석하지 않는다.
+# 키: (구역 이름, 구역 CRC32, 구역 크기, header.xml 지문). header 가 바뀌면 모양 해석이
+# 달라지므로 모든 구역이 다시 해석된다.
+# HWPX_SECTION_CACHE 가 지정되면 디스크에도 JSON 으로 남긴다 (다시 실행해도 유지).
+# block 모양(model 의 to_block)이 바뀌면 SECTION_CACHE_FORMAT 을 올린다. 파일 이름에 들어가므로
+# 옛 파서가 남긴 파일은 그냥 없는 것(miss)이 된다.
+
+SECTION_CACHE_SIZE = 256
+_SECTION_CACHE = OrderedDict()
+SECTION_CACHE_DIR = os.environ.get("HWPX_SECTION_CACHE")
+SECTION_CACHE_FORMAT = 1
+
+def section_cache_key(zf: zipfile.ZipFile, sec: str, header_key):
+    info = zf.getinfo(sec)
+    return (sec, info.CRC, info.file_size, header_key)
+
+def clear_section_cache():
+    _SECTION_CACHE.clear()
+
+def _section_cache_path(cache_dir, key):
+    sec, crc, size, header_key = key
+    name = os.path.splitext(os.path.basename(sec))[0]
+    hcrc, hsize = header_key or (0, 0)
+    return os.path.join(cache_dir, f"{name}-v{SECTION_CACHE_FORMAT}-{crc:08x}-{size}-h{hcrc:08x}-{hsize}.json")
+
+def _load_section_cache(cache_dir, key):
+    try:
+        with open(_section_cache_path(cache_dir, key), encoding="utf-8") as f:
+            return [block_from_dict(d) for d in json.load(f)]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _save_section_cache(cache_dir, key, blocks):
+    path = _section_cache_path(cache_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump([b.to_block() for b in blocks], f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def parse_sections_cached(zf, para_shapes, char_shapes, border_fills, header_key,
+                          streaming=False, cache_dir=None, stats=None, profile=None):
+    """
+    parse_sections_to_blocks 와 같은 결과를 구역별 캐시를 거쳐 만든다.
+    캐시에서 나온 block 은 다른 호출과 공유되므로 읽기 전용으로 쓴다.
+    stats(dict)를 넘기면 "hit"/"miss" 에 구역 수를 더한다.
+    """
+    cache_dir = cache_dir or SECTION_CACHE_DIR
+    blocks = []
+    for sec in list_section_files(zf):
+        key = section_cache_key(zf, sec, header_key)
+        sec_blocks = _SECTION_CACHE.get(key)
+        if sec_blocks is None and cache_dir:
+            sec_blocks = _load_section_cache(cache_dir, key)
+        hit = sec_blocks is not None
+        if not hit:
+            sec_blocks = parse_section_blocks(zf, sec, para_shapes, char_shapes, border_fills, streaming,
+                                              profile=profile)
+            if cache_dir:
+                _save_section_cache(cache_dir, key, sec_blocks)
+        _SECTION_CACHE[key] = sec_blocks
+        _SECTION_CACHE.move_to_end(key)
+        while len(_SECTION_CACHE) > SECTION_CACHE_SIZE:
+            _SECTION_CACHE.popitem(last=False)
+        if stats is not None:
+            stats["hit" if hit else "miss"] = stats.get("hit" if hit else "miss", 0) + 1
+        blocks.extend(sec_blocks)
+    return blocks
+
+
+# 구역 병렬 해석 ----------------------------------------------------------------
+# 구역끼리는 header 의 모양 표만 공유하므로 따로 해석해도 된다. header 는 부모가 한 번 해석해
+# worker 를 띄울 때 한 번만 넘기고(initializer), worker 는 zip 을 한 번 열어 둔 채 구역 이름만 받는다.
+
+_section_worker = None   # (ZipFile, (para_shapes, char_shapes, border_fills))
+
+
+def _init_section_worker(hwpx_path, styles, xml_backend):
+    global _section_worker
+    xb.use(xml_backend)
+    _section_worker = (zipfile.ZipFile(hwpx_path, "r"), styles)
+
+
+def _parse_section_in_worker(sec, streaming):
+    zf, styles = _section_worker
+    return parse_section_blocks(zf, sec, *styles, streaming)
 
-    return {
-        "data": data,
-        "cell_styles": cell_styles,
-        "cell_segments": cell_segments,
-        "cell_merges": cell_merges,
-    }
+
+def parse_sections_parallel(hwpx_path, zf, para_shapes, char_shapes, border_fills, workers,
+                            streaming=False):
+    """
+    parse_sections_to_blocks 와 같은 결과를 구역마다 worker 프로세스에서 만든다.
+    큰 구역부터 맡기고, 결과는 구역 순서대로 이어 붙인다. 구역이 하나뿐이거나 workers <= 1 이면
+    그냥 순서대로 해석한다.
+    """
+    sections = list_section_files(zf)
+    workers = min(workers or os.cpu_count() or 1, len(sections))
+    if workers <= 1:
+        return parse_sections_to_blocks(zf, para_shapes, char_shapes, border_fills, streaming=streaming)
+
+    order = sorted(range(len(sections)), key=lambda i: -zf.getinfo(sections[i]).compress_size)
+    results = [None] * len(sections)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_section_worker,
+                             initargs=(hwpx_path, (para_shapes, char_shapes, border_fills), xb.name)) as pool:
+        futures = {i: pool.submit(_parse_section_in_worker, sections[i], streaming) for i in order}
+        for i, fut in futures.items():
+            results[i] = fut.result()
+    return [block for sec_blocks in results for block in sec_blocks]
+
+
+def parse_single_table(tbl_el, para_shapes, char_shapes, border_fills):
+    """
+    <hp:tbl> 요소 하나를 파싱해 table block(model.Table) 반환.
+    parse_table_block 과 같되, 행이 하나도 없어도 빈 표를 돌려준다 (예전 호출부 호환).
+    """
+    block = parse_table_block(tbl_el, para_shapes, char_shapes, border_fills)
+    if block is None:
+        block = Table(())
+    return block
 
 def parse_tc_contents(tc, para_shapes, char_shapes, border_fills):
     """
-    하나의 <hp:tc> 안에서
-      - 중첩 <hp:tbl> 들을 table spec으로 추출하고
-      - 그 표들 안에 속하지 않는 p 들만 외부 셀 텍스트로 사용한다.
-    반환: (cell_text:str, cell_style:dict, segs_merged:list, nested_tables:list)
+    하나의 <hp:tc> 를 한 번만 훑어서
+      - 이 셀에 바로 들어있는 <hp:tbl> 은 parse_table_block 으로 파싱하고
+        (그 표 안의 표는 다시 그 표의 cell_nested 로 들어간다)
+      - 중첩 표 밖의 p 들만 외부 셀 텍스트로 사용한다.
+    중첩 표 아래로는 내려가지 않으므로 각 요소는 한 번씩만 방문한다.
+    반환: (cell_text:str, segments:tuple[Segment], nested_tables:tuple[Table])
+    셀 모양(spec 의 cell_styles)은 첫 segment 의 모양이다 (model.Cell.style_dict).
     """
+    TBL_TAG = f"{HP}tbl"
     cell_text_chunks = []
     segs_merged = []
-    cell_style = None
     nested_tables = []
 
-    # 1) tc 아래 모든 중첩 tbl 수집
-    nested_tbl_elems = list(tc.findall(".//hp:tbl", NS))
-
-    # 1-1) 중첩 tbl 안에 포함된 모든 p를 set에 모아둠
-    p_in_nested = set()
-    for tbl in nested_tbl_elems:
-        for p in tbl.findall(".//hp:p", NS):
-            p_in_nested.add(p)
-
-    # 1-2) 중첩 tbl 자체를 table spec으로 파싱
-    for tbl in nested_tbl_elems:
-        tbl_block = parse_single_table(tbl, para_shapes, char_shapes, border_fills)
-        nested_tables.append({
-            "type": "table",
-            **tbl_block
-        })
-
-    # 2) tc 아래의 모든 p 중에서, nested tbl 안에 속하지 않는 것만 외부 텍스트로 사용
-    for p in tc.findall(".//hp:p", NS):
-        if p in p_in_nested:
-            continue  # 중첩 표 안의 문단은 셀 텍스트에서 제외
-
-        segs = paragraph_to_segments(p, para_shapes, char_shapes)
+    for el in xb.top_items(tc):
+        if el.tag == TBL_TAG:
+            block = parse_table_block(el, para_shapes, char_shapes, border_fills)
+            if block:
+                nested_tables.append(block)
+            continue
+        segs = paragraph_to_segments(el, para_shapes, char_shapes)
         if segs:
-            cell_text_chunks.append("".join(s["text"] for s in segs))
-            if cell_style is None:
-                cell_style = segs[0]["style"].copy()
+            cell_text_chunks.append("".join(s.text for s in segs))
             segs_merged.extend(segs)
 
     cell_text = " ".join([t for t in cell_text_chunks if t])
-    return cell_text, (cell_style or {}), segs_merged, nested_tables
+    return cell_text, tuple(segs_merged), tuple(nested_tables)
 
 
 
 
 def parse_table_styles_from_header(zf: zipfile.ZipFile):
-    border_fills = {}
-    with zf.open("Contents/header.xml") as f:
-        tree = ET.parse(f)
-    root = tree.getroot()
-    ref_list = root.find("hh:refList", NS)
-    if ref_list is None:
-        return border_fills
-
-    bf_parent = ref_list.find("hh:borderFills", NS)
-    if bf_parent is None:
-        return border_fills
-
-    for bf in bf_parent.findall("hh:borderFill", NS):
-        bid = bf.get("id")
-        if not bid or not bid.isdigit():
-            continue
-        bid = int(bid)
-
-        color = pick_fill_color_from_borderfill(bf)
-        border_fills[bid] = {"fillColor": color}
-    return border_fills
+    """borderFill id -> {"fillColor": ...} — parse_header()의 일부만 돌려주는 호환용 함수."""
+    return parse_header(zf)[2]
 
 
 
@@ -448,7 +777,7 @@ def parse_tc_props(tc, border_fills):
         bf = border_fills.get(int(bf_ref), {})
         bg_color = bf.get("fillColor")
 
-    cell_span_el = tc.find("hp:cellSpan", NS)
+    cell_span_el = xb.child(tc, CELL_SPAN_TAG)
     if cell_span_el is not None:
         col_attr = cell_span_el.get("colSpan")
         row_attr = cell_span_el.get("rowSpan")
@@ -457,7 +786,7 @@ def parse_tc_props(tc, border_fills):
         if row_attr and row_attr.isdigit():
             row_span = int(row_attr)
 
-    cell_sz_el = tc.find("hp:cellSz", NS)
+    cell_sz_el = xb.child(tc, CELL_SZ_TAG)
     if cell_sz_el is not None:
         w = cell_sz_el.get("width")
         h = cell_sz_el.get("height")
@@ -475,29 +804,25 @@ def pick_fill_color_from_borderfill(bf_el: ET.Element) -> str | None:
       2) gradation.color/@value 첫 번째
       3) winBrush.hatchColor
     - 모두 없으면 None.
+    서브트리는 한 번만 훑고, 1순위를 만나면 바로 돌려준다.
     """
     # ns1: (core 네임스페이스) 접두사까지 포함 가능성 감안해서 로컬 태그/속성이름으로 처리
-    # 1) winBrush.faceColor
+    grad = None
+    hatch = None
     for el in bf_el.iter():
-        lname = el.tag.split('}')[-1]
+        lname = el.tag.rpartition('}')[2]
         if lname == "winBrush":
             face = el.attrib.get("faceColor")
             if face and face.lower() != "none":
                 return normalize_color(face)
-    # 2) gradation.color/@value
-    for el in bf_el.iter():
-        lname = el.tag.split('}')[-1]
-        if lname == "color":
-            val = el.attrib.get("value")
-            if val:
-                return normalize_color(val)
-    # 3) winBrush.hatchColor (백색이 아닌 경우에 한해)
-    for el in bf_el.iter():
-        lname = el.tag.split('}')[-1]
-        if lname == "winBrush":
-            hatch = el.attrib.get("hatchColor")
-            if hatch:
-                return normalize_color(hatch)
+            if hatch is None:
+                hatch = el.attrib.get("hatchColor") or None
+        elif lname == "color" and grad is None:
+            grad = el.attrib.get("value") or None
+    if grad:
+        return normalize_color(grad)
+    if hatch:
+        return normalize_color(hatch)
     return None
 
 def normalize_color(val: str) -> str:
@@ -517,44 +842,57 @@ def normalize_color(val: str) -> str:
 # 3) blocks -> doclib용 document spec 변환 ----------------------------------
 
 def blocks_to_document_spec(blocks):
-    doc = {}
+    return {"document": dict(iter_document_nodes(blocks))}
+
+
+def iter_document_nodes(blocks):
+    """blocks(이터러블) -> ("문단N"/"표N", node) 를 하나씩. 스트림 출력에서 그대로 쓴다."""
     p_idx, t_idx = 1, 1
 
     for b in blocks:
         if b["type"] == "paragraph":
-            key = f"문단{p_idx}"
-            base = b["segments"][0]["style"].copy() if b.get("segments") else {}
-            doc[key] = {
-                "content": b["content"],
-                "style": {
-                    "FaceName": base.get("FaceName", "바탕체"),
-                    "Height": base.get("Height", 11),
-                    "Bold": base.get("Bold", False),
-                    "Align": base.get("Align", "left")
-                },
-                "segments": b.get("segments", [])
-            }
+            yield f"문단{p_idx}", paragraph_node(b)
             p_idx += 1
 
         elif b["type"] == "table":
-            key = f"표{t_idx}"
-            cols = len(b["data"][0])
-            doc[key] = {
-                "data": b["data"],
-                "style": {
-                    "cell_font": "바탕체",
-                    "cell_size": 11,
-                    "cell_align": ["left"] * cols,
-                },
-                "cell_styles": b.get("cell_styles"),
-                "cell_segments": b.get("cell_segments"),
-                "cell_merges": b.get("cell_merges"),
-                "cell_nested": b.get("cell_nested"),  # ← 추가
-            }
+            yield f"표{t_idx}", table_node(b)
             t_idx += 1
 
 
-    return {"document": doc}
+def paragraph_node(b):
+    """paragraph block -> doclib 문단 노드 (예전 dict block 도 받는다)"""
+    if not isinstance(b, dict):
+        return b.to_spec()
+    base = b["segments"][0]["style"].copy() if b.get("segments") else {}
+    return {
+        "content": b["content"],
+        "style": {
+            "FaceName": base.get("FaceName", "바탕체"),
+            "Height": base.get("Height", 11),
+            "Bold": base.get("Bold", False),
+            "Align": base.get("Align", "left")
+        },
+        "segments": b.get("segments", [])
+    }
+
+
+def table_node(b):
+    """table block -> doclib 표 노드 (예전 dict block 도 받는다)"""
+    if not isinstance(b, dict):
+        return b.to_spec()
+    cols = len(b["data"][0])
+    return {
+        "data": b["data"],
+        "style": {
+            "cell_font": "바탕체",
+            "cell_size": 11,
+            "cell_align": ["left"] * cols,
+        },
+        "cell_styles": b.get("cell_styles"),
+        "cell_segments": b.get("cell_segments"),
+        "cell_merges": b.get("cell_merges"),
+        "cell_nested": b.get("cell_nested"),  # ← 추가
+    }
 
 
 def debug_dump_styles(para_shapes, char_shapes, limit=10):
@@ -639,30 +977,436 @@ def debug_borderfill(zf, bid):
 
 # 4) 전체 파이프라인 ----------------------------------------------------------
 
-def parse_hwpx_to_spec(hwpx_path: str, out_json_path: str = "parsed_spec.json"):
-    hwpx_path = ensure_hwpx(hwpx_path)
-    with zipfile.ZipFile(hwpx_path, "r") as zf:
-        para_shapes, char_shapes = parse_styles_from_header(zf)
-        #debug_dump_styles(para_shapes, char_shapes)
-        #debug_tc_structure(zf)        
-        border_fills = parse_table_styles_from_header(zf)
-        blocks = parse_sections_to_blocks(zf, para_shapes, char_shapes, border_fills)
-    spec = blocks_to_document_spec(blocks)
-    with open(out_json_path, "w", encoding="utf-8") as f:
-        json.dump(spec, f, ensure_ascii=False, indent=2)
+def parse_hwpx_to_spec(hwpx_path: str, out_json_path: str | None = "parsed_spec.json", streaming: bool = False,
+                       header_cache_dir: str | None = None, section_cache: bool = False,
+                       section_cache_dir: str | None = None, cache_stats: dict | None = None,
+                       compact: bool = False, profile: Profiler | None = None,
+                       section_workers: int | None = None, lazy_header: bool | None = None):
+    """
+    out_json_path 가 None 이면 파일로 쓰지 않고 spec 만 돌려준다.
+    section_cache=True(또는 section_cache_dir 지정)면 바뀌지 않은 구역은 이전 해석 결과를 재사용한다.
+    section_workers 가 2 이상이면 구역들을 그만큼의 프로세스에서 나눠 해석한다 (결과는 같음).
+    구역이 여럿인 큰 문서에서만 이득이고, 구역 캐시와는 같이 쓰지 않는다 (캐시가 우선).
+    .hwp 는 메모리 위에서 .hwpx 로 옮겨 읽으므로(open_hwpx) 병렬 해석하지 않는다.
+    compact=True 면 모양을 styles 표로 모은 압축 형식(compactspec)으로 돌려주고 쓴다.
+    profile(profiling.Profiler)을 넘기면 "parse/..." 단계별 시간과 메모리를 기록한다.
+    lazy_header=True 면 header.xml 에서 구역들이 쓰는 모양 id 만 해석한다 (기본: HWPX_HEADER_MODE).
+    """
+    with stage(profile, "parse"):
+        with stage(profile, "open_hwpx"):
+            zf = open_hwpx(hwpx_path)
+        with zf:
+            with stage(profile, "header"):
+                para_shapes, char_shapes, border_fills = parse_header(zf, cache_dir=header_cache_dir,
+                                                                      lazy=lazy_header)
+            #debug_dump_styles(para_shapes, char_shapes)
+            #debug_tc_structure(zf)
+            with stage(profile, "section"):
+                if section_cache or section_cache_dir:
+                    blocks = parse_sections_cached(zf, para_shapes, char_shapes, border_fills,
+                                                   header_fingerprint(zf), streaming=streaming,
+                                                   cache_dir=section_cache_dir, stats=cache_stats,
+                                                   profile=profile)
+                elif section_workers and section_workers > 1 and zf.filename:
+                    blocks = parse_sections_parallel(zf.filename, zf, para_shapes, char_shapes, border_fills,
+                                                     section_workers, streaming=streaming)
+                else:
+                    blocks = parse_sections_to_blocks(zf, para_shapes, char_shapes, border_fills,
+                                                      streaming=streaming, profile=profile)
+        with stage(profile, "spec"):
+            spec = blocks_to_document_spec(blocks)
+        if compact:
+            with stage(profile, "compact"):
+                spec = compact_spec(spec)
+        if out_json_path is not None:
+            with stage(profile, "json_dump"), open(out_json_path, "w", encoding="utf-8") as f:
+                if compact:
+                    json.dump(spec, f, ensure_ascii=False, separators=(",", ":"))
+                else:
+                    json.dump(spec, f, ensure_ascii=False, indent=2)
     return spec
 
+
+def iter_hwpx_nodes(hwpx_path: str, header_cache_dir: str | None = None):
+    """
+    hwpx 를 스트리밍 모드로 읽으면서 (key, node) 를 block 이 나오는 대로 돌려준다.
+    문서 전체 spec 을 만들지 않으므로 doclib/hwpxwriter 에 바로 넘기면 파싱이 끝나기 전에 생성이 시작된다.
+    """
+    with open_hwpx(hwpx_path) as zf:
+        para_shapes, char_shapes, border_fills = parse_header(zf, cache_dir=header_cache_dir)
+        yield from iter_document_nodes(iter_section_blocks(zf, para_shapes, char_shapes, border_fills))
+
+
+def parse_hwpx_to_stream(hwpx_path: str, out_path: str = "-", header_cache_dir: str | None = None):
+    """
+    hwpx -> NDJSON 스트림 (specstream 형식, 한 줄에 문단/표 하나). out_path 가 "-" 면 stdout.
+    반환: 쓴 노드 수
+    """
+    nodes = iter_hwpx_nodes(hwpx_path, header_cache_dir=header_cache_dir)
+    if out_path == "-":
+        return write_spec_stream(nodes, sys.stdout, flush=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        return write_spec_stream(nodes, f)
+
+
+def watch_hwpx(hwpx_path: str, out_json_path: str, interval: float = 1.0, section_cache_dir: str | None = None):
+    """
+    hwpx_path 가 저장될 때마다(수정 시각/크기 변경) out_json_path 를 다시 만든다. Ctrl+C 로 끝낸다.
+    구역별 캐시를 쓰므로 한 구역만 고친 경우 그 구역만 다시 해석한다.
+    """
+    last = None
+    while True:
+        try:
+            st = os.stat(hwpx_path)
+            current = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            current = None
+        if current is not None and current != last:
+            stats = {}
+            started = time.perf_counter()
+            try:
+                parse_hwpx_to_spec(hwpx_path, out_json_path, section_cache=True,
+                                   section_cache_dir=section_cache_dir, cache_stats=stats)
+            except (zipfile.BadZipFile, OSError) + xb.ParseError as e:
+                # 저장 도중의 파일일 수 있으니 다음 주기에 다시 본다
+                print(f"[대기] {hwpx_path}: {type(e).__name__}: {e}", file=sys.stderr)
+            else:
+                last = current
+                print(f"{out_json_path} 갱신 ({time.perf_counter() - started:.2f}s, "
+                      f"구역 재해석 {stats.get('miss', 0)} / 재사용 {stats.get('hit', 0)})", file=sys.stderr)
+        time.sleep(interval)
+
+
+# 5) 일괄 변환 -----------------------------------------------------------------
+
+def collect_batch_inputs(pattern: str):
+    """
+    디렉터리면 그 아래(하위 폴더 포함)의 .hwpx/.hwp 전부, 아니면 glob 패턴으로 찾는다.
+    반환: [(입력 경로, 출력 이름 기준이 될 상대 경로)]
+    상대 경로는 디렉터리, 또는 glob 패턴에서 와일드카드가 나오기 전까지의 폴더를 기준으로 한다
+    ("docs/**/*.hwpx" 면 "docs" 기준이므로 폴더가 다른 같은 이름의 파일도 구별된다).
+    """
+    if os.path.isdir(pattern):
+        paths = []
+        for dirpath, _, filenames in os.walk(pattern):
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() in (".hwpx", ".hwp"):
+                    paths.append(os.path.join(dirpath, name))
+        return [(p, os.path.relpath(p, pattern)) for p in sorted(paths)]
+    root = _glob_root(pattern)
+    return [(p, os.path.relpath(p, root)) for p in sorted(glob.glob(pattern, recursive=True))]
+
+def _glob_root(pattern: str):
+    """glob 패턴에서 와일드카드가 없는 앞쪽 폴더 ("a/b/**/*.hwpx" -> "a/b")"""
+    root = os.path.dirname(pattern)
+    while root and glob.has_magic(root):
+        root = os.path.dirname(root)
+    return root or "."
+
+def batch_output_names(inputs):
+    """
+    [(입력 경로, 상대 경로)] -> [(입력 경로, 출력 json 상대 경로)].
+    x.hwp 와 x.hwpx 처럼 두 입력이 같은 출력 이름이 되면 서로 덮어쓰므로 ValueError.
+    """
+    outputs = []
+    seen = {}
+    for in_path, rel in inputs:
+        out = os.path.splitext(rel)[0] + ".json"
+        other = seen.setdefault(os.path.normcase(out), in_path)
+        if other != in_path:
+            raise ValueError(f"출력 파일 이름이 겹칩니다: {other}, {in_path} -> {out}")
+        outputs.append((in_path, out))
+    return outputs
+
+def _batch_parse_one(in_path, out_json_path, as_line, compact=False):
+    """프로세스 풀 작업 단위. 예외는 밖으로 던지지 않고 결과로 돌려준다."""
+    try:
+        spec = parse_hwpx_to_spec(in_path, out_json_path, compact=compact)
+    except Exception as e:  # 한 파일 실패가 전체 배치를 멈추지 않도록
+        return in_path, f"{type(e).__name__}: {e}", None
+    line = None
+    if as_line:
+        line = json.dumps({"path": in_path, "spec": spec}, ensure_ascii=False)
+    return in_path, None, line
+
+def parse_hwpx_batch(pattern: str, out_dir: str | None = None, ndjson_path: str | None = None,
+                     workers: int | None = None, max_in_flight: int | None = None, compact: bool = False):
+    """
+    pattern(디렉터리 또는 glob)에 해당하는 문서를 프로세스 풀로 나눠 변환한다.
+    - out_dir: 입력마다 <out_dir>/<상대경로>.json 하나씩
+    - ndjson_path: 한 줄에 {"path", "spec"} 하나씩 모은 NDJSON 스트림 ("-"면 stdout)
+    - max_in_flight: 동시에 제출해 두는 작업 수 상한 (기본: workers * 2)
+    - compact: 압축 형식(compactspec)으로 쓴다
+    반환: {"total", "ok", "failed", "errors", "elapsed", "docs_per_sec"} (docs_per_sec 는 성공한 문서 기준)
+    두 입력이 같은 출력 파일 이름이 되면 (out_dir) 변환을 시작하기 전에 ValueError.
+    """
+    if (out_dir is None) == (ndjson_path is None):
+        raise ValueError("out_dir 와 ndjson_path 중 하나만 지정해야 합니다")
+
+    inputs = collect_batch_inputs(pattern)
+    if out_dir is not None:
+        inputs = batch_output_names(inputs)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or workers * 2, 1)
+
+    def out_path_for(rel):
+        if out_dir is None:
+            return None
+        path = os.path.join(out_dir, rel)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return path
+
+    if ndjson_path == "-":
+        stream = sys.stdout
+    elif ndjson_path is not None:
+        stream = open(ndjson_path, "w", encoding="utf-8")
+    else:
+        stream = None
+
+    ok = 0
+    errors = []
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            todo = iter(inputs)
+            while True:
+                # 상한까지만 제출해 두어 결과/입력이 메모리에 쌓이지 않게 한다
+                for in_path, rel in todo:
+                    pending.add(pool.submit(_batch_parse_one, in_path, out_path_for(rel), stream is not None,
+                                             compact))
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    in_path, err, line = fut.result()
+                    if err:
+                        errors.append((in_path, err))
+                        continue
+                    ok += 1
+                    if stream is not None:
+                        stream.write(line + "\n")
+    finally:
+        if stream is not None and stream is not sys.stdout:
+            stream.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "total": len(inputs),
+        "ok": ok,
+        "failed": len(errors),
+        "errors": errors,
+        "elapsed": elapsed,
+        "docs_per_sec": (ok / elapsed) if elapsed > 0 else 0.0,
+    }
+
+def print_batch_summary(summary, out=sys.stderr):
+    print(
+        f"총 {summary['total']}건: 성공 {summary['ok']} / 실패 {summary['failed']} "
+        f"({summary['elapsed']:.1f}s, {summary['docs_per_sec']:.1f} docs/s)",
+        file=out,
+    )
+    for path, err in summary["errors"]:
+        print(f"  [실패] {path}: {err}", file=out)
+
+# 6) 텍스트만 빠르게 (검색 색인용) ---------------------------------------------
+# header.xml 은 읽지 않고, section*.xml 바이트를 정규식으로 한 번 훑어 hp:t 글자만 문서 순서대로 꺼낸다.
+# 글자/문단 모양, 셀 크기, 배경색은 전혀 보지 않는다.
+
+# 시작/끝 태그 이름까지만 맞추고(정규식이 가장 싸게 도는 모양), 태그 끝과 글자는 find 로 찾는다
+TEXT_TOKEN_RE = re.compile(rb"<(/?)hp:(t|p|tc|tr|tbl)([\s>/])")
+INLINE_TAG_RE = re.compile(r"<hp:(tab|lineBreak|nbSpace|fwSpace)\b[^>]*>|<[^>]*>")
+INLINE_TEXT = {"tab": "\t", "lineBreak": "\n", "nbSpace": " ", "fwSpace": " "}
+PREVIEW_NAME = "Preview/PrvText.txt"
+
+def _t_text(raw):
+    text = raw.decode("utf-8")
+    if "<" in text:
+        text = INLINE_TAG_RE.sub(lambda m: INLINE_TEXT.get(m.group(1), ""), text)
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+def iter_text_events(zf: zipfile.ZipFile):
+    """
+    본문 글자를 문서 순서대로 이벤트로 돌려준다.
+      ("p", text)         문단 하나의 글자 (공백뿐인 문단은 건너뜀)
+      ("tbl_start", None) / ("tbl_end", None)
+      ("cell_end", None) / ("row_end", None)
+    표가 들어있는 문단은 표 앞까지의 글자를 먼저, 표 뒤의 글자를 나중에 내보낸다.
+    parser 와 달리 <hp:tab/> 등 뒤에 이어지는 글자도 모두 포함한다.
+    """
+    for sec in list_section_files(zf):
+        data = zf.read(sec)
+        buffers = []  # 열린 문단마다 모은 글자
+        for m in TEXT_TOKEN_RE.finditer(data):
+            close, name, after = m.groups()
+            if close:
+                if name == b"p":
+                    if buffers:
+                        text = "".join(buffers.pop())
+                        if text.strip():
+                            yield "p", text
+                elif name == b"tbl":
+                    yield "tbl_end", None
+                elif name == b"tc":
+                    yield "cell_end", None
+                elif name == b"tr":
+                    yield "row_end", None
+                continue
+
+            # 시작 태그: 속성이 있으면 태그 끝까지 보고 빈 요소(<... />)인지 확인
+            end = m.end()
+            if after != b">":
+                end = data.index(b">", m.end() - 1) + 1
+                if data[end - 2] == 0x2F:  # "/"
+                    continue
+            if name == b"t":
+                close_at = data.find(b"</hp:t>", end)
+                if buffers and close_at > end:
+                    buffers[-1].append(_t_text(data[end:close_at]))
+            elif name == b"p":
+                buffers.append([])
+            elif name == b"tbl":
+                if buffers and buffers[-1]:
+                    text = "".join(buffers[-1])
+                    buffers[-1] = []
+                    if text.strip():
+                        yield "p", text
+                yield "tbl_start", None
+
+def text_from_events(events):
+    """
+    iter_text_events -> 평문. 표 밖의 문단은 한 줄씩, 최상위 표는 행마다 한 줄
+    (셀은 탭으로, 셀 안의 문단과 중첩 표 글자는 공백으로 이어 붙인다).
+    """
+    lines = []
+    depth = 0
+    cells, parts = [], []
+    for kind, text in events:
+        if kind == "p":
+            if depth:
+                parts.append(text.strip())
+            else:
+                lines.append(text.strip())
+        elif kind == "tbl_start":
+            depth += 1
+        elif kind == "tbl_end":
+            depth -= 1
+        elif depth == 1 and kind == "cell_end":
+            cells.append(" ".join(parts))
+            parts = []
+        elif depth == 1 and kind == "row_end":
+            lines.append("\t".join(cells))
+            cells = []
+    return "\n".join(lines)
+
+def read_preview_text(zf: zipfile.ZipFile):
+    """한글이 저장할 때 남긴 미리보기 글자(Preview/PrvText.txt). 앞부분만 들어있다. 없으면 None."""
+    try:
+        raw = zf.read(PREVIEW_NAME)
+    except KeyError:
+        return None
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return raw.decode("utf-16")
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("utf-16-le", errors="replace")
+
+def extract_text(hwpx_path: str, preview: bool = False):
+    """
+    hwpx -> 평문 (header.xml 해석 없이).
+    preview=True 면 미리보기 글자가 있을 때 그것을 돌려준다 (대략적인 앞부분만 필요할 때).
+    """
+    with open_hwpx(hwpx_path) as zf:
+        if preview:
+            text = read_preview_text(zf)
+            if text is not None:
+                return text
+        return text_from_events(iter_text_events(zf))
+
+
 def main():
-    # python parser.py input.hwp [output.json]
+    # python parser.py input.hwp [output.json] [--watch] [--section-cache DIR] [--profile [--profile-out JSON]]
+    # python parser.py input.hwpx [output.json] --workers N     # 구역 병렬 해석
+    # python parser.py input.hwpx (out.ndjson | -) --stream
+    # python parser.py input.hwpx [out.txt] --text [--preview]
+    # python parser.py --batch <dir|glob> (--out-dir DIR | --ndjson FILE) [--workers N] [--max-in-flight N]
     if len(sys.argv) < 2:
         print("사용법: python parser.py <input.hwp|input.hwpx> [parsed_spec.json]")
+        print("        python parser.py --batch <폴더|glob> (--out-dir 폴더 | --ndjson 파일) "
+              "[--workers N] [--max-in-flight N]")
         sys.exit(1)
 
-    input_path = sys.argv[1]
-    out_json_path = sys.argv[2] if len(sys.argv) >= 3 else "parsed_spec.json"
-
-    spec = parse_hwpx_to_spec(input_path, out_json_path)
-    print(f"{out_json_path} 생성 완료")
+    ap = argparse.ArgumentParser(description="hwp/hwpx -> parsed_spec.json")
+    ap.add_argument("input_path", nargs="?")
+    ap.add_argument("out_json_path", nargs="?", default=None,
+                    help="출력 경로 (기본: parsed_spec.json, --text 는 stdout)")
+    ap.add_argument("--batch", metavar="PATTERN", help="폴더 또는 glob 패턴 단위 일괄 변환")
+    ap.add_argument("--out-dir", help="일괄 변환: 입력마다 JSON 하나씩 쓸 폴더")
+    ap.add_argument("--ndjson", help="일괄 변환: 결과를 NDJSON 한 파일로 (-: stdout)")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="프로세스 수 (--batch 기본: CPU 코어 수, 문서 하나: 2 이상이면 구역을 나눠 병렬 해석)")
+    ap.add_argument("--max-in-flight", type=int, default=None, help="동시에 처리 중인 문서 수 상한")
+    ap.add_argument("--text", action="store_true", help="모양 없이 본문 글자만 빠르게 추출")
+    ap.add_argument("--preview", action="store_true", help="--text: 미리보기 글자(PrvText.txt)가 있으면 그것을 사용")
+    ap.add_argument("--stream", action="store_true",
+                    help="NDJSON 스트림(한 줄에 문단/표 하나)으로 바로바로 출력 (출력 경로 - 면 stdout)")
+    ap.add_argument("--compact", action="store_true", help="모양을 styles 표로 모은 압축 형식으로 출력")
+    ap.add_argument("--watch", action="store_true", help="입력 파일이 저장될 때마다 다시 변환 (바뀐 구역만 재해석)")
+    ap.add_argument("--section-cache", metavar="DIR", default=None, help="구역별 해석 결과를 저장할 폴더")
+    ap.add_argument("--lazy-header", action="store_true",
+                    help="header.xml 에서 본문이 쓰는 모양만 해석 (모양이 많은 템플릿 문서용)")
+    ap.add_argument("--profile", action="store_true", help="단계별 시간/메모리를 stderr 로 출력")
+    ap.add_argument("--profile-out", metavar="JSON", help="--profile 결과를 JSON 으로 저장")
+    args = ap.parse_args()
+
+    if args.batch:
+        try:
+            summary = parse_hwpx_batch(args.batch, out_dir=args.out_dir, ndjson_path=args.ndjson,
+                                       workers=args.workers, max_in_flight=args.max_in_flight,
+                                       compact=args.compact)
+        except ValueError as e:
+            ap.error(str(e))
+        print_batch_summary(summary)
+        sys.exit(1 if summary["failed"] else 0)
+
+    if not args.input_path:
+        ap.error("입력 파일이 필요합니다")
+    if args.text:
+        text = extract_text(args.input_path, preview=args.preview)
+        if args.out_json_path in (None, "-"):
+            sys.stdout.write(text + "\n")
+        else:
+            with open(args.out_json_path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return
+    if args.out_json_path is None:
+        args.out_json_path = "parsed_spec.json"
+    if args.stream:
+        count = parse_hwpx_to_stream(args.input_path, args.out_json_path)
+        print(f"{args.out_json_path} 생성 완료 (노드 {count}개)", file=sys.stderr)
+        return
+    if args.watch:
+        try:
+            watch_hwpx(args.input_path, args.out_json_path, section_cache_dir=args.section_cache)
+        except KeyboardInterrupt:
+            pass
+        return
+    profile = Profiler() if args.profile or args.profile_out else None
+    try:
+        with profile if profile is not None else nullcontext():
+            spec = parse_hwpx_to_spec(args.input_path, args.out_json_path, section_cache_dir=args.section_cache,
+                                      compact=args.compact, profile=profile, section_workers=args.workers,
+                                      lazy_header=True if args.lazy_header else None)
+    finally:
+        # 실패한 실행도 어디까지 걸렸는지 보이게 보고서는 항상 쓴다
+        if profile is not None:
+            profile.write_report(args.profile_out)
+    print(f"{args.out_json_path} 생성 완료")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,221 @@
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# 변환이 느릴 때 어디서 시간이 가는지 보는 계측.
+# parser.parse_hwpx_to_spec / doclib.generate_hwp_* 에 profile=Profiler() 를 넘기면
+# 단계별 실행 시간과 최대 메모리, Hwp 메서드 이름별 호출 수/누적 시간을 모은다.
+# 넘기지 않으면(None) 아무것도 재지 않는다.
+#
+#   prof = Profiler()
+#   with prof:
+#       spec = parse_hwpx_to_spec("input.hwpx", None, profile=prof)
+#       generate_hwp_from_parsed_spec(spec, "out.hwpx", profile=prof)
+#   print(prof.format_report())
+#
+# 단계 이름은 안쪽으로 들어갈수록 "/" 로 이어진다 (parse/section/walk).
+# 같은 이름의 단계(구역마다 한 번 등)는 합쳐서 횟수/합계 시간/그중 최대 메모리로 보인다.
+# 메모리는 tracemalloc 으로 잰 "단계 시작 때보다 더 쓴 최대량" 이다. tracemalloc 이 켜져 있으면
+# 파이썬 코드가 2~3배 느려지므로 시간만 볼 때는 Profiler(memory=False) 를 쓴다.
+
+
+def stage(profile, name):
+    """profile 이 None 이면 아무 일도 하지 않는 컨텍스트."""
+    return profile.stage(name) if profile is not None else nullcontext()
+
+
+def wrap_hwp(profile, hwp):
+    """profile 이 None 이면 hwp 를 그대로, 아니면 호출을 세는 CountingHwp 로 감싸서 돌려준다."""
+    return profile.wrap_hwp(hwp) if profile is not None else hwp
+
+
+class _StageFrame:
+    def __init__(self, path, start_mem):
+        self.path = path
+        self.start_mem = start_mem
+        self.peak = start_mem      # 이 단계(안쪽 단계 포함) 동안의 최대 메모리 (절대값)
+
+
+class Profiler:
+    """
+    - stage(name): 단계 하나를 재는 컨텍스트. 안에서 다시 stage 를 열면 이름이 이어진다.
+    - wrap_hwp(hwp): 메서드 호출을 이름별로 세는 CountingHwp 를 돌려준다.
+    - report(): {"stages": [...], "hwp_calls": [...], "total_seconds", "peak_bytes"} (JSON 으로 쓸 수 있음)
+    - format_report(): 사람이 읽는 표
+    with Profiler() as prof: 로 쓰면 그 구간의 전체 시간도 잰다.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = {}       # path -> {"calls", "seconds", "peak_bytes"}
+        self.hwp_calls = {}    # 메서드 이름 -> {"calls", "seconds"}
+        self.total_seconds = None
+        self.peak_bytes = None
+        self._stack = []
+        self._max_peak = 0         # stage 가 tracemalloc peak 를 지우기 전에 본 최대값
+        self._started_tracing = False
+        self._t0 = None
+
+    # --- 전체 구간 ------------------------------------------------------------
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.memory:
+            tracemalloc.reset_peak()
+            self._max_peak = 0
+        self._t0 = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self._t0 is not None:
+            self.total_seconds = time.perf_counter() - self._t0
+            self._t0 = None
+        if self.memory and tracemalloc.is_tracing():
+            self.peak_bytes = max(self._max_peak, tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # --- 단계 ---------------------------------------------------------------
+
+    def _memory_on(self):
+        return self.memory and tracemalloc.is_tracing()
+
+    @contextmanager
+    def stage(self, name):
+        path = f"{self._stack[-1].path}/{name}" if self._stack else name
+        tracing = self._memory_on()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # 바깥 단계(와 전체)의 최대값을 챙겨 둔 뒤 이 단계용으로 peak 를 새로 잰다
+            self._max_peak = max(self._max_peak, peak)
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            frame = _StageFrame(path, current)
+        else:
+            frame = _StageFrame(path, 0)
+        self._stack.append(frame)
+        # 보고서 순서는 단계가 시작된 순서 (바깥 단계가 안쪽 단계보다 먼저)
+        entry = self.stages.get(path)
+        if entry is None:
+            entry = self.stages[path] = {"calls": 0, "seconds": 0.0, "peak_bytes": None}
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t
+            self._stack.pop()
+            extra = None
+            if tracing and tracemalloc.is_tracing():
+                frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                extra = frame.peak - frame.start_mem
+                self._max_peak = max(self._max_peak, frame.peak)
+                if self._stack:
+                    self._stack[-1].peak = max(self._stack[-1].peak, frame.peak)
+            entry["calls"] += 1
+            entry["seconds"] += dt
+            if extra is not None:
+                entry["peak_bytes"] = max(entry["peak_bytes"] or 0, extra)
+
+    # --- Hwp 호출 ------------------------------------------------------------
+
+    def wrap_hwp(self, hwp):
+        return CountingHwp(hwp, self)
+
+    def record_call(self, name, seconds):
+        entry = self.hwp_calls.get(name)
+        if entry is None:
+            entry = self.hwp_calls[name] = {"calls": 0, "seconds": 0.0}
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+
+    # --- 보고 ---------------------------------------------------------------
+
+    def report(self):
+        return {
+            "total_seconds": self.total_seconds,
+            "peak_bytes": self.peak_bytes,
+            "memory_traced": self.memory,
+            "stages": [dict(name=path, **entry) for path, entry in self.stages.items()],
+            "hwp_calls": [dict(name=name, **entry) for name, entry in
+                          sorted(self.hwp_calls.items(), key=lambda kv: -kv[1]["seconds"])],
+        }
+
+    def format_report(self):
+        lines = []
+        if self.total_seconds is not None:
+            peak = f", 최대 메모리 {self.peak_bytes / 1024:.0f} KB" if self.peak_bytes else ""
+            lines.append(f"전체 {self.total_seconds * 1e3:.2f} ms{peak}")
+        if self.stages:
+            lines.append(f"{'단계':<32} {'횟수':>6} {'ms':>10} {'최대 KB':>10}")
+            for path, entry in self.stages.items():
+                depth = path.count("/")
+                name = "  " * depth + path.rsplit("/", 1)[-1]
+                peak = f"{entry['peak_bytes'] / 1024:10.0f}" if entry["peak_bytes"] is not None else f"{'-':>10}"
+                lines.append(f"{name:<32} {entry['calls']:>6} {entry['seconds'] * 1e3:10.2f} {peak}")
+        if self.hwp_calls:
+            total_calls = sum(e["calls"] for e in self.hwp_calls.values())
+            total_sec = sum(e["seconds"] for e in self.hwp_calls.values())
+            lines.append(f"Hwp 호출 {total_calls}회, {total_sec * 1e3:.2f} ms")
+            lines.append(f"{'메서드':<32} {'횟수':>6} {'ms':>10} {'us/회':>10}")
+            for item in self.report()["hwp_calls"]:
+                per = item["seconds"] * 1e6 / item["calls"]
+                lines.append(f"{item['name']:<32} {item['calls']:>6} {item['seconds'] * 1e3:10.2f} {per:10.1f}")
+        return "\n".join(lines)
+
+    def write_report(self, path=None):
+        """path 가 있으면 report() 를 JSON 으로 쓰고, 없으면 format_report() 를 stderr 로."""
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        else:
+            print(self.format_report(), file=sys.stderr)
+
+
+class CountingHwp:
+    """
+    Hwp 를 감싸서 메서드 호출마다 이름별 횟수와 걸린 시간을 Profiler 에 적는다.
+    HAction / HParameterSet 처럼 한 단계 아래의 COM 객체 메서드는 "HAction.Run" 처럼 적는다.
+    속성 읽기/쓰기는 그대로 넘긴다.
+    """
+
+    SUB_OBJECTS = {"HAction", "HParameterSet"}
+
+    def __init__(self, hwp, profiler, prefix=""):
+        object.__setattr__(self, "_hwp", hwp)
+        object.__setattr__(self, "_profiler", profiler)
+        object.__setattr__(self, "_prefix", prefix)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._hwp, name)
+        if not self._prefix and name in self.SUB_OBJECTS:
+            return CountingHwp(attr, self._profiler, prefix=name + ".")
+        if not callable(attr):
+            return attr
+        label = self._prefix + name
+        record = self._profiler.record_call
+
+        def counted(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - t)
+
+        return counted
+
+    def __setattr__(self, name, value):
+        setattr(self._hwp, name, value)
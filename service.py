@@ -0,0 +1,458 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from hwpsession import HwpSession, RecordingHwp, default_hwp_factory
+
+# 웹 백엔드에서 parser.py / main.py 를 요청마다 subprocess 로 띄우면 인터프리터 기동, import,
+# 한글(Hwp) 기동 비용을 매번 낸다. 이 서비스는 그 비용을 한 번만 내고 변환 요청을 계속 받는다.
+#
+#   python service.py serve --port 8765 --parse-workers 4 --generators 1
+#   python service.py serve --unix /tmp/hwpx.sock --hwp recording     # 한글 없이 시험
+#   python service.py call '{"op": "parse", "path": "input.hwpx"}'
+#
+# 프로토콜: TCP(또는 유닉스 소켓) 위의 JSON lines. 요청 한 줄에 응답 한 줄이고, 한 연결에서 여러
+# 요청을 이어 보낼 수 있다 (응답은 끝나는 순서대로 오므로 "id" 로 짝을 맞춘다).
+#
+#   {"id": 1, "op": "parse", "path": "in.hwpx", "out": "spec.json", "compact": false, "timeout": 30}
+#   {"id": 2, "op": "generate", "spec": {...} | "spec_path": "spec.json", "out": "out.hwpx", "backend": "com"}
+#   {"id": 3, "op": "cancel", "target": 2}
+#   {"id": 4, "op": "stats"}
+#   -> {"id": 1, "ok": true, "result": {...}}
+#   -> {"id": 2, "ok": false, "code": "timeout" | "cancelled" | "busy" | "error" | "bad_request", "error": "..."}
+#
+# - parse, generate(backend="native"): CPU 작업이라 프로세스 풀에서 돌린다.
+#   out 이 없으면 parse 결과 spec 을 응답에 그대로 싣는다.
+# - generate(backend="com"): 한글 세션을 하나씩 붙잡고 있는 generator 프로세스 N 개가 차례로 처리한다.
+# - 대기 중인 작업이 max_queue 를 넘으면 새 요청은 바로 "busy" 로 돌려보낸다.
+#   한 연결이 동시에 처리 중인 요청이 max_in_flight 개면 그 연결에서는 더 읽지 않는다 (TCP 로 밀어냄).
+# - timeout(초)은 줄 서서 기다린 시간까지 포함한다. 시간이 넘거나 cancel 되면
+#   기다리던 작업은 줄에서 빠지고, 한글 작업은 그 generator 를 죽이고 새로 띄운다
+#   (한글 상태를 믿을 수 없으므로). 이미 돌고 있는 파싱은 멈출 수 없어 결과만 버린다.
+# - 연결이 끊기면 그 연결의 작업은 모두 cancel 한다.
+
+DEFAULT_PORT = 8765
+HWP_FACTORIES = {
+    "com": default_hwp_factory,
+    "recording": RecordingHwp,
+}
+
+
+class JobError(Exception):
+    """요청을 처리하지 못한 이유. code 는 응답의 "code" 로 나간다."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+# --- 프로세스 풀 작업 (모듈 최상위여야 넘길 수 있다) ---------------------------
+
+def _parse_job(path, out, compact):
+    from parser import parse_hwpx_to_spec
+    spec = parse_hwpx_to_spec(path, out, compact=compact)
+    if out is not None:
+        return {"out": out, "nodes": len(spec["document"])}
+    return {"spec": spec}
+
+
+def _native_job(spec, spec_path, out):
+    from hwpxwriter import write_hwpx_from_spec
+    write_hwpx_from_spec(spec if spec is not None else _load_spec(spec_path), out)
+    return {"out": out}
+
+
+def _load_spec(path):
+    from specstream import is_stream_path, read_spec_stream
+    if is_stream_path(path):
+        return {"document": dict(read_spec_stream(path))}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- 한글 generator 프로세스 --------------------------------------------------
+
+def _generator_main(conn, hwp_factory, recycle_after, optimize):
+    """generator 프로세스 본체. (spec, spec_path, out) 을 받아 (True, result) / (False, 에러) 로 답한다."""
+    session = HwpSession(hwp_factory, recycle_after, optimize)
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            spec, spec_path, out = job
+            try:
+                if spec is None:
+                    spec = _load_spec(spec_path)
+                session.generate(spec, out)
+            except Exception as e:
+                conn.send((False, f"{type(e).__name__}: {e}"))
+            else:
+                conn.send((True, {"out": out}))
+    finally:
+        session.close()
+
+
+class GeneratorWorker:
+    """
+    한글 세션을 가진 프로세스 하나. 한 번에 작업 하나만 받는다.
+    작업이 시간을 넘기거나 취소되면 프로세스를 죽이고 다음 작업 전에 새로 띄운다.
+    """
+
+    def __init__(self, hwp_factory, recycle_after=None, optimize=False):
+        self.hwp_factory = hwp_factory
+        self.recycle_after = recycle_after
+        self.optimize = optimize
+        self.proc = None
+        self.conn = None
+        self.starts = 0
+        self.jobs = 0
+
+    def _ensure(self):
+        if self.proc is not None and self.proc.is_alive():
+            return
+        self.kill()
+        ctx = multiprocessing.get_context("spawn")
+        parent, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_generator_main, daemon=True,
+                                args=(child, self.hwp_factory, self.recycle_after, self.optimize))
+        self.proc.start()
+        child.close()
+        self.conn = parent
+        self.starts += 1
+
+    async def run(self, spec, spec_path, out):
+        """작업 하나를 보내고 결과를 기다린다. 취소되면 프로세스를 죽인다."""
+        loop = asyncio.get_running_loop()
+        self._ensure()
+        conn = self.conn
+        try:
+            conn.send((spec, spec_path, out))
+            ok, result = await loop.run_in_executor(None, conn.recv)
+        except asyncio.CancelledError:
+            self.kill()
+            raise
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise JobError("error", f"generator 프로세스가 끝났습니다 ({type(e).__name__})")
+        self.jobs += 1
+        if not ok:
+            raise JobError("error", result)
+        return result
+
+    def kill(self):
+        proc, conn, self.proc, self.conn = self.proc, self.conn, None, None
+        if proc is not None and proc.is_alive():
+            proc.kill()
+            proc.join(5)
+        if conn is not None:
+            conn.close()
+
+    def close(self, timeout=5):
+        if self.proc is not None and self.proc.is_alive():
+            try:
+                self.conn.send(None)
+                self.proc.join(timeout)
+            except OSError:
+                pass
+        self.kill()
+
+
+# --- 서비스 ---------------------------------------------------------------------
+
+class ConversionService:
+    """
+    요청(dict)을 받아 결과(dict)를 돌려주는 본체. 네트워크와 상관없이 await service.handle(req) 로도 쓴다.
+    - parse_workers: 파싱/native 생성 프로세스 수 (기본: CPU 코어 수)
+    - generators: 한글 generator 프로세스 수
+    - max_queue: 처리 중 + 대기 중인 작업 수 상한 (넘으면 "busy")
+    - timeout: 요청에 timeout 이 없거나 null 일 때 쓰는 기본값(초), 요청 값도 이것을 넘지 못한다. None 이면 무제한.
+      요청의 timeout 이 0보다 큰 숫자가 아니면 "bad_request".
+    """
+
+    def __init__(self, parse_workers=None, generators=1, hwp_factory=None, max_queue=64,
+                 timeout=300.0, recycle_after=None, optimize=False):
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        self.workers = [GeneratorWorker(hwp_factory or default_hwp_factory, recycle_after, optimize)
+                        for _ in range(generators)]
+        self._idle = None
+        self._tasks = {}            # (연결 번호, 요청 id) -> Task
+        self.pending = 0            # 처리 중 + 대기 중
+        self.counts = {"ok": 0, "error": 0, "timeout": 0, "cancelled": 0, "busy": 0, "bad_request": 0}
+
+    def _idle_workers(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for w in self.workers:
+                self._idle.put_nowait(w)
+        return self._idle
+
+    # --- 작업 ---------------------------------------------------------------
+
+    async def _parse(self, req):
+        path = req.get("path")
+        if not path:
+            raise JobError("bad_request", "path 가 필요합니다")
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(self.pool, _parse_job, path, req.get("out"), bool(req.get("compact")))
+        return await fut
+
+    async def _generate(self, req):
+        spec, spec_path, out = req.get("spec"), req.get("spec_path"), req.get("out")
+        if (spec is None) == (spec_path is None):
+            raise JobError("bad_request", "spec 과 spec_path 중 하나만 지정해야 합니다")
+        if not out:
+            raise JobError("bad_request", "out 이 필요합니다")
+        backend = req.get("backend", "com")
+        if backend == "native":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, _native_job, spec, spec_path, out)
+        if backend != "com":
+            raise JobError("bad_request", f"지원하지 않는 backend: {backend}")
+        idle = self._idle_workers()
+        worker = await idle.get()
+        try:
+            return await worker.run(spec, spec_path, out)
+        finally:
+            idle.put_nowait(worker)
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "max_queue": self.max_queue,
+            "parse_workers": self.parse_workers,
+            "generators": [{"starts": w.starts, "jobs": w.jobs} for w in self.workers],
+            "idle_generators": self._idle.qsize() if self._idle is not None else len(self.workers),
+            "counts": dict(self.counts),
+        }
+
+    def _request_timeout(self, value):
+        """요청의 timeout -> 실제로 쓸 초. 없거나 null 이면 기본값, 기본값을 넘으면 기본값으로 줄인다."""
+        if value is None:
+            return self.timeout
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+            raise JobError("bad_request", f"timeout 은 0보다 큰 숫자여야 합니다: {value!r}")
+        return float(value) if self.timeout is None else min(float(value), self.timeout)
+
+    async def handle(self, req, conn_id=0):
+        """요청 하나를 처리해 응답 dict 를 돌려준다 (예외는 응답으로 바꾼다)."""
+        rid = req.get("id")
+        op = req.get("op")
+        if op == "stats":
+            return {"id": rid, "ok": True, "result": self.stats()}
+        if op == "cancel":
+            task = self._tasks.get((conn_id, req.get("target")))
+            found = task is not None and not task.done()
+            if found:
+                task.cancel()
+            return {"id": rid, "ok": True, "result": {"cancelled": found}}
+        if op not in ("parse", "generate"):
+            self.counts["bad_request"] += 1
+            return {"id": rid, "ok": False, "code": "bad_request", "error": f"알 수 없는 op: {op!r}"}
+        if self.pending >= self.max_queue:
+            self.counts["busy"] += 1
+            return {"id": rid, "ok": False, "code": "busy", "error": f"대기 작업이 {self.max_queue}개를 넘었습니다"}
+
+        try:
+            timeout = self._request_timeout(req.get("timeout"))
+        except JobError as e:
+            self.counts[e.code] += 1
+            return {"id": rid, "ok": False, "code": e.code, "error": str(e)}
+        job = self._parse(req) if op == "parse" else self._generate(req)
+        task = asyncio.ensure_future(asyncio.wait_for(job, timeout))
+        key = (conn_id, rid)
+        self._tasks[key] = task
+        self.pending += 1
+        try:
+            result = await task
+        except asyncio.TimeoutError:
+            code, msg = "timeout", f"{timeout}초 안에 끝나지 않았습니다"
+        except asyncio.CancelledError:
+            code, msg = "cancelled", "취소되었습니다"
+        except JobError as e:
+            code, msg = e.code, str(e)
+        except Exception as e:
+            code, msg = "error", f"{type(e).__name__}: {e}"
+        else:
+            self.counts["ok"] += 1
+            return {"id": rid, "ok": True, "result": result}
+        finally:
+            self.pending -= 1
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        self.counts[code] = self.counts.get(code, 0) + 1
+        return {"id": rid, "ok": False, "code": code, "error": msg}
+
+    def cancel_connection(self, conn_id):
+        for (cid, _), task in list(self._tasks.items()):
+            if cid == conn_id:
+                task.cancel()
+
+    def close(self):
+        for w in self.workers:
+            w.close()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+# --- 소켓 서버 ------------------------------------------------------------------
+
+async def _serve_connection(service, reader, writer, conn_id, max_in_flight):
+    slots = asyncio.Semaphore(max_in_flight)
+    write_lock = asyncio.Lock()
+    running = set()
+
+    async def respond(req):
+        try:
+            resp = await service.handle(req, conn_id)
+        except Exception as e:
+            # handle 이 응답을 못 만들어도 클라이언트가 이 id 를 계속 기다리지 않게
+            resp = {"id": req.get("id"), "ok": False, "code": "error", "error": f"{type(e).__name__}: {e}"}
+        finally:
+            slots.release()
+        if writer.is_closing():
+            return
+        async with write_lock:
+            try:
+                writer.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    try:
+        while True:
+            # 이 연결의 요청이 max_in_flight 개 처리 중이면 다음 줄을 읽지 않는다
+            await slots.acquire()
+            line = await reader.readline()
+            if not line:
+                slots.release()
+                break
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("요청은 JSON 객체여야 합니다")
+            except ValueError as e:
+                slots.release()
+                async with write_lock:
+                    writer.write((json.dumps({"id": None, "ok": False, "code": "bad_request",
+                                              "error": str(e)}, ensure_ascii=False) + "\n").encode("utf-8"))
+                    await writer.drain()
+                continue
+            task = asyncio.ensure_future(respond(req))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        # 보낸 요청의 응답까지는 돌려준다 (쓰는 쪽만 닫고 읽는 경우)
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        service.cancel_connection(conn_id)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(service, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None, max_in_flight=8, ready=None):
+    """service 로 연결을 받는다. ready(asyncio.Event)를 넘기면 듣기 시작할 때 set 한다."""
+    conn_ids = itertools.count(1)
+
+    async def on_connect(reader, writer):
+        await _serve_connection(service, reader, writer, next(conn_ids), max_in_flight)
+
+    if unix_path:
+        server = await asyncio.start_unix_server(on_connect, path=unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(on_connect, host, port)
+        where = f"{host}:{port}"
+    print(f"대기 중: {where}", file=sys.stderr)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+async def call(requests, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+    """요청(dict) 리스트를 한 연결로 보내고 응답을 요청 순서대로 돌려준다 (id 가 없으면 붙인다)."""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        ids = []
+        for i, req in enumerate(requests):
+            req = dict(req)
+            req.setdefault("id", i)
+            ids.append(req["id"])
+            writer.write((json.dumps(req, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+        responses = {}
+        while len(responses) < len(ids):
+            line = await reader.readline()
+            if not line:
+                break
+            resp = json.loads(line)
+            responses[resp.get("id")] = resp
+        return [responses.get(rid) for rid in ids]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="hwpx 변환 서비스 (JSON lines over TCP/유닉스 소켓)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name, help_text in (("serve", "서비스 시작"), ("call", "요청 보내기")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=DEFAULT_PORT)
+        p.add_argument("--unix", metavar="PATH", help="TCP 대신 유닉스 소켓")
+        if name == "serve":
+            p.add_argument("--parse-workers", type=int, default=None, help="파싱 프로세스 수 (기본: CPU 코어 수)")
+            p.add_argument("--generators", type=int, default=1, help="한글 generator 프로세스 수")
+            p.add_argument("--hwp", choices=list(HWP_FACTORIES), default="com",
+                           help="recording: 한글 없이 호출만 기록하는 대역 (시험용)")
+            p.add_argument("--max-queue", type=int, default=64, help="처리 중 + 대기 작업 수 상한")
+            p.add_argument("--max-in-flight", type=int, default=8, help="연결 하나가 동시에 맡길 수 있는 요청 수")
+            p.add_argument("--timeout", type=float, default=300.0, help="작업 하나의 최대 시간(초)")
+            p.add_argument("--recycle-after", type=int, default=None, help="한글을 이 문서 수마다 새로 띄움")
+            p.add_argument("--optimize", action="store_true", help="(com) 중복 COM 호출을 걸러냄")
+        else:
+            p.add_argument("requests", nargs="+", help="JSON 요청 (여러 개면 한 연결로 보냄)")
+    args = ap.parse_args()
+
+    if args.cmd == "call":
+        responses = asyncio.run(call([json.loads(r) for r in args.requests],
+                                     host=args.host, port=args.port, unix_path=args.unix))
+        for resp in responses:
+            print(json.dumps(resp, ensure_ascii=False))
+        sys.exit(0 if all(r and r.get("ok") for r in responses) else 1)
+
+    service = ConversionService(parse_workers=args.parse_workers, generators=args.generators,
+                                hwp_factory=HWP_FACTORIES[args.hwp], max_queue=args.max_queue,
+                                timeout=args.timeout, recycle_after=args.recycle_after,
+                                optimize=args.optimize)
+    try:
+        asyncio.run(serve(service, host=args.host, port=args.port, unix_path=args.unix,
+                          max_in_flight=args.max_in_flight))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+import json
+
+# parsed_spec 의 NDJSON 스트림 형식. 한 줄에 노드(문단 또는 표) 하나:
+#
+#   {"format": "spec-stream", "version": 1}
+#   {"key": "문단1", "node": {"content": "...", "style": {...}, "segments": [...]}}
+#   {"key": "표1", "node": {"data": [...], "cell_styles": [...], ...}}
+#
+# 파서는 block 이 나오는 대로 한 줄씩 쓰고, doclib/hwpxwriter 는 (key, node) 이터레이터로
+# 받아 한 줄씩 처리하므로 문서 전체가 dict 하나로 메모리에 올라오지 않는다.
+#   python parser.py input.hwpx - --stream | python main.py - out.hwpx --backend native
+
+FORMAT = "spec-stream"
+VERSION = 1
+SUFFIXES = (".ndjson", ".jsonl")
+
+
+def is_stream_path(path):
+    return path == "-" or path.lower().endswith(SUFFIXES)
+
+
+def write_spec_stream(nodes, out, flush=False):
+    """
+    (key, node) 이터러블을 out(파일 객체)에 한 줄씩 쓴다. 쓴 노드 수를 돌려준다.
+    flush=True 면 줄마다 flush 해서 파이프 건너편이 바로 읽을 수 있게 한다.
+    """
+    out.write(json.dumps({"format": FORMAT, "version": VERSION}) + "\n")
+    count = 0
+    for key, node in nodes:
+        out.write(json.dumps({"key": key, "node": node}, ensure_ascii=False) + "\n")
+        count += 1
+        if flush:
+            out.flush()
+    return count
+
+
+def read_spec_stream(source):
+    """
+    NDJSON 스트림에서 (key, node) 를 한 줄씩 읽어 돌려준다.
+    source: 경로, "-"(stdin), 또는 텍스트 파일 객체.
+    """
+    if source == "-":
+        yield from _read_lines(sys.stdin)
+    elif isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from _read_lines(f)
+    else:
+        yield from _read_lines(source)
+
+
+def _read_lines(f):
+    for lineno, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        if "format" in item:
+            if item["format"] != FORMAT:
+                raise ValueError(f"{lineno}번째 줄: 알 수 없는 형식 {item['format']!r}")
+            continue
+        if "key" not in item or "node" not in item:
+            raise ValueError(f"{lineno}번째 줄: key/node 가 없음")
+        yield item["key"], item["node"]
@@ -0,0 +1,41 @@
+import os
+import shutil
+
+import pytest
+
+from parser import collect_batch_inputs, batch_output_names, parse_hwpx_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _put(tmp_path, rel, sample="input.hwpx"):
+    path = tmp_path / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(os.path.join(ROOT, sample), path)
+    return str(path)
+
+
+def test_recursive_glob_keeps_folders(tmp_path):
+    _put(tmp_path, "a/x.hwpx")
+    _put(tmp_path, "b/x.hwpx", "test.hwpx")
+    out_dir = tmp_path / "out"
+    summary = parse_hwpx_batch(str(tmp_path / "**" / "*.hwpx"), out_dir=str(out_dir), workers=1)
+    assert summary["ok"] == 2
+    assert (out_dir / "a" / "x.json").exists() and (out_dir / "b" / "x.json").exists()
+
+
+def test_same_output_name_is_rejected(tmp_path):
+    _put(tmp_path, "x.hwpx")
+    _put(tmp_path, "x.hwp")
+    with pytest.raises(ValueError):
+        batch_output_names(collect_batch_inputs(str(tmp_path)))
+    with pytest.raises(ValueError):
+        parse_hwpx_batch(str(tmp_path / "x.*"), out_dir=str(tmp_path / "out"), workers=1)
+
+
+def test_docs_per_sec_counts_successes(tmp_path):
+    _put(tmp_path, "ok.hwpx")
+    (tmp_path / "bad.hwpx").write_bytes(b"not a zip")
+    summary = parse_hwpx_batch(str(tmp_path), out_dir=str(tmp_path / "out"), workers=1)
+    assert (summary["ok"], summary["failed"]) == (1, 1)
+    assert summary["docs_per_sec"] == pytest.approx(1 / summary["elapsed"])
@@ -0,0 +1,36 @@
+import os
+import json
+
+import parser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "input.hwpx")
+
+
+def _fresh():
+    parser.clear_header_cache()
+    parser.clear_section_cache()
+
+
+def test_cache_files_carry_format_version(tmp_path, monkeypatch):
+    _fresh()
+    expected = parser.parse_hwpx_to_spec(SAMPLE, None)
+    cache_dir = str(tmp_path)
+    _fresh()
+    assert parser.parse_hwpx_to_spec(SAMPLE, None, header_cache_dir=cache_dir, section_cache_dir=cache_dir) == expected
+    names = os.listdir(cache_dir)
+    assert any(n.startswith(f"header-v{parser.HEADER_CACHE_FORMAT}-") for n in names)
+    assert any(f"-v{parser.SECTION_CACHE_FORMAT}-" in n and not n.startswith("header") for n in names)
+
+    # 형식이 바뀐 뒤에는 예전 파일을 쓰지 않고 다시 해석한다
+    for name in names:
+        with open(os.path.join(cache_dir, name), "w", encoding="utf-8") as f:
+            json.dump({"stale": True}, f)
+    monkeypatch.setattr(parser, "HEADER_CACHE_FORMAT", parser.HEADER_CACHE_FORMAT + 1)
+    monkeypatch.setattr(parser, "SECTION_CACHE_FORMAT", parser.SECTION_CACHE_FORMAT + 1)
+    _fresh()
+    stats = {}
+    assert parser.parse_hwpx_to_spec(SAMPLE, None, header_cache_dir=cache_dir, section_cache_dir=cache_dir,
+                                     cache_stats=stats) == expected
+    with parser.open_hwpx(SAMPLE) as zf:
+        assert stats == {"miss": len(parser.list_section_files(zf))}
@@ -0,0 +1,327 @@
+import struct
+import zipfile
+import zlib
+
+import pytest
+
+from hwp5reader import (
+    CTRL_SECTION, CTRL_TABLE, FLAG_COMPRESSED, FLAG_DISTRIBUTE, FLAG_PASSWORD, HWP_SIGNATURE, NS_DECL,
+    TAG_BORDER_FILL, TAG_CHAR_SHAPE, TAG_CTRL_HEADER, TAG_FACE_NAME, TAG_ID_MAPPINGS, TAG_LIST_HEADER,
+    TAG_PARA_CHAR_SHAPE, TAG_PARA_HEADER, TAG_PARA_SHAPE, TAG_PARA_TEXT, TAG_TABLE, HwpUnsupported,
+    open_hwp_as_hwpx,
+)
+from parser import parse_header, parse_hwpx_to_spec
+
+# 작은 .hwp 를 레코드부터 직접 만들고, 같은 내용을 손으로 쓴 .hwpx 와 해석 결과를 비교한다.
+
+
+# 1) 레코드 --------------------------------------------------------------------
+
+def _rec(tag, level, payload):
+    if len(payload) < 0xFFF:
+        return struct.pack("<I", tag | level << 10 | len(payload) << 20) + payload
+    return struct.pack("<II", tag | level << 10 | 0xFFF << 20, len(payload)) + payload
+
+
+def _face(name):
+    raw = name.encode("utf-16-le")
+    return struct.pack("<BH", 0, len(raw) // 2) + raw
+
+
+def _border_fill(fill_type=0, colors=()):
+    payload = bytes(32) + struct.pack("<I", fill_type)
+    if fill_type & 0x1:
+        payload += struct.pack("<IIi", colors[0], 0, -1) + bytes(5)
+    if fill_type & 0x4:
+        payload += bytes(17) + struct.pack(f"<I{len(colors)}I", len(colors), *colors)
+    return payload
+
+
+def _char_shape(font, height, bold=False):
+    return (struct.pack("<7H", *[font] * 7).ljust(42, b"\0")
+            + struct.pack("<iI", height, 0x2 if bold else 0)).ljust(72, b"\0")
+
+
+def _para_shape(align):
+    return struct.pack("<I", align << 2).ljust(54, b"\0")
+
+
+def _docinfo():
+    counts = [0] * 18
+    counts[1] = 2                                   # 한글 글꼴 2개
+    return b"".join([
+        _rec(TAG_ID_MAPPINGS, 0, struct.pack("<18I", *counts)),
+        _rec(TAG_FACE_NAME, 1, _face("바탕")),
+        _rec(TAG_FACE_NAME, 1, _face("돋움")),
+        _rec(TAG_FACE_NAME, 1, _face("Arial")),     # 영문 글꼴: header.xml 에 들어가지 않는다
+        _rec(TAG_BORDER_FILL, 1, _border_fill()),
+        _rec(TAG_BORDER_FILL, 1, _border_fill(0x1, [0x0000CCFF])),
+        _rec(TAG_BORDER_FILL, 1, _border_fill(0x4, [0x00332211, 0x00665544])),
+        _rec(TAG_CHAR_SHAPE, 1, _char_shape(0, 1000)),
+        _rec(TAG_CHAR_SHAPE, 1, _char_shape(1, 1600, bold=True)),
+        _rec(TAG_PARA_SHAPE, 1, _para_shape(3)),    # CENTER
+        _rec(TAG_PARA_SHAPE, 1, _para_shape(1)),    # LEFT
+    ])
+
+
+def _text(s):
+    return s.encode("utf-16-le")
+
+
+def _ctrl_char(code):
+    return struct.pack("<8H", code, 0, 0, 0, 0, 0, 0, code)
+
+
+END = _text("\r")
+TAB = _ctrl_char(9)
+
+
+def _para(level, para_shape, text=b"", shapes=((0, 0),), ctrls=()):
+    """문단 레코드들. ctrls 는 문단 아래에 둘 (CTRL_HEADER 내용, 자식 레코드 바이트)"""
+    out = [
+        _rec(TAG_PARA_HEADER, level, struct.pack("<IIH", len(text) // 2, 0, para_shape).ljust(22, b"\0")),
+        _rec(TAG_PARA_TEXT, level + 1, text),
+        _rec(TAG_PARA_CHAR_SHAPE, level + 1, b"".join(struct.pack("<II", *s) for s in shapes)),
+    ]
+    for header, children in ctrls:
+        out.append(_rec(TAG_CTRL_HEADER, level + 1, header))
+        out.append(children)
+    return b"".join(out)
+
+
+def _cell(level, col, row, col_span, row_span, border_fill, text):
+    header = (struct.pack("<hIH4Hii", 1, 0, 0, col, row, col_span, row_span, 1000 * col_span, 500)
+              + bytes(8) + struct.pack("<H", border_fill)).ljust(46, b"\0")
+    return _rec(TAG_LIST_HEADER, level, header) + _para(level, 1, _text(text) + END)
+
+
+def _table(level):
+    """2x2 표. 첫 행은 두 칸을 합친 셀 하나."""
+    return b"".join([
+        _rec(TAG_TABLE, level, struct.pack("<IHH", 0, 2, 2).ljust(34, b"\0")),
+        _cell(level, 0, 0, 2, 1, 2, "가나"),
+        _cell(level, 0, 1, 1, 1, 1, "다"),
+        _cell(level, 1, 1, 1, 1, 3, "라"),
+    ])
+
+
+def _section0():
+    secd = (struct.pack("<I", CTRL_SECTION), b"")
+    tbl = (struct.pack("<I", CTRL_TABLE).ljust(46, b"\0"), _table(2))
+    return b"".join([
+        # 구역 정의 + "제목"(진하게) "입니다" + 탭 뒤 "꼬리"
+        _para(0, 0, _ctrl_char(2) + _text("제목입니다") + TAB + _text("꼬리") + END,
+              shapes=((0, 1), (10, 0)), ctrls=[secd]),
+        _para(0, 1, _ctrl_char(11) + END, ctrls=[tbl]),
+        _para(0, 1, _text("A&B<끝>") + END),
+    ])
+
+
+def _section1(padding):
+    # 모르는 최상위 레코드는 건너뛴다. 크게 만들면 스트림이 미니 스트림 밖(일반 섹터)에 놓인다.
+    return _para(0, 0, _text("둘째 구역") + END) + _rec(0x7F, 0, bytes(padding))
+
+
+# 2) CFB ---------------------------------------------------------------------
+
+SECT = 512
+MINI = 64
+CUTOFF = 4096
+END_OF_CHAIN = 0xFFFFFFFE
+FAT_SECT = 0xFFFFFFFD
+FREE = 0xFFFFFFFF
+
+
+def _cfb(streams):
+    """[(경로, 바이트)] -> 최소한의 CFB(v3). 저장소는 한 단계("BodyText/Section0")까지만."""
+    entries = [["Root Entry", 5, b"", []]]       # 이름, 종류, 내용, 자식 번호
+    storages = {"": 0}
+    for path, data in streams:
+        parent, _, name = path.rpartition("/")
+        if parent not in storages:
+            storages[parent] = len(entries)
+            entries.append([parent, 1, b"", []])
+            entries[0][3].append(storages[parent])
+        entries[storages[parent]][3].append(len(entries))
+        entries.append([name, 2, data, []])
+
+    sectors, fat = [], []
+
+    def alloc(data):
+        n = -(-len(data) // SECT)
+        start = len(sectors)
+        for k in range(n):
+            sectors.append(data[k * SECT:(k + 1) * SECT].ljust(SECT, b"\0"))
+            fat.append(start + k + 1 if k < n - 1 else END_OF_CHAIN)
+        return start if n else END_OF_CHAIN
+
+    mini, mini_fat, starts = bytearray(), [], {}
+    for i, (_, kind, data, _) in enumerate(entries):
+        if kind != 2:
+            continue
+        if len(data) >= CUTOFF:
+            starts[i] = alloc(data)
+            continue
+        n = -(-len(data) // MINI)
+        start = len(mini) // MINI
+        starts[i] = start if n else END_OF_CHAIN
+        mini_fat.extend(start + k + 1 if k < n - 1 else END_OF_CHAIN for k in range(n))
+        mini += data.ljust(n * MINI, b"\0")
+    starts[0] = alloc(bytes(mini))
+    mini_fat_bytes = struct.pack(f"<{len(mini_fat)}I", *mini_fat)
+    mini_fat_start = alloc(mini_fat_bytes.ljust(-(-len(mini_fat_bytes) // SECT) * SECT, b"\xff"))
+
+    # 자식들은 (이름 길이, 대문자 이름) 순의 이진 트리로
+    links = {i: [FREE, FREE, FREE] for i in range(len(entries))}    # 왼쪽, 오른쪽, 자식
+
+    def build(ids):
+        if not ids:
+            return FREE
+        mid = len(ids) // 2
+        links[ids[mid]][0] = build(ids[:mid])
+        links[ids[mid]][1] = build(ids[mid + 1:])
+        return ids[mid]
+
+    for i, entry in enumerate(entries):
+        links[i][2] = build(sorted(entry[3], key=lambda c: (len(entries[c][0]), entries[c][0].upper())))
+    directory = b""
+    for i, (name, kind, data, _) in enumerate(entries):
+        raw = name.encode("utf-16-le") + b"\0\0"
+        size = len(mini) if kind == 5 else len(data)
+        directory += raw.ljust(64, b"\0") + struct.pack(
+            "<HBB3I16sIQQIII", len(raw), kind, 1, *links[i], bytes(16), 0, 0, 0,
+            starts.get(i, 0), size, 0)
+    dir_start = alloc(directory.ljust(-(-len(directory) // SECT) * SECT, b"\0"))
+
+    fat_start = len(sectors)
+    fat.append(FAT_SECT)                          # FAT 섹터 하나면 충분한 크기만 쓴다
+    fat += [FREE] * (SECT // 4 - len(fat))
+    sectors.append(struct.pack(f"<{SECT // 4}I", *fat))
+    header = struct.pack("<8s16sHHHHH6sIIIIIIIII", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", bytes(16), 0x3E, 3,
+                         0xFFFE, 9, 6, bytes(6), 0, 1, dir_start, 0, CUTOFF, mini_fat_start,
+                         len(mini_fat_bytes) // SECT + bool(len(mini_fat_bytes) % SECT), END_OF_CHAIN, 0)
+    header += struct.pack("<109I", fat_start, *[FREE] * 108)
+    return header + b"".join(sectors)
+
+
+def _hwp(flags=0, padding=0):
+    def pack(data):
+        if not flags & FLAG_COMPRESSED:
+            return data
+        c = zlib.compressobj(6, zlib.DEFLATED, -15)
+        return c.compress(data) + c.flush()
+
+    file_header = (HWP_SIGNATURE.ljust(32, b"\0") + struct.pack("<II", 0x05000304, flags)).ljust(256, b"\0")
+    return _cfb([
+        ("FileHeader", file_header),
+        ("DocInfo", pack(_docinfo())),
+        ("BodyText/Section0", pack(_section0())),
+        ("BodyText/Section1", pack(_section1(padding))),
+    ])
+
+
+# 3) 같은 내용의 .hwpx ----------------------------------------------------------
+
+HEADER_XML = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<hh:head {NS_DECL}><hh:refList>
+<hh:fontfaces>
+<hh:fontface lang="HANGUL"><hh:font id="0" face="바탕"/><hh:font id="1" face="돋움"/></hh:fontface>
+<hh:fontface lang="LATIN"><hh:font id="0" face="Arial"/></hh:fontface>
+</hh:fontfaces>
+<hh:borderFills>
+<hh:borderFill id="1"/>
+<hh:borderFill id="2"><hc:fillBrush><hc:winBrush faceColor="#FFCC00" hatchColor="#000000"/></hc:fillBrush></hh:borderFill>
+<hh:borderFill id="3"><hc:fillBrush><hc:gradation>
+<hc:color value="#112233"/><hc:color value="#445566"/></hc:gradation></hc:fillBrush></hh:borderFill>
+</hh:borderFills>
+<hh:charProperties>
+<hh:charPr id="0" height="1000"><hh:fontRef hangul="0" latin="0"/></hh:charPr>
+<hh:charPr id="1" height="1600"><hh:fontRef hangul="1" latin="0"/><hh:bold/></hh:charPr>
+</hh:charProperties>
+<hh:paraProperties>
+<hh:paraPr id="0"><hh:align horizontal="CENTER" vertical="BASELINE"/></hh:paraPr>
+<hh:paraPr id="1"><hh:align horizontal="LEFT" vertical="BASELINE"/></hh:paraPr>
+</hh:paraProperties>
+</hh:refList></hh:head>"""
+
+
+def _cell_xml(col, row, col_span, border_fill, text):
+    return (f'<hp:tc borderFillIDRef="{border_fill}"><hp:subList>'
+            f'<hp:p paraPrIDRef="1"><hp:run charPrIDRef="0"><hp:t>{text}</hp:t></hp:run></hp:p></hp:subList>'
+            f'<hp:cellAddr colAddr="{col}" rowAddr="{row}"/><hp:cellSpan colSpan="{col_span}" rowSpan="1"/>'
+            f'<hp:cellSz width="{1000 * col_span}" height="500"/></hp:tc>')
+
+
+SECTION0_XML = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<hs:sec {NS_DECL}>
+<hp:p paraPrIDRef="0"><hp:run charPrIDRef="1"><hp:secPr/><hp:t>제목</hp:t></hp:run>\
+<hp:run charPrIDRef="0"><hp:t>입니다<hp:tab/>꼬리</hp:t></hp:run></hp:p>
+<hp:p paraPrIDRef="1"><hp:run charPrIDRef="0"><hp:tbl rowCnt="2" colCnt="2">\
+<hp:tr>{_cell_xml(0, 0, 2, 2, "가나")}</hp:tr>\
+<hp:tr>{_cell_xml(0, 1, 1, 1, "다")}{_cell_xml(1, 1, 1, 3, "라")}</hp:tr>\
+</hp:tbl></hp:run></hp:p>
+<hp:p paraPrIDRef="1"><hp:run charPrIDRef="0"><hp:t>A&amp;B&lt;끝&gt;</hp:t></hp:run></hp:p>
+</hs:sec>"""
+
+SECTION1_XML = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<hs:sec {NS_DECL}><hp:p paraPrIDRef="0"><hp:run charPrIDRef="0"><hp:t>둘째 구역</hp:t></hp:run></hp:p></hs:sec>"""
+
+
+@pytest.fixture
+def hwpx_path(tmp_path):
+    path = str(tmp_path / "same.hwpx")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("mimetype", "application/hwp+zip", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("Contents/header.xml", HEADER_XML)
+        zf.writestr("Contents/section0.xml", SECTION0_XML)
+        zf.writestr("Contents/section1.xml", SECTION1_XML)
+    return path
+
+
+# 4) 테스트 ---------------------------------------------------------------------
+
+@pytest.mark.parametrize("flags", [0, FLAG_COMPRESSED])
+@pytest.mark.parametrize("padding", [0, 2 * CUTOFF])
+def test_spec_matches_hwpx(tmp_path, hwpx_path, flags, padding):
+    hwp_path = tmp_path / "same.hwp"
+    hwp_path.write_bytes(_hwp(flags, padding))
+    assert parse_hwpx_to_spec(str(hwp_path), None) == parse_hwpx_to_spec(hwpx_path, None)
+
+    with open_hwp_as_hwpx(hwp_path.read_bytes()) as zf, zipfile.ZipFile(hwpx_path) as want:
+        assert zf.namelist() == ["mimetype", "Contents/header.xml",
+                                 "Contents/section0.xml", "Contents/section1.xml"]
+        assert parse_header(zf) == parse_header(want)
+
+
+def test_spec_content(tmp_path):
+    hwp_path = tmp_path / "doc.hwp"
+    hwp_path.write_bytes(_hwp(FLAG_COMPRESSED))
+    doc = parse_hwpx_to_spec(str(hwp_path), None)["document"]
+    assert list(doc) == ["문단1", "표1", "문단2", "문단3"]
+
+    # 글자 모양이 바뀌는 자리에서 run 이 나뉜다. 탭 뒤 글자는 문단 글자가 아니다 (.hwpx 와 같음)
+    title = doc["문단1"]
+    assert title["content"] == "제목입니다"
+    assert [(s["text"], s["style"]["Bold"], s["style"]["FaceName"], s["style"]["Height"])
+            for s in title["segments"]] == [("제목", True, "돋움", 16.0), ("입니다", False, "바탕", 10.0)]
+    assert title["style"]["Align"] == "center"
+
+    table = doc["표1"]
+    assert table["data"] == [["가나"], ["다", "라"]]
+    assert [[(m["colSpan"], m["bgColor"], m["width"]) for m in row] for row in table["cell_merges"]] == [
+        [(2, "#FFCC00", 2000)], [(1, None, 1000), (1, "#112233", 1000)]]
+    assert doc["문단2"]["content"] == "A&B<끝>"
+    assert doc["문단3"]["content"] == "둘째 구역"
+
+
+@pytest.mark.parametrize("flags", [FLAG_PASSWORD, FLAG_DISTRIBUTE, FLAG_COMPRESSED | FLAG_PASSWORD])
+def test_encrypted_documents_are_unsupported(flags):
+    with pytest.raises(HwpUnsupported):
+        open_hwp_as_hwpx(_hwp(flags))
+
+
+def test_not_ole_is_unsupported():
+    with pytest.raises(HwpUnsupported):
+        open_hwp_as_hwpx(b"HWP Document File V3.00" + bytes(100))
+    with pytest.raises(HwpUnsupported):
+        open_hwp_as_hwpx(_cfb([("DocInfo", _docinfo())]))
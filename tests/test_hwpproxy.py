@@ -0,0 +1,71 @@
+from hwpproxy import StateTrackingHwp
+from hwpsession import RecordingHwp
+
+
+def _proxy():
+    rec = RecordingHwp()
+    return StateTrackingHwp(rec), rec
+
+
+def _names(rec):
+    return [name for name, _, _ in rec.calls]
+
+
+def test_new_cells_start_with_table_font():
+    hwp, rec = _proxy()
+    hwp.set_font(FaceName="바탕", Height=11)
+    hwp.insert_text("앞")
+    hwp.create_table(1, 2)
+    hwp.set_font(FaceName="바탕", Height=11)
+    hwp.insert_text("a")
+    hwp.TableRightCell()
+    hwp.set_font(FaceName="바탕", Height=11)
+    hwp.insert_text("b")
+    assert _names(rec).count("set_font") == 1
+    assert hwp.stats()["saved_by"]["set_font"] == 2
+
+
+def test_font_is_per_cell():
+    hwp, rec = _proxy()
+    hwp.create_table(1, 2)
+    hwp.set_font(Bold=True)
+    hwp.insert_text("a")
+    hwp.TableRightCell()
+    # 새 셀은 표를 만들 때의 모양이므로 다시 보내야 한다
+    hwp.set_font(Bold=True)
+    hwp.insert_text("b")
+    hwp.TableLeftCell()
+    # 지나온 셀로 돌아오면 그 셀의 모양을 안다
+    hwp.set_font(Bold=True)
+    hwp.insert_text("c")
+    assert [kw for name, _, kw in rec.calls if name == "set_font"] == [{"Bold": True}, {"Bold": True}]
+
+
+def test_cell_align_per_cell():
+    hwp, rec = _proxy()
+    hwp.create_table(2, 1)
+    hwp.TableCellAlignCenterCenter()
+    hwp.TableCellAlignCenterCenter()
+    hwp.ParagraphShapeAlignCenter()
+    hwp.TableLowerCell()
+    hwp.TableCellAlignCenterCenter()
+    hwp.TableUpperCell()
+    hwp.TableCellAlignCenterCenter()
+    assert _names(rec).count("TableCellAlignCenterCenter") == 2
+    assert hwp.stats()["saved_by"] == {"set_font": 0, "para_align": 1, "cell_align": 2}
+
+
+def test_leaving_the_grid_forgets_state():
+    hwp, rec = _proxy()
+    hwp.set_font(Bold=True)
+    hwp.insert_text("x")
+    hwp.create_table(1, 1)
+    hwp.TableRightCell()           # 표 끝을 넘는다
+    hwp.set_font(Bold=True)
+    hwp.insert_text("y")
+    hwp.MoveDown()
+    hwp.set_font(Bold=True)
+    hwp.insert_text("z")
+    assert _names(rec).count("set_font") == 3
+    stats = hwp.stats()
+    assert stats["saved"] == sum(stats["saved_by"].values()) == 0
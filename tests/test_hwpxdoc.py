@@ -0,0 +1,49 @@
+import os
+import zipfile
+
+import pytest
+
+from hwpxdoc import HwpxDocument, scan_section
+from hwpxpatch import HwpxPatch
+from parser import parse_hwpx_to_spec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECTION = "Contents/section0.xml"
+
+
+def _rewrite(src, dst, old, new):
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info.filename)
+            if info.filename == SECTION:
+                assert old in data
+                data = data.replace(old, new, 1)
+            zout.writestr(info, data)
+
+
+@pytest.mark.parametrize("body", [
+    "<![CDATA[한솔초등학교]]>",
+    "<![CDATA[한솔<hp:p>초등 & 학교]]>",      # 태그처럼 보이는 글자도 글자
+    "<![CDATA[]]><![CDATA[ 한솔]]>초등학교",
+    "<!-- 주석 -->한솔초등학교",
+])
+def test_cdata_paragraph_keeps_indexes(tmp_path, body):
+    path = str(tmp_path / "cdata.hwpx")
+    _rewrite(os.path.join(ROOT, "input.hwpx"), path,
+             "<hp:t>한솔초등학교</hp:t>".encode("utf-8"), f"<hp:t>{body}</hp:t>".encode("utf-8"))
+    spec = parse_hwpx_to_spec(path, None)
+    with HwpxDocument(path) as doc:
+        assert doc.to_spec() == spec
+        assert doc["문단2"]["content"] == spec["document"]["문단2"]["content"]
+    with HwpxPatch(path) as patch:
+        for key in ("문단2", "문단3"):
+            assert patch.get_text(key) == spec["document"][key]["content"]
+
+
+def test_scan_section_cdata_only_paragraph():
+    data = ('<hs:sec xmlns:hs="s" xmlns:hp="p">'
+            '<hp:p><hp:run><hp:t><![CDATA[가]]></hp:t></hp:run></hp:p>'
+            '<hp:p><hp:run><hp:t>   </hp:t></hp:run></hp:p>'
+            '<hp:p><hp:run><hp:t><![CDATA[</hp:t></hp:run></hp:p>]]>나</hp:t></hp:run></hp:p>'
+            '</hs:sec>').encode("utf-8")
+    assert [kind for kind, _, _ in scan_section(data)] == ["paragraph", "paragraph"]
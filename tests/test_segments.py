@@ -0,0 +1,57 @@
+import random
+import time
+
+import pytest
+
+from doclib import SEGMENT_RE, SEGMENT_FLAGS, parse_segments
+
+
+def _reference(text, pos=None, end=None, flags=None, out=None):
+    """SEGMENT_RE 로 search 하는 원래 정의"""
+    if out is None:
+        out = []
+        _reference(text, 0, len(text), {}, out)
+        return out
+    while pos < end:
+        m = SEGMENT_RE.search(text, pos, end)
+        if m is None:
+            break
+        if m.start() > pos:
+            out.append(dict(flags, text=text[pos:m.start()]))
+        group = m.lastindex
+        inner = dict(flags)
+        inner[SEGMENT_FLAGS[group - 1]] = True
+        _reference(text, m.start(group), m.end(group), inner, out)
+        pos = m.end()
+    if pos < end:
+        out.append(dict(flags, text=text[pos:end]))
+
+
+@pytest.mark.parametrize("text", [
+    "", "plain", "**굵게** 와 _기울임_ 과 *별* 과 <u>밑줄</u>",
+    "**굵게 _기울임_ <u>밑</u>**", "***a***", "**a*", "*a**", "<u>x" * 5, "a\n**b\nc**", "**\n**",
+    "_a_b_", "<u></u>", "<u><u>x</u></u>", "**", "*", "<u>",
+])
+def test_matches_regex_definition(text):
+    assert parse_segments(text) == _reference(text)
+
+
+def test_random_markup_matches_regex_definition():
+    rng = random.Random(0)
+    pieces = ["*", "**", "_", "<u>", "</u>", "a", "가", " ", "\n", "<", "u", ">"]
+    for _ in range(3000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+        assert parse_segments(text) == _reference(text), repr(text)
+
+
+@pytest.mark.parametrize("unit", ["<u>x", "**x", "_x", "*x", "<u>x\n"])
+def test_unclosed_markers_scale_linearly(unit):
+    def timed(n):
+        text = unit * n
+        t = time.perf_counter()
+        parse_segments(text)
+        return time.perf_counter() - t
+
+    small, large = timed(4000), timed(64000)
+    # 선형이면 16배 남짓. 제곱이면 256배
+    assert large < max(small, 1e-3) * 60
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from service import ConversionService
+
+
+@pytest.fixture
+def service():
+    svc = ConversionService(parse_workers=1, generators=0, timeout=30.0)
+    yield svc
+    svc.close()
+
+
+def _handle(svc, req):
+    return asyncio.run(svc.handle(req))
+
+
+@pytest.mark.parametrize("timeout", ["abc", "10", -1, 0, True, [5], float("nan")])
+def test_bad_timeout_is_bad_request(service, timeout):
+    resp = _handle(service, {"id": 7, "op": "parse", "path": "input.hwpx", "timeout": timeout})
+    assert resp["id"] == 7 and resp["ok"] is False and resp["code"] == "bad_request"
+    assert service.pending == 0
+
+
+def test_timeout_defaults_and_cap(service):
+    assert service._request_timeout(None) == 30.0
+    assert service._request_timeout(5) == 5.0
+    assert service._request_timeout(1e9) == 30.0
+    service.timeout = None
+    assert service._request_timeout(None) is None
+    assert service._request_timeout(5) == 5.0
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from textindex import TextIndex, normalize_text
+
+DOCS = {
+    "문단1": "예산 100만원",
+    "문단2": "하하 웃음",
+    "문단3": "기다림... 그리고 ㅎㅎㅎㅎ",
+    "문단4": "1000원과 10000원",
+}
+
+
+def _index(tmp_path, docs=DOCS):
+    idx = TextIndex(str(tmp_path / "index"))
+    idx.add_spec("a.hwpx", {"document": {k: {"content": v} for k, v in docs.items()}})
+    return idx
+
+
+def _brute(docs, query):
+    q = normalize_text(query)
+    hits = []
+    for key, text in docs.items():
+        pos = normalize_text(text).find(q)
+        if pos >= 0:
+            hits.append((key, pos))
+    return sorted(hits)
+
+
+def _hits(idx, query):
+    return sorted((h["key"], h["offset"]) for h in idx.search(query))
+
+
+@pytest.mark.parametrize("saved", [False, True])
+@pytest.mark.parametrize("query", ["1000", "하하하", "...", "ㅎㅎㅎ", "ㅎㅎㅎㅎㅎ", "00", "하하", "0000"])
+def test_repeated_bigram_queries(tmp_path, saved, query):
+    idx = _index(tmp_path)
+    if saved:
+        idx.save()
+        idx = TextIndex(str(tmp_path / "index"))
+    assert _hits(idx, query) == _brute(DOCS, query)
+
+
+def test_random_queries_match_substring_search(tmp_path):
+    idx = _index(tmp_path)
+    texts = [normalize_text(t) for t in DOCS.values()]
+    alphabet = "".join(sorted(set("".join(texts)) - {" "}))
+    rng = random.Random(0)
+    for _ in range(500):
+        if rng.random() < 0.5:
+            text = rng.choice(texts)
+            start = rng.randrange(len(text))
+            query = text[start:start + rng.randint(1, 5)]
+        else:
+            query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+        if not query.strip():
+            continue
+        assert _hits(idx, query) == _brute(DOCS, query), query
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import parser
+import xmlbackend
+from bench import write_synthetic_hwpx, CORPUS_PRESETS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ["input.hwpx", "test.hwpx", "output.hwpx"]
+MODES = {
+    "default": {},
+    "streaming": {"streaming": True},
+    "section_workers": {"section_workers": 2},
+    "section_cache": {"section_cache": True},
+}
+
+
+@pytest.fixture
+def backend():
+    previous = xmlbackend.name
+
+    def use(name):
+        xmlbackend.use(name)
+        parser.clear_header_cache()
+        parser.clear_section_cache()
+
+    yield use
+    use(previous)
+
+
+@pytest.fixture(scope="module")
+def synthetic(tmp_path_factory):
+    # 구역이 여럿이어야 section_workers 가 실제로 worker 를 띄운다
+    path = str(tmp_path_factory.mktemp("corpus") / "medium.hwpx")
+    write_synthetic_hwpx(path, **CORPUS_PRESETS["medium"])
+    return path
+
+
+def _spec(path, mode, cache_dir):
+    options = dict(MODES[mode])
+    if mode == "section_cache":
+        options["section_cache_dir"] = cache_dir
+    return parser.parse_hwpx_to_spec(path, None, **options)
+
+
+@pytest.mark.skipif("HWPX_XML_BACKEND" in os.environ, reason="해석기를 환경변수로 골랐음")
+def test_default_backend_is_etree():
+    assert xmlbackend.name == "etree"
+
+
+def test_unknown_backend(backend):
+    with pytest.raises(ValueError):
+        xmlbackend.use("nope")
+
+
+@pytest.mark.parametrize("mode", list(MODES))
+@pytest.mark.parametrize("sample", SAMPLES + ["synthetic"])
+def test_backends_give_same_spec(backend, synthetic, tmp_path, sample, mode):
+    pytest.importorskip("lxml")
+    path = synthetic if sample == "synthetic" else os.path.join(ROOT, sample)
+    backend("etree")
+    expected = parser.parse_hwpx_to_spec(path, None)
+    for name in ("etree", "lxml"):
+        backend(name)
+        cache_dir = str(tmp_path / name)
+        assert _spec(path, mode, cache_dir) == expected, (name, mode)
+        if mode == "section_cache":
+            # 디스크 캐시에서 다시 읽은 결과도 같아야 한다
+            parser.clear_section_cache()
+            assert _spec(path, mode, cache_dir) == expected, (name, "section_cache/disk")
@@ -0,0 +1,445 @@
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import unicodedata
+from array import array
+
+from parser import parse_hwpx_to_spec, collect_batch_inputs
+
+# 파싱한 문서 모음에 대한 전문 검색 색인.
+# "표 셀에 '총괄평가'가 들어간 문서" 같은 질의를 파일을 다시 파싱하지 않고 바로 답한다.
+#
+# 색인 단위(위치)는 문단 하나 또는 표 셀 하나: (문서, 블록 키 "문단3"/"표1", 행, 열).
+# 셀 안의 중첩 표 글자는 그 셀 위치로 색인한다. 문단은 행/열이 -1.
+#
+# 한국어는 띄어쓰기/조사 때문에 단어 단위가 잘 맞지 않아 글자 2-gram 으로 색인한다.
+# 위치 글자는 NFC + 소문자 + 공백 하나로 정규화한 뒤 앞뒤에 공백을 붙이므로
+# " 총" 같은 2-gram 이 어절 시작을 나타낸다 (접두어 검색에 사용).
+#
+# 디스크 형식 (폴더 하나, 모두 little-endian, mmap 으로 바로 읽는다)
+#   terms.bin    [글자1 u32, 글자2 u32, postings 시작 u64, 개수 u32] * 항 수 (항 순서로 정렬)
+#   postings.bin [위치 id u32, 글자 위치 u32] * ... (항마다 (위치, 글자 위치) 순)
+#   locs.bin     [문서 id u32, 키 id u32, 행 i32, 열 i32] * 위치 수
+#   meta.json    {"version", "docs": [{"path", "mtime", "size"} 또는 null], "keys": [...]}
+
+VERSION = 1
+TERM = struct.Struct("<IIQI")
+LOC = struct.Struct("<IIii")
+POSTING_SIZE = 8
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFC", text).lower()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def bigrams(padded):
+    return [padded[i:i + 2] for i in range(len(padded) - 1)]
+
+
+def iter_spec_locations(spec):
+    """spec -> (키, 행, 열, 글자). 표 셀은 셀 글자와 그 안의 중첩 표 글자를 합친다."""
+    for key, node in spec.get("document", spec).items():
+        if not isinstance(node, dict):
+            continue
+        if isinstance(node.get("data"), list):
+            nested = node.get("cell_nested") or []
+            for r, row in enumerate(node["data"]):
+                for c, text in enumerate(row):
+                    parts = [text]
+                    if r < len(nested) and c < len(nested[r]):
+                        for inner in nested[r][c]:
+                            parts.extend(_table_texts(inner))
+                    yield key, r, c, " ".join(p for p in parts if p)
+        elif "content" in node:
+            yield key, -1, -1, node["content"]
+
+
+def _table_texts(table):
+    for r, row in enumerate(table.get("data") or []):
+        for c, text in enumerate(row):
+            yield text
+            nested = table.get("cell_nested") or []
+            if r < len(nested) and c < len(nested[r]):
+                for inner in nested[r][c]:
+                    yield from _table_texts(inner)
+
+
+class TextIndex:
+    """
+    TextIndex(path) 로 폴더의 색인을 열고(없으면 빈 색인), add_file/add_spec/remove 로 고친 뒤
+    save() 로 다시 쓴다. 저장된 부분은 mmap 으로 읽기만 하고, 추가분은 메모리에 두었다가
+    save() 때 합친다. 지운 문서는 save() 전까지는 검색 결과에서만 빠진다.
+
+        idx = TextIndex("index")
+        idx.add_file("a.hwpx")
+        idx.save()
+        idx.search("총괄평가", where="table")
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.docs = []          # 문서 id -> {"path", "mtime", "size"} 또는 None(지움)
+        self.keys = []
+        self._key_ids = {}
+        self._doc_ids = {}
+        # 디스크 부분
+        self._files = []
+        self._terms = None
+        self._postings = None
+        self._locs = None
+        self._n_terms = 0
+        self._n_base_locs = 0
+        # 메모리 부분
+        self._delta = {}        # 2-gram -> array('I') [위치, 글자 위치, ...]
+        self._delta_locs = []   # (문서 id, 키 id, 행, 열)
+        self._open()
+
+    # --- 열기 / 닫기 ---------------------------------------------------------
+
+    def _open(self):
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != VERSION:
+            raise ValueError(f"색인 버전이 다름: {meta.get('version')}")
+        self.docs = meta["docs"]
+        self.keys = meta["keys"]
+        self._key_ids = {k: i for i, k in enumerate(self.keys)}
+        self._doc_ids = {d["path"]: i for i, d in enumerate(self.docs) if d}
+        self._terms = self._map("terms.bin")
+        self._postings = self._map("postings.bin")
+        self._locs = self._map("locs.bin")
+        self._n_terms = len(self._terms) // TERM.size
+        self._n_base_locs = len(self._locs) // LOC.size
+
+    def _map(self, name):
+        f = open(os.path.join(self.path, name), "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(m)
+        return m
+
+    def close(self):
+        for f in reversed(self._files):
+            f.close()
+        self._files = []
+        self._terms = self._postings = self._locs = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- 추가 / 삭제 ---------------------------------------------------------
+
+    def _key_id(self, key):
+        kid = self._key_ids.get(key)
+        if kid is None:
+            kid = self._key_ids[key] = len(self.keys)
+            self.keys.append(key)
+        return kid
+
+    def add_spec(self, path, spec, mtime=None, size=None):
+        """parse_hwpx_to_spec 결과를 path 이름으로 색인한다. 같은 path 가 있으면 바꿔 넣는다."""
+        self.remove(path)
+        doc_id = len(self.docs)
+        self.docs.append({"path": path, "mtime": mtime, "size": size})
+        self._doc_ids[path] = doc_id
+        for key, row, col, text in iter_spec_locations(spec):
+            text = normalize_text(text)
+            if not text:
+                continue
+            loc_id = self._n_base_locs + len(self._delta_locs)
+            self._delta_locs.append((doc_id, self._key_id(key), row, col))
+            for pos, term in enumerate(bigrams(f" {text} ")):
+                postings = self._delta.get(term)
+                if postings is None:
+                    postings = self._delta[term] = array("I")
+                postings.append(loc_id)
+                postings.append(pos)
+        return doc_id
+
+    def add_file(self, path, force=False):
+        """
+        파일을 파싱해 색인한다. 이미 같은 수정 시각/크기로 색인된 파일이면 건너뛴다 (False).
+        """
+        st = os.stat(path)
+        doc_id = self._doc_ids.get(path)
+        if not force and doc_id is not None:
+            d = self.docs[doc_id]
+            if d["mtime"] == st.st_mtime_ns and d["size"] == st.st_size:
+                return False
+        spec = parse_hwpx_to_spec(path, None)
+        self.add_spec(path, spec, mtime=st.st_mtime_ns, size=st.st_size)
+        return True
+
+    def remove(self, path):
+        doc_id = self._doc_ids.pop(path, None)
+        if doc_id is None:
+            return False
+        self.docs[doc_id] = None
+        return True
+
+    # --- 읽기 ----------------------------------------------------------------
+
+    def _term_at(self, i):
+        a, b, off, cnt = TERM.unpack_from(self._terms, i * TERM.size)
+        return chr(a) + chr(b), off, cnt
+
+    def _find_term(self, term):
+        """디스크 항 표에서 term 이상인 첫 위치 (이분 탐색)"""
+        lo, hi = 0, self._n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid)[0] < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _base_postings(self, term):
+        if not self._n_terms:
+            return array("I")
+        i = self._find_term(term)
+        if i >= self._n_terms:
+            return array("I")
+        found, off, cnt = self._term_at(i)
+        if found != term:
+            return array("I")
+        out = array("I")
+        out.frombytes(self._postings[off * POSTING_SIZE:(off + cnt) * POSTING_SIZE])
+        if sys.byteorder != "little":
+            out.byteswap()
+        return out
+
+    def postings(self, term):
+        """[(위치 id, 글자 위치)] — 디스크 + 메모리"""
+        flat = self._base_postings(term) + self._delta.get(term, array("I"))
+        return list(zip(flat[0::2], flat[1::2]))
+
+    def _terms_with_first(self, ch):
+        """첫 글자가 ch 인 모든 2-gram (한 글자 질의용)"""
+        terms = set()
+        if self._n_terms:
+            i = self._find_term(ch)
+            while i < self._n_terms:
+                term = self._term_at(i)[0]
+                if term[0] != ch:
+                    break
+                terms.add(term)
+                i += 1
+        terms.update(t for t in self._delta if t[0] == ch)
+        return sorted(terms)
+
+    def location(self, loc_id):
+        if loc_id < self._n_base_locs:
+            doc_id, key_id, row, col = LOC.unpack_from(self._locs, loc_id * LOC.size)
+        else:
+            doc_id, key_id, row, col = self._delta_locs[loc_id - self._n_base_locs]
+        return doc_id, self.keys[key_id], row, col
+
+    def _matches(self, query):
+        """{위치 id: 첫 일치 글자 위치}"""
+        if len(query) == 1:
+            found = {}
+            for term in self._terms_with_first(query):
+                for loc, pos in self.postings(term):
+                    if loc not in found or pos < found[loc]:
+                        found[loc] = pos
+            return found
+
+        # 같은 2-gram 이 질의에 여러 번 나오면 (예: "1000" 의 "00") 그 자리마다 따로 맞아야 한다:
+        # (2-gram, 질의 안 위치) 쌍마다 시작 위치 집합을 만들어 교집합을 낸다
+        pairs = [(t, off) for off, t in enumerate(bigrams(query))]
+        plists = {t: self.postings(t) for t, _ in pairs}
+        pairs.sort(key=lambda pair: len(plists[pair[0]]))
+        # 가장 짧은 목록에서 후보 시작 위치를 만들고, 나머지 목록으로 줄여 나간다
+        candidates = None
+        for t, off in pairs:
+            starts = {}
+            for loc, pos in plists[t]:
+                if candidates is not None and loc not in candidates:
+                    continue
+                if pos >= off:
+                    starts.setdefault(loc, set()).add(pos - off)
+            if candidates is None:
+                candidates = starts
+            else:
+                candidates = {loc: s & starts[loc] for loc, s in candidates.items() if loc in starts}
+                candidates = {loc: s for loc, s in candidates.items() if s}
+            if not candidates:
+                return {}
+        return {loc: min(s) for loc, s in candidates.items()}
+
+    def search(self, query, where=None, prefix=False, limit=None):
+        """
+        query 를 구절로 찾는다 (띄어쓰기도 정규화해서 그대로 맞춘다).
+        - where: "table"(표 셀만) / "paragraph"(문단만) / None
+        - prefix: 어절 시작에서만 (예: "총괄" -> "총괄평가" 는 맞고 "학기총괄" 은 아님)
+        반환: [{"path", "key", "row", "col", "offset"}] (offset: 정규화한 위치 글자 안의 시작)
+        """
+        q = normalize_text(query)
+        if not q:
+            return []
+        if prefix:
+            q = " " + q
+        hits = []
+        for loc, pos in sorted(self._matches(q).items()):
+            doc_id, key, row, col = self.location(loc)
+            doc = self.docs[doc_id]
+            if doc is None:
+                continue
+            if where == "table" and row < 0 or where == "paragraph" and row >= 0:
+                continue
+            if not prefix and pos < 1:
+                # 앞에 붙인 공백에서 시작하는 일치는 질의에 없는 글자를 포함한 것
+                continue
+            # 앞에 붙인 공백만큼 (접두어면 그 공백이 곧 어절 앞 공백)
+            hits.append({"path": doc["path"], "key": key, "row": row, "col": col,
+                         "offset": pos if prefix else pos - 1})
+            if limit and len(hits) >= limit:
+                break
+        return hits
+
+    def documents(self, query, where=None, prefix=False):
+        """query 가 들어있는 문서 경로 (색인 순서)"""
+        seen = []
+        for hit in self.search(query, where=where, prefix=prefix):
+            if hit["path"] not in seen:
+                seen.append(hit["path"])
+        return seen
+
+    # --- 저장 ----------------------------------------------------------------
+
+    def _all_terms(self):
+        terms = set(self._delta)
+        for i in range(self._n_terms):
+            terms.add(self._term_at(i)[0])
+        return sorted(terms)
+
+    def save(self):
+        """
+        디스크 부분과 메모리 추가분을 합쳐 다시 쓴다. 지운 문서의 위치는 이때 빠지고
+        위치/문서 id 가 다시 매겨진다.
+        """
+        live_docs = [i for i, d in enumerate(self.docs) if d]
+        doc_map = {old: new for new, old in enumerate(live_docs)}
+        n_locs = self._n_base_locs + len(self._delta_locs)
+        loc_map = {}
+        locs = bytearray()
+        for loc_id in range(n_locs):
+            if loc_id < self._n_base_locs:
+                doc_id, key_id, row, col = LOC.unpack_from(self._locs, loc_id * LOC.size)
+            else:
+                doc_id, key_id, row, col = self._delta_locs[loc_id - self._n_base_locs]
+            if doc_id in doc_map:
+                loc_map[loc_id] = len(loc_map)
+                locs += LOC.pack(doc_map[doc_id], key_id, row, col)
+
+        terms = bytearray()
+        postings = array("I")
+        for term in self._all_terms():
+            flat = self._base_postings(term) + self._delta.get(term, array("I"))
+            start = len(postings) // 2
+            for loc, pos in zip(flat[0::2], flat[1::2]):
+                new = loc_map.get(loc)
+                if new is not None:
+                    postings.append(new)
+                    postings.append(pos)
+            count = len(postings) // 2 - start
+            if count:
+                terms += TERM.pack(ord(term[0]), ord(term[1]), start, count)
+        if sys.byteorder != "little":
+            postings.byteswap()
+
+        meta = {"version": VERSION, "docs": [self.docs[i] for i in live_docs], "keys": self.keys}
+        self.close()
+        os.makedirs(self.path, exist_ok=True)
+        for name, data in (("terms.bin", terms), ("postings.bin", postings.tobytes()),
+                           ("locs.bin", locs)):
+            _write_atomic(os.path.join(self.path, name), data)
+        _write_atomic(os.path.join(self.path, "meta.json"),
+                      json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+        # 저장한 것을 다시 mmap 으로 연다
+        self.__init__(self.path)
+
+    def stats(self):
+        return {
+            "docs": sum(1 for d in self.docs if d),
+            "locations": self._n_base_locs + len(self._delta_locs),
+            "terms": self._n_terms,
+            "pending_terms": len(self._delta),
+        }
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="hwpx 문서 모음 전문 검색 색인")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="문서 추가/갱신 (바뀌지 않은 파일은 건너뜀)")
+    p_add.add_argument("index")
+    p_add.add_argument("pattern", help="폴더 또는 glob 패턴")
+    p_rm = sub.add_parser("remove", help="문서 삭제")
+    p_rm.add_argument("index")
+    p_rm.add_argument("paths", nargs="+")
+    p_q = sub.add_parser("search", help="구절 검색")
+    p_q.add_argument("index")
+    p_q.add_argument("query")
+    p_q.add_argument("--table", action="store_true", help="표 셀에서만")
+    p_q.add_argument("--paragraph", action="store_true", help="문단에서만")
+    p_q.add_argument("--prefix", action="store_true", help="어절 시작에서만")
+    p_q.add_argument("--limit", type=int, default=None)
+    args = ap.parse_args()
+
+    idx = TextIndex(args.index)
+    if args.cmd == "add":
+        added = skipped = 0
+        errors = []
+        for path, _ in collect_batch_inputs(args.pattern):
+            try:
+                if idx.add_file(path):
+                    added += 1
+                else:
+                    skipped += 1
+            except Exception as e:
+                errors.append((path, f"{type(e).__name__}: {e}"))
+        idx.save()
+        print(f"추가 {added} / 그대로 {skipped} / 실패 {len(errors)}", file=sys.stderr)
+        for path, err in errors:
+            print(f"  [실패] {path}: {err}", file=sys.stderr)
+    elif args.cmd == "remove":
+        removed = sum(1 for p in args.paths if idx.remove(p))
+        idx.save()
+        print(f"삭제 {removed}", file=sys.stderr)
+    else:
+        where = "table" if args.table else "paragraph" if args.paragraph else None
+        started = time.perf_counter()
+        hits = idx.search(args.query, where=where, prefix=args.prefix, limit=args.limit)
+        elapsed = time.perf_counter() - started
+        for h in hits:
+            cell = f"[{h['row']}][{h['col']}]" if h["row"] >= 0 else ""
+            print(f"{h['path']}\t{h['key']}{cell}\t{h['offset']}")
+        print(f"{len(hits)}건 ({elapsed * 1e3:.1f}ms)", file=sys.stderr)
+    idx.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as _lxml
+except ImportError:      # lxml 은 선택 사항
+    _lxml = None
+
+# parser 가 쓰는 XML 해석기. 기본은 xml.etree.ElementTree, 고르면 lxml.
+# lxml 은 선택 의존성이다 (pip install lxml). 없으면 etree 만 쓴다.
+#
+#   HWPX_XML_BACKEND=etree(기본) | lxml | auto (lxml 이 있으면 lxml)
+#   xmlbackend.use("etree")          # 실행 중에 바꾸기 (비교/벤치마크용)
+#
+# parser 는 요소를 만들거나 고르는 일을 이 모듈의 함수로만 한다.
+#   fromstring / parse / iterparse           해석 (lxml: 주석/PI 는 버리고, 외부 엔티티는 풀지 않는다)
+#   children(el, tag), child(el, tag)        바로 아래 자식 (lxml: iterchildren, C 에서 거른다)
+#   run_texts(p)                             문단의 run 마다 (charPrIDRef, hp:t 첫 글자들을 이은 것)
+#                                            (lxml: 미리 컴파일한 XPath 한 번, hp:t 요소는 만들지 않는다)
+#   top_items(el)                            el 아래의 문단/표를 문서 순서로. 표 안으로는 내려가지 않는다
+#                                            (lxml: 안에 표가 없으면 iter, 있으면 iterwalk 로 표 안을 건너뛴다)
+# 요소 자체(.tag/.text/.get/.find)는 두 구현이 같으므로 그대로 쓴다.
+#
+# lxml 은 해석 자체는 두 배쯤 빠르지만 파이썬에서 요소를 하나씩 만질 때마다 proxy 를 만드는 비용이 커서
+# 전체로는 etree 와 비슷하고, 스트리밍(iterparse)은 오히려 느리다. 그래서 기본은 etree 로 둔다.
+
+HP_NS = "http://www.hancom.co.kr/hwpml/2011/paragraph"
+HH_NS = "http://www.hancom.co.kr/hwpml/2011/head"
+NS = {"hp": HP_NS, "hh": HH_NS}
+HP = "{" + HP_NS + "}"
+P_TAG, TBL_TAG, RUN_TAG, T_TAG = HP + "p", HP + "tbl", HP + "run", HP + "t"
+
+
+def available():
+    """쓸 수 있는 해석기 이름들"""
+    return ["etree"] + (["lxml"] if _lxml is not None else [])
+
+
+# --- xml.etree.ElementTree -----------------------------------------------------
+
+def _et_parse(f):
+    return ET.parse(f).getroot()
+
+
+def _et_children(el, tag):
+    return [c for c in el if c.tag == tag]
+
+
+def _et_child(el, tag):
+    for c in el:
+        if c.tag == tag:
+            return c
+    return None
+
+
+def _et_run_texts(p):
+    for run in p:
+        if run.tag == RUN_TAG:
+            yield run.get("charPrIDRef"), "".join([t.text for t in run if t.tag == T_TAG and t.text])
+
+
+def _et_top_items(el):
+    # 문서 순서(전위)로 돌기 위해 자식을 거꾸로 쌓는다
+    stack = list(el)
+    stack.reverse()
+    while stack:
+        node = stack.pop()
+        tag = node.tag
+        if tag == TBL_TAG:
+            yield node
+            continue
+        if tag == P_TAG:
+            yield node
+        children = list(node)
+        children.reverse()
+        stack.extend(children)
+
+
+# --- lxml ----------------------------------------------------------------------
+
+if _lxml is not None:
+    _LXML_OPTIONS = dict(resolve_entities=False, no_network=True, huge_tree=True,
+                         remove_comments=True, remove_pis=True)
+    _LXML_PARSER = _lxml.XMLParser(**_LXML_OPTIONS)
+    # run 요소와, 그 아래 hp:t 의 첫 자식이 글자면 그 글자(= ElementTree 의 t.text) 를 문서 순서로
+    _RUN_TEXTS = _lxml.ETXPath(f"{HP}run | {HP}run/{HP}t/node()[1][self::text()]")
+
+    def _lxml_fromstring(data):
+        return _lxml.fromstring(data, _LXML_PARSER)
+
+    def _lxml_parse(f):
+        return _lxml.parse(f, _LXML_PARSER).getroot()
+
+    def _lxml_iterparse(f, events=("end",)):
+        return _lxml.iterparse(f, events=events, **_LXML_OPTIONS)
+
+    def _lxml_children(el, tag):
+        return el.iterchildren(tag)
+
+    def _lxml_child(el, tag):
+        return next(el.iterchildren(tag), None)
+
+    def _lxml_run_texts(p):
+        cid, parts = None, None
+        for item in _RUN_TEXTS(p):
+            if isinstance(item, str):
+                parts.append(item)
+                continue
+            if parts is not None:
+                yield cid, "".join(parts)
+            cid, parts = item.get("charPrIDRef"), []
+        if parts is not None:
+            yield cid, "".join(parts)
+
+    def _lxml_top_items(el):
+        # 셀 대부분은 안에 표가 없다: 그러면 문단만 C 에서 골라 바로 돌려준다
+        if next(el.iterdescendants(TBL_TAG), None) is None:
+            return el.iterdescendants(P_TAG)
+        return _lxml_walk_items(el)
+
+    def _lxml_walk_items(el):
+        walker = _lxml.iterwalk(el, events=("start",), tag=(P_TAG, TBL_TAG))
+        for _, node in walker:
+            if node is el:
+                continue
+            yield node
+            if node.tag == TBL_TAG:
+                walker.skip_subtree()
+
+
+_BACKENDS = {
+    "etree": dict(fromstring=ET.fromstring, parse=_et_parse, iterparse=ET.iterparse,
+                  children=_et_children, child=_et_child, run_texts=_et_run_texts, top_items=_et_top_items,
+                  ParseError=(ET.ParseError,)),
+}
+if _lxml is not None:
+    _BACKENDS["lxml"] = dict(fromstring=_lxml_fromstring, parse=_lxml_parse, iterparse=_lxml_iterparse,
+                             children=_lxml_children, child=_lxml_child, run_texts=_lxml_run_texts,
+                             top_items=_lxml_top_items,
+                             ParseError=(ET.ParseError, _lxml.XMLSyntaxError))
+
+name = None
+fromstring = parse = iterparse = children = child = run_texts = top_items = None
+ParseError = (ET.ParseError,)
+
+
+def use(backend="auto"):
+    """해석기를 바꾼다. "auto" 면 lxml 이 있으면 lxml. 없는 해석기를 고르면 ValueError."""
+    global name, fromstring, parse, iterparse, children, child, run_texts, top_items, ParseError
+    if backend == "auto":
+        backend = "lxml" if "lxml" in _BACKENDS else "etree"
+    impl = _BACKENDS.get(backend)
+    if impl is None:
+        raise ValueError(f"XML 해석기를 쓸 수 없습니다: {backend} (가능: {', '.join(available())})")
+    name = backend
+    fromstring, parse, iterparse = impl["fromstring"], impl["parse"], impl["iterparse"]
+    children, child = impl["children"], impl["child"]
+    run_texts, top_items = impl["run_texts"], impl["top_items"]
+    ParseError = impl["ParseError"]
+    return name
+
+
+try:
+    use(os.environ.get("HWPX_XML_BACKEND", "etree"))
+except ValueError:
+    # 환경변수로 고른 해석기가 설치돼 있지 않으면 기본 해석기로
+    use("etree")